@@ -3,7 +3,10 @@ EMBEDDING = {
     "task_doc": "retrieval.passage",
     "task_query": "retrieval.query",
     "batch_size": 50,
-    "dimensions": 1024
+    "dimensions": 1024,
+    # "base64" ships raw little-endian float32 bytes (~2.7x smaller than
+    # "float" JSON numbers and no number parsing); "float" is the fallback.
+    "wire_format": "base64",
 }
 
 CHUNKING = {
@@ -27,14 +30,24 @@ RETRIEVAL = {
     # Setting threshold to -5.0 means we only drop truly irrelevant results.
     # The "always return top 3" fallback in retriever.py also guards against
     # empty context for any threshold value.
-    "score_threshold": -5.0
+    "score_threshold": -5.0,
+    # Documents sent to the reranker are cut to this many characters; the
+    # head of a chunk carries enough signal and the payload stays small.
+    "rerank_max_chars": 2000,
 }
 
 VECTOR_DB = {
+    # Set both to the same name to keep every source type in one collection:
+    # searches then take a single request and need no client-side merge.
     "collection_docs":  "rag_documents",
     "collection_chats": "rag_conversations",
     "distance": "cosine",
-    "dimensions": 1024
+    "dimensions": 1024,
+    # upsert() buffers rows and inserts them in large batches; a batch is sent
+    # once either cap is hit. The byte cap is an estimate kept well under
+    # Zilliz's 64 MB per-insert request limit.
+    "insert_batch_rows": 10000,
+    "insert_batch_bytes": 32 * 1024 * 1024,
 }
 
 LLM = {
@@ -52,9 +65,17 @@ AI_PARSER = {
     "rpm_limit": 30,       # requests per minute
     "tpm_limit": 30000,    # tokens per minute
     "tpd_limit": 500000,    # tokens per day
+    "batch_max_pages": 4,  # pages packed into one request by parse_batch
     "enabled": True,       # set False to disable AI parsing
 }
 
+CSV = {
+    # "pyarrow" parses with pyarrow's multithreaded CSV reader when pyarrow is
+    # installed, falling back to pandas for files it can't take; "pandas"
+    # always uses pd.read_csv.
+    "reader": "pyarrow",
+}
+
 SOURCES = {
     "github_clone_dir": "./tmp/repos",
     "upload_dir": "./tmp/uploads",
@@ -13,10 +13,46 @@ Rate Limits for meta-llama/llama-4-scout-17b-16e-instruct:
 
 import os
 import time
+import asyncio
 import threading
 from typing import Optional
 
+import httpx
+import orjson
+
+try:
+    from groq import APIStatusError, RateLimitError
+except ModuleNotFoundError:  # pragma: no cover
+    # _get_client() raises before any completion is attempted in this case;
+    # these placeholders just keep the isinstance checks valid.
+    class APIStatusError(Exception):
+        pass
+
+    class RateLimitError(APIStatusError):
+        pass
+
 from backend.config import AI_PARSER
+from backend.core.cache import DEFAULT_TTL_SECONDS, cache_get_or_set, make_cache_key
+from backend.core.token_bucket import TokenBucket
+from backend.core.upstash_redis import UpstashRedis, UpstashRedisError
+
+
+# Parsed pages are cached for a week; the model name is part of the key so
+# switching models invalidates old entries.
+PARSE_CACHE_PREFIX = "aiparser:v2"
+PARSE_CACHE_TTL_SECONDS = DEFAULT_TTL_SECONDS * 24 * 7
+
+# Shared rate-limit counters live under this prefix so every worker process
+# draws from the same Groq budget.
+RATE_LIMIT_PREFIX = "aiparser:rl"
+
+# Inputs are cut to this many chars (~1500 tokens), leaving room for output
+MAX_INPUT_CHARS = 6000
+TRUNCATION_MARKER = "\n...[truncated]"
+
+
+class _ParseFailed(Exception):
+    """Raised inside the cache fetch so failed parses are not cached."""
 
 
 class AIParser:
@@ -25,7 +61,47 @@ class AIParser:
     Handles rate limiting with exponential backoff retry.
     """
 
-    def __init__(self):
+    # Prompts are stored as constant pieces and joined with the per-page
+    # fields, instead of re-formatting the whole template on every call.
+    _PROMPT_HEAD = """You are a content parser. Your task is to extract and structure the main content from raw web page data.
+
+Rules:
+1. Remove ALL navigation, headers, footers, sidebars, ads, cookie notices
+2. Remove ALL markdown syntax, HTML tags, URLs, and formatting artifacts
+3. Keep ONLY the main article/page content
+4. Structure the content with clear paragraphs
+5. Preserve important information: titles, headings (as plain text), lists, tables
+6. If content is garbage/noise, set "valid" to false and "content" to null
+7. Do NOT add any commentary or explanations - just the cleaned content
+
+Respond with a JSON object of the form:
+{"valid": true, "content": "cleaned content"}
+
+Raw content from """
+    _PROMPT_MID = """:
+
+"""
+    _PROMPT_TAIL = """
+
+JSON:"""
+
+    _BATCH_PROMPT_HEAD = """You are a content parser. Your task is to extract and structure the main content from several raw web pages.
+
+Rules:
+1. Remove ALL navigation, headers, footers, sidebars, ads, cookie notices
+2. Remove ALL markdown syntax, HTML tags, URLs, and formatting artifacts
+3. Keep ONLY the main article/page content
+4. Structure the content with clear paragraphs
+5. Preserve important information: titles, headings (as plain text), lists, tables
+6. If a page is garbage/noise, set its "valid" to false and its "content" to null
+7. Do NOT add any commentary or explanations - just the cleaned content
+
+Each page is delimited by <<<PAGE i>>> and <<<END i>>>.
+Respond with a JSON object of the form:
+{"pages": [{"index": 0, "valid": true, "content": "cleaned text or null"}, ...]}
+"""
+
+    def __init__(self, redis: Optional[UpstashRedis] = None):
         self._api_key = os.getenv("GROQ_API_KEY")
         if not self._api_key:
             raise RuntimeError("Missing GROQ_API_KEY environment variable")
@@ -38,18 +114,30 @@ class AIParser:
         self._rpm_limit = AI_PARSER["rpm_limit"]          # 30 requests per minute
         self._tpm_limit = AI_PARSER["tpm_limit"]          # 1K tokens per minute
         self._tpd_limit = AI_PARSER["tpd_limit"]          # 30K tokens per day
+        self._batch_max_pages = AI_PARSER.get("batch_max_pages", 4)
 
-        # Rate limit tracking
+        # Rate limit tracking: RPM/TPM refill continuously over a 60s window,
+        # TPD is a plain running total.
         self._window_seconds = 60
-        self._window_start = time.time()
-        self._window_requests = 0
-        self._window_tokens = 0
+        self._rpm_bucket = TokenBucket(self._rpm_limit, self._window_seconds)
+        self._tpm_bucket = TokenBucket(self._tpm_limit, self._window_seconds)
         self._daily_tokens = 0
+        self._daily_lock = threading.Lock()
 
-        # Initialize Groq client lazily
+        # Initialize Groq clients lazily. The async client is bound to the
+        # event loop it was created on, so remember which one that was.
         self._client = None
-
-        self._budget_lock = threading.Lock()
+        self._async_client = None
+        self._async_client_loop = None
+
+        # Parse cache. UpstashRedis holds an httpx.AsyncClient, so unless one
+        # is injected we keep a separate instance per event loop.
+        self._redis = redis
+        self._loop_redis: Optional[UpstashRedis] = None
+        self._loop_redis_loop = None
+        # The blocking rate-limit path only uses the sync HTTP client, which
+        # isn't tied to a loop, so one instance serves every thread.
+        self._sync_redis = UpstashRedis()
 
     def _get_client(self):
         """Lazy initialization of Groq client."""
@@ -61,18 +149,57 @@ class AIParser:
                 raise RuntimeError("groq package not installed. Run: pip install groq")
         return self._client
 
+    def _get_async_client(self):
+        """Lazy initialization of the async Groq client for the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            try:
+                from groq import AsyncGroq
+                self._async_client = AsyncGroq(api_key=self._api_key)
+                self._async_client_loop = loop
+            except ImportError:
+                raise RuntimeError("groq package not installed. Run: pip install groq")
+        return self._async_client
+
+    def _get_redis(self) -> UpstashRedis:
+        """Redis client used for the parse cache on the running loop."""
+        if self._redis is not None:
+            return self._redis
+        loop = asyncio.get_running_loop()
+        if self._loop_redis is None or self._loop_redis_loop is not loop:
+            stale, stale_loop = self._loop_redis, self._loop_redis_loop
+            self._loop_redis = UpstashRedis()
+            self._loop_redis_loop = loop
+            # The old client's connections belong to its own loop, so it has
+            # to be closed there; a loop that is already closed took them down
+            if stale is not None and not stale_loop.is_closed():
+                asyncio.run_coroutine_threadsafe(stale.close(), stale_loop)
+        return self._loop_redis
+
+    async def aclose(self):
+        """Close the Redis client opened for the running loop.
+
+        Call before a loop that used the parser (e.g. one per website crawl)
+        finishes, so its HTTP connections don't outlive it.
+        """
+        if self._loop_redis is not None and self._loop_redis_loop is asyncio.get_running_loop():
+            redis, self._loop_redis, self._loop_redis_loop = self._loop_redis, None, None
+            await redis.close()
+
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count (roughly 4 chars per token)."""
-        return max(1, len(text) // 4)
+        return self._tokens_for_chars(len(text))
+
+    def _tokens_for_chars(self, char_count: int) -> int:
+        return max(1, char_count // 4)
 
     def estimate_request_tokens(self, raw_content: str) -> int:
         """Estimate total tokens for a request (prompt/input + completion)."""
         if not raw_content:
             return self._max_tokens
-        # Keep consistent with parse_content truncation logic.
-        max_input_chars = 6000
-        trimmed = raw_content[:max_input_chars]
-        input_tokens = self._estimate_tokens(trimmed)
+        # Keep consistent with parse_content truncation logic. Only the
+        # length matters, so don't materialize the truncated prefix.
+        input_tokens = self._tokens_for_chars(min(len(raw_content), MAX_INPUT_CHARS))
         return input_tokens + self._max_tokens
 
     def _sleep_with_jitter(self, seconds: float):
@@ -82,43 +209,247 @@ class AIParser:
         jitter = 0.05 * (1 + 0.1 * (time.time() % 1))
         time.sleep(seconds + jitter)
 
-    def _wait_for_budget(self, estimated_tokens: int):
-        """Wait if we've exceeded rate limits."""
-        now = time.time()
-        elapsed = now - self._window_start
+    def _reserve_daily(self, estimated_tokens: int):
+        """Reserve daily token budget, raising RuntimeError once it is exhausted."""
+        with self._daily_lock:
+            if (self._daily_tokens + estimated_tokens) > self._tpd_limit:
+                # For daily limit, we can't proceed - raise error
+                raise RuntimeError(
+                    f"Daily token limit ({self._tpd_limit}) exceeded. "
+                    f"Used: {self._daily_tokens}. Please try again tomorrow."
+                )
+            self._daily_tokens += estimated_tokens
 
-        # Reset window if 60 seconds passed
-        if elapsed >= self._window_seconds:
-            self._window_start = time.time()
-            self._window_requests = 0
-            self._window_tokens = 0
+    def _try_reserve_window(self, estimated_tokens: int) -> tuple[float, str]:
+        """
+        Try to reserve one request + estimated_tokens from the RPM/TPM buckets.
 
-        exceeds_rpm = (self._window_requests + 1) > self._rpm_limit
-        exceeds_tpm = (self._window_tokens + estimated_tokens) > self._tpm_limit
-        exceeds_tpd = (self._daily_tokens + estimated_tokens) > self._tpd_limit
+        Returns (0.0, "") on success, otherwise (seconds_to_wait, reason).
+        """
+        sleep_for = self._rpm_bucket.try_acquire(1)
+        if sleep_for > 0:
+            return sleep_for, "RPM"
+        sleep_for = self._tpm_bucket.try_acquire(estimated_tokens)
+        if sleep_for > 0:
+            # Give the request slot back while we wait for token budget
+            self._rpm_bucket.refund(1)
+            return sleep_for, "TPM"
+        return 0.0, ""
 
-        if not (exceeds_rpm or exceeds_tpm or exceeds_tpd):
-            return
+    def _wait_for_budget(self, estimated_tokens: int):
+        """
+        Block until RPM/TPM budget is available, then reserve it.
+
+        Serves the blocking parse_content / parse_batch API for callers
+        without an event loop; the website ingester goes through
+        parse_batch_async and _wait_for_budget_async instead.
+
+        Uses the shared Redis counters like _wait_for_budget_async when
+        Redis is configured. Otherwise sleeps happen outside of any lock so
+        concurrent parse calls only contend on the bucket arithmetic. Raises
+        RuntimeError once the daily token budget is exhausted.
+        """
+        redis = self._redis or self._sync_redis
+        if redis.is_configured():
+            try:
+                self._wait_for_shared_budget_sync(redis, estimated_tokens)
+                return
+            except (UpstashRedisError, httpx.HTTPError) as e:
+                print(f"[AI Parser] Shared rate limit unavailable ({e}). Using local budget.")
+
+        self._reserve_daily(estimated_tokens)
+        while True:
+            sleep_for, wait_reason = self._try_reserve_window(estimated_tokens)
+            if sleep_for <= 0:
+                return
+            print(f"[AI Parser] Rate limit ({wait_reason}). Waiting {sleep_for:.2f}s...")
+            self._sleep_with_jitter(sleep_for)
+
+    async def _wait_for_budget_async(self, estimated_tokens: int):
+        """
+        Async counterpart of _wait_for_budget that yields to the event loop while waiting.
 
-        # Determine wait reason
-        if exceeds_tpd:
-            wait_reason = "TPD (daily limit)"
-            # For daily limit, we can't proceed - raise error
+        When Redis is configured the budget is reserved in shared counters, so
+        several worker processes don't each spend the full Groq limit. Falls
+        back to the in-process buckets if Redis is unavailable.
+        """
+        redis = self._get_redis()
+        if redis.is_configured():
+            try:
+                await self._wait_for_shared_budget(redis, estimated_tokens)
+                return
+            except (UpstashRedisError, httpx.HTTPError) as e:
+                print(f"[AI Parser] Shared rate limit unavailable ({e}). Using local budget.")
+
+        self._reserve_daily(estimated_tokens)
+        while True:
+            sleep_for, wait_reason = self._try_reserve_window(estimated_tokens)
+            if sleep_for <= 0:
+                return
+            print(f"[AI Parser] Rate limit ({wait_reason}). Waiting {sleep_for:.2f}s...")
+            await asyncio.sleep(sleep_for + 0.05)
+
+    def _shared_budget_pipelines(self, estimated_tokens: int, now: float) -> tuple[list, list]:
+        """
+        Commands reserving budget in Redis: one INCRBY per limit for the
+        current minute (RPM/TPM) and UTC day (TPD), sent as a single pipeline.
+        Keys are named by window, so EXPIRE only has to clean them up
+        afterwards. Also returns the commands releasing the reservation.
+        """
+        window = int(now // self._window_seconds)
+        rpm_key = f"{RATE_LIMIT_PREFIX}:rpm:{window}"
+        tpm_key = f"{RATE_LIMIT_PREFIX}:tpm:{window}"
+        tpd_key = f"{RATE_LIMIT_PREFIX}:tpd:{time.strftime('%Y-%m-%d', time.gmtime(now))}"
+        reserve = [
+            ["INCRBY", rpm_key, 1],
+            ["INCRBY", tpm_key, estimated_tokens],
+            ["INCRBY", tpd_key, estimated_tokens],
+            ["EXPIRE", rpm_key, self._window_seconds * 2],
+            ["EXPIRE", tpm_key, self._window_seconds * 2],
+            ["EXPIRE", tpd_key, 2 * 86400],
+        ]
+        release = [
+            ["DECRBY", rpm_key, 1],
+            ["DECRBY", tpm_key, estimated_tokens],
+            ["DECRBY", tpd_key, estimated_tokens],
+        ]
+        return reserve, release
+
+    def _shared_budget_overrun(self, results: list, estimated_tokens: int) -> str:
+        """Which limit the reservation in `results` exceeds ("TPD", "RPM", "TPM"), or ""."""
+        window_requests, window_tokens, daily_tokens = (int(r) for r in results[:3])
+        if daily_tokens > self._tpd_limit:
+            return "TPD"
+        if window_requests > self._rpm_limit:
+            return "RPM"
+        # A single request larger than the TPM limit may still go first in a window
+        if window_tokens > self._tpm_limit and window_tokens != estimated_tokens:
+            return "TPM"
+        return ""
+
+    def _shared_budget_wait(self, results: list, estimated_tokens: int, reason: str, now: float) -> float:
+        """Seconds until the next window, raising RuntimeError once the daily budget is spent."""
+        if reason == "TPD":
+            daily_tokens = int(results[2])
             raise RuntimeError(
                 f"Daily token limit ({self._tpd_limit}) exceeded. "
-                f"Used: {self._daily_tokens}. Please try again tomorrow."
+                f"Used: {daily_tokens - estimated_tokens}. Please try again tomorrow."
+            )
+        sleep_for = (int(now // self._window_seconds) + 1) * self._window_seconds - now
+        print(f"[AI Parser] Shared rate limit ({reason}). Waiting {sleep_for:.2f}s...")
+        return sleep_for
+
+    async def _wait_for_shared_budget(self, redis: UpstashRedis, estimated_tokens: int):
+        """Reserve budget in the shared Redis counters, waiting for the next window if needed."""
+        while True:
+            now = time.time()
+            reserve, release = self._shared_budget_pipelines(estimated_tokens, now)
+            results = await redis.pipeline(reserve)
+            reason = self._shared_budget_overrun(results, estimated_tokens)
+            if not reason:
+                return
+            # Over budget: release the reservation before waiting or giving up
+            await redis.pipeline(release)
+            await asyncio.sleep(self._shared_budget_wait(results, estimated_tokens, reason, now) + 0.05)
+
+    def _wait_for_shared_budget_sync(self, redis: UpstashRedis, estimated_tokens: int):
+        """Blocking counterpart of _wait_for_shared_budget."""
+        while True:
+            now = time.time()
+            reserve, release = self._shared_budget_pipelines(estimated_tokens, now)
+            results = redis.pipeline_sync(reserve)
+            reason = self._shared_budget_overrun(results, estimated_tokens)
+            if not reason:
+                return
+            redis.pipeline_sync(release)
+            self._sleep_with_jitter(self._shared_budget_wait(results, estimated_tokens, reason, now))
+
+    def _prepare_request(
+        self,
+        raw_content: str,
+        page_url: str,
+        page_index: Optional[int],
+        page_total: Optional[int],
+    ) -> tuple[str, str, int]:
+        """Truncate the input and build (raw_content, prompt, estimated_tokens) for one page."""
+        # Truncate if too long (keep within token limits). Only the kept prefix
+        # is copied; the token estimate below runs on the truncated text.
+        if len(raw_content) > MAX_INPUT_CHARS:
+            raw_content = raw_content[:MAX_INPUT_CHARS] + TRUNCATION_MARKER
+
+        input_tokens = self._estimate_tokens(raw_content)
+        estimated_tokens = input_tokens + self._max_tokens
+
+        if page_index is not None and page_total is not None:
+            print(
+                f"[AI Parser] Page {page_index}/{page_total} | ~{input_tokens} input tokens + {self._max_tokens} output = ~{estimated_tokens} total"
             )
         else:
-            wait_reason = "RPM" if exceeds_rpm else "TPM"
-            sleep_for = (self._window_start + self._window_seconds) - now
-            if sleep_for > 0:
-                print(f"[AI Parser] Rate limit ({wait_reason}). Waiting {sleep_for:.2f}s...")
-                self._sleep_with_jitter(sleep_for)
+            print(f"[AI Parser] ~{input_tokens} input tokens + {self._max_tokens} output = ~{estimated_tokens} total")
 
-        # Reset window after waiting
-        self._window_start = time.time()
-        self._window_requests = 0
-        self._window_tokens = 0
+        prompt = "".join((self._PROMPT_HEAD, page_url, self._PROMPT_MID, raw_content, self._PROMPT_TAIL))
+        return raw_content, prompt, estimated_tokens
+
+    def _completion_kwargs(self, prompt: str) -> dict:
+        return {
+            "model": self._model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self._temperature,
+            "max_completion_tokens": self._max_tokens,
+            "top_p": 1,
+            "stream": False,
+            # Server-side JSON mode: the reply is always a parseable object
+            "response_format": {"type": "json_object"},
+        }
+
+    def _handle_completion(self, completion, page_url: str) -> Optional[str]:
+        result = completion.choices[0].message.content
+        if not result:
+            return None
+
+        try:
+            parsed = orjson.loads(result)
+        except orjson.JSONDecodeError:
+            print(f"[AI Parser] ✗ Invalid JSON from model for {page_url[:60]}")
+            return None
+
+        if not isinstance(parsed, dict) or not parsed.get("valid"):
+            return None
+        content = parsed.get("content")
+        if not isinstance(content, str) or not content.strip():
+            return None
+
+        print(f"[AI Parser] ✓ Parsed: {page_url[:60]}...")
+        return content.strip()
+
+    def _classify_error(self, e: Exception) -> tuple[str, Optional[float]]:
+        """
+        Classify a completion error using the groq SDK's exception types.
+
+        Returns (kind, retry_after_seconds) where kind is "rate_limit",
+        "token_limit", "fatal" (a client error retrying won't fix) or "other".
+        """
+        if isinstance(e, RateLimitError):
+            return "rate_limit", self._get_retry_after_seconds(e)
+        if isinstance(e, APIStatusError):
+            status = e.status_code
+            # 413: request too large for the model's TPM / context window
+            if status == 413:
+                return "token_limit", None
+            if status == 400 and "context_length" in str(getattr(e, "body", "") or ""):
+                return "token_limit", None
+            if 400 <= status < 500:
+                return "fatal", None
+        return "other", None
+
+    def _get_retry_after_seconds(self, e: APIStatusError) -> Optional[float]:
+        retry_after = e.response.headers.get("retry-after")
+        if not retry_after:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:
+            return None
 
     def parse_content(
         self,
@@ -140,97 +471,186 @@ class AIParser:
         if not raw_content or not raw_content.strip():
             return None
 
-        # Truncate if too long (keep within token limits)
-        max_input_chars = 6000  # ~1500 tokens, leaving room for output
-        if len(raw_content) > max_input_chars:
-            raw_content = raw_content[:max_input_chars] + "\n...[truncated]"
+        raw_content, prompt, estimated_tokens = self._prepare_request(
+            raw_content, page_url, page_index, page_total
+        )
 
-        input_tokens = self._estimate_tokens(raw_content)
-        estimated_tokens = input_tokens + self._max_tokens
+        # Check budget + reserve budget
+        try:
+            self._wait_for_budget(estimated_tokens)
+        except RuntimeError as e:
+            print(f"[AI Parser] {e}")
+            return None
 
-        if page_index is not None and page_total is not None:
-            print(
-                f"[AI Parser] Page {page_index}/{page_total} | ~{input_tokens} input tokens + {self._max_tokens} output = ~{estimated_tokens} total"
-            )
-        else:
-            print(f"[AI Parser] ~{input_tokens} input tokens + {self._max_tokens} output = ~{estimated_tokens} total")
+        client = self._get_client()
+
+        # Retry logic with exponential backoff
+        max_retries = 5
+        base_backoff = 2.0
 
-        # Check budget + reserve budget (atomic)
-        with self._budget_lock:
+        for attempt in range(max_retries):
             try:
-                self._wait_for_budget(estimated_tokens)
-            except RuntimeError as e:
-                print(f"[AI Parser] {e}")
+                completion = client.chat.completions.create(**self._completion_kwargs(prompt))
+                return self._handle_completion(completion, page_url)
+
+            except Exception as e:
+                kind, retry_after = self._classify_error(e)
+
+                # Check for rate limit errors
+                if kind == "rate_limit":
+                    backoff = retry_after if retry_after is not None else base_backoff ** (attempt + 1)
+                    print(f"[AI Parser] Rate limited. Backing off {backoff:.1f}s (attempt {attempt + 1}/{max_retries})")
+                    self._sleep_with_jitter(backoff)
+                    continue
+
+                # Check for token limit errors
+                if kind == "token_limit":
+                    print(f"[AI Parser] Token limit exceeded: {e}")
+                    # Try with smaller input
+                    if len(raw_content) > 3000:
+                        return self.parse_content(raw_content[:3000], page_url)
+                    return None
+
+                # Client errors (bad request, auth, ...) won't succeed on retry
+                if kind == "fatal":
+                    print(f"[AI Parser] ✗ Request rejected: {e}")
+                    return None
+
+                # Other errors - retry once then give up
+                if attempt < max_retries - 1:
+                    print(f"[AI Parser] Error: {e}. Retrying...")
+                    self._sleep_with_jitter(1.0)
+                    continue
+
+                print(f"[AI Parser] ✗ Failed after {max_retries} attempts: {e}")
                 return None
 
-            self._window_requests += 1
-            self._window_tokens += estimated_tokens
-            self._daily_tokens += estimated_tokens
+        return None
 
-        # Build prompt
-        prompt = f"""You are a content parser. Your task is to extract and structure the main content from raw web page data.
+    async def parse_content_async(
+        self,
+        raw_content: str,
+        page_url: str = "",
+        page_index: Optional[int] = None,
+        page_total: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Async version of parse_content using AsyncGroq.
 
-Rules:
-1. Remove ALL navigation, headers, footers, sidebars, ads, cookie notices
-2. Remove ALL markdown syntax, HTML tags, URLs, and formatting artifacts
-3. Keep ONLY the main article/page content
-4. Structure the content with clear paragraphs
-5. Preserve important information: titles, headings (as plain text), lists, tables
-6. If content is garbage/noise, respond with "NO_VALID_CONTENT"
-7. Do NOT add any commentary or explanations - just the cleaned content
+        Many pages can be in flight at once; throughput is bounded by the
+        RPM/TPM buckets rather than by per-request network latency. Results
+        are cached in Redis keyed by model + URL + content, so re-crawling an
+        unchanged page skips the LLM call and its rate-limit budget entirely.
+        """
+        if not raw_content or not raw_content.strip():
+            return None
 
-Raw content from {page_url}:
+        key = self._parse_cache_key(raw_content, page_url)
 
-{raw_content}
+        async def _fetch() -> str:
+            parsed = await self._parse_content_uncached_async(
+                raw_content, page_url, page_index, page_total
+            )
+            if parsed is None:
+                raise _ParseFailed()
+            return parsed
+
+        try:
+            result = await cache_get_or_set(
+                redis=self._get_redis(),
+                key=key,
+                fetch=_fetch,
+                ttl_seconds=PARSE_CACHE_TTL_SECONDS,
+            )
+        except _ParseFailed:
+            return None
+        return result if isinstance(result, str) else None
+
+    def _parse_cache_key(self, raw_content: str, page_url: str) -> str:
+        return make_cache_key(PARSE_CACHE_PREFIX, (self._model, "|", page_url, "|", raw_content))
+
+    async def _cached_parses(self, keys: list[str]) -> list[Optional[str]]:
+        """Look up several parse-cache entries in one round-trip; misses come back as None."""
+        redis = self._get_redis()
+        if not keys or not redis.is_configured():
+            return [None] * len(keys)
+        try:
+            values = await redis.pipeline([["GET", key] for key in keys])
+        except (UpstashRedisError, httpx.HTTPError) as e:
+            print(f"[AI Parser] Parse cache unavailable ({e}).")
+            return [None] * len(keys)
+        cached: list[Optional[str]] = []
+        for value in values:
+            try:
+                parsed = orjson.loads(value) if value is not None else None
+            except orjson.JSONDecodeError:
+                parsed = None
+            cached.append(parsed if isinstance(parsed, str) else None)
+        return cached
+
+    async def _store_parses(self, entries: list[tuple[str, str]]):
+        """Cache (key, parsed content) pairs in one round-trip."""
+        redis = self._get_redis()
+        if not entries or not redis.is_configured():
+            return
+        try:
+            await redis.pipeline([
+                ["SET", key, orjson.dumps(parsed).decode(), "EX", PARSE_CACHE_TTL_SECONDS]
+                for key, parsed in entries
+            ])
+        except (UpstashRedisError, httpx.HTTPError) as e:
+            print(f"[AI Parser] Could not cache parsed pages ({e}).")
+
+    async def _parse_content_uncached_async(
+        self,
+        raw_content: str,
+        page_url: str,
+        page_index: Optional[int],
+        page_total: Optional[int],
+    ) -> Optional[str]:
 
-Cleaned content:"""
+        raw_content, prompt, estimated_tokens = self._prepare_request(
+            raw_content, page_url, page_index, page_total
+        )
 
-        client = self._get_client()
+        try:
+            await self._wait_for_budget_async(estimated_tokens)
+        except RuntimeError as e:
+            print(f"[AI Parser] {e}")
+            return None
+
+        client = self._get_async_client()
 
-        # Retry logic with exponential backoff
         max_retries = 5
         base_backoff = 2.0
 
         for attempt in range(max_retries):
             try:
-                completion = client.chat.completions.create(
-                    model=self._model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=self._temperature,
-                    max_completion_tokens=self._max_tokens,
-                    top_p=1,
-                    stream=False,
-                )
-
-                result = completion.choices[0].message.content
-                if not result or result.strip() == "NO_VALID_CONTENT":
-                    return None
-
-                print(f"[AI Parser] ✓ Parsed: {page_url[:60]}...")
-                return result.strip()
+                completion = await client.chat.completions.create(**self._completion_kwargs(prompt))
+                return self._handle_completion(completion, page_url)
 
             except Exception as e:
-                error_str = str(e).lower()
+                kind, retry_after = self._classify_error(e)
 
-                # Check for rate limit errors
-                if "429" in error_str or "rate limit" in error_str or "too many requests" in error_str:
-                    backoff = base_backoff ** (attempt + 1)
+                if kind == "rate_limit":
+                    backoff = retry_after if retry_after is not None else base_backoff ** (attempt + 1)
                     print(f"[AI Parser] Rate limited. Backing off {backoff:.1f}s (attempt {attempt + 1}/{max_retries})")
-                    self._sleep_with_jitter(backoff)
+                    await asyncio.sleep(backoff)
                     continue
 
-                # Check for token limit errors
-                if "token" in error_str and ("limit" in error_str or "exceed" in error_str):
+                if kind == "token_limit":
                     print(f"[AI Parser] Token limit exceeded: {e}")
-                    # Try with smaller input
                     if len(raw_content) > 3000:
-                        return self.parse_content(raw_content[:3000], page_url)
+                        return await self._parse_content_uncached_async(raw_content[:3000], page_url, None, None)
+                    return None
+
+                if kind == "fatal":
+                    print(f"[AI Parser] ✗ Request rejected: {e}")
                     return None
 
-                # Other errors - retry once then give up
                 if attempt < max_retries - 1:
                     print(f"[AI Parser] Error: {e}. Retrying...")
-                    self._sleep_with_jitter(1.0)
+                    await asyncio.sleep(1.0)
                     continue
 
                 print(f"[AI Parser] ✗ Failed after {max_retries} attempts: {e}")
@@ -238,27 +658,175 @@ Cleaned content:"""
 
         return None
 
+    def _build_batch_prompt(self, pages: list[tuple[str, str]]) -> str:
+        """Pack several pages into one prompt with numbered delimiters."""
+        parts = [self._BATCH_PROMPT_HEAD]
+        for i, (raw_content, page_url) in enumerate(pages):
+            parts.append(f"<<<PAGE {i}>>> {page_url}\n{raw_content}\n<<<END {i}>>>")
+        return "\n\n".join(parts)
+
+    def _prepare_group_request(self, pages: list[tuple[str, str]]) -> tuple[dict, int]:
+        """Build (completion kwargs, estimated_tokens) for a batched group of pages."""
+        trimmed = [
+            (raw if len(raw) <= MAX_INPUT_CHARS else raw[:MAX_INPUT_CHARS], url)
+            for raw, url in pages
+        ]
+        max_completion = self._max_tokens * len(trimmed)
+        estimated_tokens = sum(self._estimate_tokens(raw) for raw, _ in trimmed) + max_completion
+
+        kwargs = self._completion_kwargs(self._build_batch_prompt(trimmed))
+        kwargs["max_completion_tokens"] = max_completion
+        return kwargs, estimated_tokens
+
+    def _map_group_response(self, content: Optional[str], page_count: int) -> list[Optional[str]]:
+        payload = orjson.loads(content or "{}")
+        results: list[Optional[str]] = [None] * page_count
+        for item in payload.get("pages", []) if isinstance(payload, dict) else []:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index")
+            text = item.get("content")
+            if not isinstance(index, int) or not 0 <= index < page_count or not item.get("valid"):
+                continue
+            if isinstance(text, str) and text.strip():
+                results[index] = text.strip()
+        return results
+
+    def _parse_page_group(self, pages: list[tuple[str, str]]) -> Optional[list[Optional[str]]]:
+        """
+        Parse a group of pages with a single chat completion.
+
+        Returns one entry per page, or None if the batched call failed and the
+        caller should fall back to per-page parsing.
+        """
+        kwargs, estimated_tokens = self._prepare_group_request(pages)
+        try:
+            self._wait_for_budget(estimated_tokens)
+        except RuntimeError as e:
+            print(f"[AI Parser] {e}")
+            return [None] * len(pages)
+
+        try:
+            completion = self._get_client().chat.completions.create(**kwargs)
+            return self._map_group_response(completion.choices[0].message.content, len(pages))
+        except Exception as e:
+            print(f"[AI Parser] Batched parse failed ({e}). Falling back to per-page parsing.")
+            return None
+
+    async def _parse_page_group_async(self, pages: list[tuple[str, str]]) -> Optional[list[Optional[str]]]:
+        """Async version of _parse_page_group."""
+        kwargs, estimated_tokens = self._prepare_group_request(pages)
+        try:
+            await self._wait_for_budget_async(estimated_tokens)
+        except RuntimeError as e:
+            print(f"[AI Parser] {e}")
+            return [None] * len(pages)
+
+        try:
+            completion = await self._get_async_client().chat.completions.create(**kwargs)
+            return self._map_group_response(completion.choices[0].message.content, len(pages))
+        except Exception as e:
+            print(f"[AI Parser] Batched parse failed ({e}). Falling back to per-page parsing.")
+            return None
+
+    def _group_pages(
+        self, contents: list[tuple[str, str]], indexes: Optional[list[int]] = None
+    ) -> list[list[int]]:
+        """Split page indexes (all of them by default) into groups bounded by batch_max_pages and the TPM budget."""
+        groups: list[list[int]] = []
+        current: list[int] = []
+        current_tokens = 0
+        for i in range(len(contents)) if indexes is None else indexes:
+            raw_content = contents[i][0]
+            if not raw_content or not raw_content.strip():
+                continue
+            tokens = self.estimate_request_tokens(raw_content)
+            if current and (
+                len(current) >= self._batch_max_pages
+                or (current_tokens + tokens) > self._tpm_limit
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
     def parse_batch(self, contents: list[tuple[str, str]]) -> list[tuple[str, Optional[str]]]:
         """
         Parse multiple raw contents with rate limiting.
 
+        Pages are packed into groups (bounded by batch_max_pages and the TPM
+        budget) and each group is parsed with a single chat completion, so one
+        request's RPM cost covers several pages.
+
         Args:
             contents: List of (raw_content, page_url) tuples
 
         Returns:
             List of (page_url, parsed_content or None) tuples
         """
-        results = []
-        for i, (raw_content, page_url) in enumerate(contents):
-            print(f"[AI Parser] Processing {i+1}/{len(contents)}: {page_url[:50]}...")
-            parsed = self.parse_content(raw_content, page_url)
-            results.append((page_url, parsed))
+        groups = self._group_pages(contents)
+
+        parsed: list[Optional[str]] = [None] * len(contents)
+        for n, group in enumerate(groups):
+            print(f"[AI Parser] Processing batch {n+1}/{len(groups)}: {len(group)} pages")
+            if len(group) > 1:
+                group_results = self._parse_page_group([contents[i] for i in group])
+                if group_results is not None:
+                    for i, result in zip(group, group_results):
+                        parsed[i] = result
+                    continue
+            for i in group:
+                raw_content, page_url = contents[i]
+                parsed[i] = self.parse_content(raw_content, page_url)
 
-            # Small delay between requests to stay within RPM
-            if i < len(contents) - 1:
-                self._sleep_with_jitter(2.5)  # ~24 requests per minute
+        return [(page_url, parsed[i]) for i, (_, page_url) in enumerate(contents)]
 
-        return results
+
+    async def parse_batch_async(self, contents: list[tuple[str, str]]) -> list[tuple[str, Optional[str]]]:
+        """
+        Async version of parse_batch.
+
+        Groups are parsed concurrently with asyncio.gather, bounded by a
+        semaphore of rpm_limit // 2 in-flight requests; the RPM/TPM buckets
+        still throttle proactively. Pages already in the parse cache are
+        answered from it and left out of the groups.
+        """
+        keys = [self._parse_cache_key(raw_content, page_url) for raw_content, page_url in contents]
+        parsed = await self._cached_parses(keys)
+        misses = [i for i, result in enumerate(parsed) if result is None]
+        if len(misses) < len(contents):
+            print(f"[AI Parser] {len(contents) - len(misses)}/{len(contents)} pages served from cache")
+        groups = self._group_pages(contents, misses)
+        semaphore = asyncio.Semaphore(max(1, self._rpm_limit // 2))
+
+        async def _parse_group(group: list[int]):
+            if len(group) > 1:
+                group_results = await self._parse_page_group_async([contents[i] for i in group])
+                if group_results is not None:
+                    for i, result in zip(group, group_results):
+                        parsed[i] = result
+                    await self._store_parses([
+                        (keys[i], result) for i, result in zip(group, group_results) if result
+                    ])
+                    return
+            for i in group:
+                raw_content, page_url = contents[i]
+                parsed[i] = await self.parse_content_async(raw_content, page_url)
+
+        async def _run_group(n: int, group: list[int]):
+            async with semaphore:
+                print(f"[AI Parser] Processing batch {n+1}/{len(groups)}: {len(group)} pages")
+                try:
+                    await _parse_group(group)
+                except Exception as e:
+                    # One failing group leaves its pages unparsed, not the whole batch
+                    print(f"[AI Parser] ✗ Batch {n+1}/{len(groups)} failed: {e}")
+
+        await asyncio.gather(*(_run_group(n, group) for n, group in enumerate(groups)))
+        return [(page_url, parsed[i]) for i, (_, page_url) in enumerate(contents)]
 
 
 # Singleton instance
@@ -1,5 +1,10 @@
 import os
 import time
+import base64
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional
 
 try:
@@ -7,9 +12,27 @@ try:
 except ModuleNotFoundError:  # pragma: no cover
     tiktoken = None
 import httpx
+import numpy as np
+import orjson
 
 from backend.config import EMBEDDING
-from backend.core.request_counter import increment_embedding_count
+from backend.core.http_client import HTTP2_AVAILABLE
+from backend.core.request_counter import add_embedding_tokens_used, increment_embedding_count
+from backend.core.token_bucket import TokenBucket
+
+# Token counts per chunk, shared across Embedder instances. Overlapping
+# chunkers and re-ingests produce the same texts repeatedly, so counting each
+# one once saves tokenizer work. Keyed by (encoding name, hash(text)); str
+# hashes are cached by CPython, so lookups don't rescan the text.
+_TOKEN_COUNT_CACHE_SIZE = 1 << 16
+_token_count_cache: "OrderedDict[tuple[str, int], int]" = OrderedDict()
+_token_count_lock = threading.Lock()
+
+
+@functools.cache
+def _get_encoder(name: str):
+    """Load a tiktoken encoding once per process and share it across Embedders."""
+    return tiktoken.get_encoding(name)
 
 
 class Embedder:
@@ -19,37 +42,75 @@ class Embedder:
             raise RuntimeError("Missing JINA_API_KEY environment variable")
 
         self._endpoint = os.getenv("JINA_EMBEDDINGS_URL", "https://api.jina.ai/v1/embeddings")
-        self._http = httpx.Client(timeout=httpx.Timeout(60.0, connect=20.0))
+        # One pooled keep-alive client for every batch; HTTP/2 when h2 is installed.
+        self._http = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=httpx.Timeout(60.0, connect=20.0),
+        )
+        self._headers = {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",
+        }
         self.model = EMBEDDING["model"]
         self.task_doc = EMBEDDING["task_doc"]
         self.task_query = EMBEDDING["task_query"]
         self.batch_size = EMBEDDING["batch_size"]
         self.dimensions = EMBEDDING["dimensions"]
+        self.wire_format = EMBEDDING.get("wire_format", "base64")
+        # Serialized request body up to the "input" field, per task
+        self._payload_prefixes: dict[str, bytes] = {}
 
         self._rpm_limit = int(os.getenv("JINA_EMBED_RPM", "100"))
         self._tpm_limit = int(os.getenv("JINA_EMBED_TPM", "100000"))
         self._window_seconds = 60
-        self._window_start = time.time()
-        self._window_requests = 0
-        self._window_tokens = 0
+        self._rpm_bucket = TokenBucket(self._rpm_limit, self._window_seconds)
+        self._tpm_bucket = TokenBucket(self._tpm_limit, self._window_seconds)
+
+        # The encoder itself is loaded on first use (see _tokenizer)
+        self._tokenizer_name = os.getenv("EMBED_TOKENIZER", "cl100k_base")
 
-        self._tokenizer = None
-        if tiktoken is not None:
-            self._tokenizer = tiktoken.get_encoding(os.getenv("EMBED_TOKENIZER", "cl100k_base"))
+    @property
+    def _tokenizer(self):
+        if tiktoken is None:
+            return None
+        return _get_encoder(self._tokenizer_name)
 
     def _estimate_tokens(self, texts: List[str]) -> int:
         # Best effort:
         # - Prefer a real tokenizer (tiktoken) when installed.
         # - Fallback to a conservative heuristic (~4 chars per token).
-        if self._tokenizer is None:
+        tokenizer = self._tokenizer
+        if tokenizer is None:
             total_chars = sum(len(t or "") for t in texts)
             return max(1, total_chars // 4)
 
+        encoding = self._tokenizer_name
         total = 0
-        for t in texts:
-            if not t:
-                continue
-            total += len(self._tokenizer.encode(t))
+        misses: List[str] = []
+        with _token_count_lock:
+            for t in texts:
+                if not t:
+                    continue
+                key = (encoding, hash(t))
+                count = _token_count_cache.get(key)
+                if count is None:
+                    misses.append(t)
+                else:
+                    _token_count_cache.move_to_end(key)
+                    total += count
+
+        if misses:
+            # encode_batch tokenizes on tiktoken's thread pool (GIL released)
+            # instead of paying one Python -> Rust call per text.
+            encoded = tokenizer.encode_batch(misses, num_threads=os.cpu_count() or 4)
+            with _token_count_lock:
+                for t, tokens in zip(misses, encoded):
+                    total += len(tokens)
+                    _token_count_cache[(encoding, hash(t))] = len(tokens)
+                while len(_token_count_cache) > _TOKEN_COUNT_CACHE_SIZE:
+                    _token_count_cache.popitem(last=False)
+
         return max(1, total)
 
     def _sleep_with_jitter(self, seconds: float):
@@ -67,48 +128,65 @@ class Embedder:
             return None
 
     def _wait_for_budget(self, requests_cost: int, tokens_cost: int):
-        now = time.time()
-        elapsed = now - self._window_start
-        if elapsed >= self._window_seconds:
-            self._window_start = time.time()
-            self._window_requests = 0
-            self._window_tokens = 0
-
-        exceeds_rpm = (self._window_requests + requests_cost) > self._rpm_limit
-        exceeds_tpm = (self._window_tokens + tokens_cost) > self._tpm_limit
+        """
+        Block until RPM/TPM budget is available, then reserve it.
 
-        if not (exceeds_rpm or exceeds_tpm):
-            return
+        Waits only as long as the token buckets need to refill for this
+        request, rather than for a fixed delay or a whole window.
+        """
+        while True:
+            sleep_for = self._rpm_bucket.try_acquire(requests_cost)
+            if sleep_for <= 0:
+                sleep_for = self._tpm_bucket.try_acquire(tokens_cost)
+                if sleep_for <= 0:
+                    return
+                self._rpm_bucket.refund(requests_cost)
+                reason = "TPM"
+            else:
+                reason = "RPM"
 
-        reason = "RPM" if exceeds_rpm else "TPM"
-        sleep_for = (self._window_start + self._window_seconds) - now
-        if sleep_for > 0:
             print(f"[DEBUG] Rate limit budget reached ({reason}). Sleeping {sleep_for:.2f}s...")
             self._sleep_with_jitter(sleep_for)
 
-        self._window_start = time.time()
-        self._window_requests = 0
-        self._window_tokens = 0
-
-    def _embed_batch(self, batch: List[str], task: str) -> tuple[List[List[float]], Optional[int]]:
-        payload = {
-            "model": self.model,
-            "input": batch,
-            "task": task,
-            "dimensions": self.dimensions,
-            "truncate": False,
-            "embedding_type": "float",
-        }
-
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-        }
+    def _settle_tokens(self, estimated_tokens: int, prompt_tokens: Optional[int]):
+        """Correct the TPM reservation with the token count Jina reported."""
+        if isinstance(prompt_tokens, int) and prompt_tokens >= 0:
+            self._tpm_bucket.adjust(estimated_tokens - prompt_tokens)
+
+    def _payload_prefix(self, task: str) -> bytes:
+        """Pre-serialized JSON for the fields that never change between batches."""
+        prefix = self._payload_prefixes.get(task)
+        if prefix is None:
+            static = orjson.dumps({
+                "model": self.model,
+                "task": task,
+                "dimensions": self.dimensions,
+                "truncate": False,
+                "embedding_type": self.wire_format,
+            })
+            prefix = static[:-1] + b',"input":'
+            self._payload_prefixes[task] = prefix
+        return prefix
+
+    def _embed_batch(
+        self,
+        batch: List[str],
+        task: str,
+        out: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, Optional[int]]:
+        """
+        Embed one batch. Rows are written into `out` when given (a
+        (len(batch), dimensions) view of the caller's result array), otherwise
+        into a freshly allocated array.
+        """
+        # Only "input" varies per batch: splice it onto the cached prefix
+        # instead of rebuilding and re-encoding the whole payload dict.
+        body = self._payload_prefix(task) + orjson.dumps(batch) + b"}"
 
         attempt = 0
         while True:
             attempt += 1
-            resp = self._http.post(self._endpoint, headers=headers, json=payload)
+            resp = self._http.post(self._endpoint, headers=self._headers, content=body)
 
             if resp.status_code == 429:
                 retry_after_s = self._get_retry_after_seconds(resp)
@@ -119,100 +197,106 @@ class Embedder:
 
             resp.raise_for_status()
 
-            body = resp.json()
+            body = orjson.loads(resp.content)
             usage = body.get("usage", {})
             prompt_tokens = usage.get("prompt_tokens")
             print(f"[DEBUG] Jina API usage response: {usage}")
             print(f"[DEBUG] prompt_tokens type: {type(prompt_tokens)}, value: {prompt_tokens}")
             
-            # Calculate remaining tokens based on 100000 TPM limit since Jina free tier doesn't send headers
+            # Token usage is accumulated in memory and flushed to the counter
+            # file by a background thread, keeping disk I/O off this path.
             if isinstance(prompt_tokens, int) and prompt_tokens >= 0:
-                print(f"[DEBUG] Token tracking condition met")
-                # Track actual tokens used and calculate remaining from 100000 limit
-                from backend.core.request_counter import _load_counter, _save_counter, get_today_date
-                counter = _load_counter()
-                today = get_today_date()
-                if counter.get("date") != today:
-                    counter = {"date": today, "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_used": 0, "embedding_tokens_remaining": 100000}
-                if "embedding_tokens_used" not in counter:
-                    counter["embedding_tokens_used"] = 0
-                counter["embedding_tokens_used"] += prompt_tokens
-                # Calculate remaining (100000 is Jina's TPM limit)
-                remaining = max(0, 100000 - counter["embedding_tokens_used"])
-                counter["embedding_tokens_remaining"] = remaining
-                _save_counter(counter)
-                print(f"[DEBUG] Tokens used: {counter['embedding_tokens_used']}, Remaining: {remaining}")
+                add_embedding_tokens_used(prompt_tokens)
             else:
                 print(f"[DEBUG] Token tracking skipped - prompt_tokens condition not met")
 
+            # Rows go straight into one contiguous float32 matrix instead of a
+            # list of Python float lists (4 bytes per value instead of ~32).
             data = body.get("data", [])
-            embeddings: List[List[float]] = []
-            for item in data:
+            if out is None:
+                embeddings = np.empty((len(data), self.dimensions), dtype=np.float32)
+            elif len(data) != len(out):
+                raise RuntimeError(f"Jina returned {len(data)} embeddings for {len(out)} inputs")
+            else:
+                embeddings = out
+            for row, item in enumerate(data):
                 vec = item.get("embedding")
-                if not isinstance(vec, list):
+                if self.wire_format == "base64" and isinstance(vec, str):
+                    vec = np.frombuffer(base64.b64decode(vec), dtype="<f4")
+                elif not isinstance(vec, list):
                     raise RuntimeError("Unexpected Jina embeddings response format")
-                embeddings.append(vec)
+                if len(vec) != self.dimensions:
+                    raise RuntimeError("Unexpected Jina embeddings response format")
+                embeddings[row] = vec
             return embeddings, prompt_tokens
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Embed a list of documents in batches."""
-        all_embeddings = []
-
-        i = 0
-        while i < len(texts):
-            batch = texts[i:i + self.batch_size]
-            estimated_tokens = self._estimate_tokens(batch)
-            print(f"[DEBUG] Batch: {len(batch)} chunks, ~{estimated_tokens} tokens. "
-                  f"Usage: {self._window_requests}/{self._rpm_limit} req, "
-                  f"{self._window_tokens}/{self._tpm_limit} tokens")
-
-            if estimated_tokens > self._tpm_limit and len(batch) > 1:
-                shrink_ratio = max(0.01, self._tpm_limit / float(estimated_tokens))
-                new_size = max(1, int(len(batch) * shrink_ratio))
-                batch = texts[i:i + new_size]
-                estimated_tokens = self._estimate_tokens(batch)
-                print(f"[DEBUG] Batch too large for TPM. Shrunk to {len(batch)} chunks.")
-
-            self._wait_for_budget(requests_cost=1, tokens_cost=estimated_tokens)
-
-            # Reserve budget immediately
-            self._window_requests += 1
-            self._window_tokens += estimated_tokens
-
-            print(f"[DEBUG] Sending batch {i//self.batch_size + 1}: {len(batch)} chunks, ~{estimated_tokens} tokens to Jina API...")
-
-            embeddings, prompt_tokens = self._embed_batch(batch=batch, task=self.task_doc)
-            for vec in embeddings:
-                all_embeddings.append(vec)
-
-            if isinstance(prompt_tokens, int) and prompt_tokens >= 0:
-                self._window_tokens += (prompt_tokens - estimated_tokens)
-
-            increment_embedding_count(requests_count=1, chunks_count=len(batch))
-
-            i += len(batch)
-
-            if i < len(texts):
-                print("[DEBUG] Waiting 3s before next batch...")
-                self._sleep_with_jitter(3)
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed a list of documents in batches.
+
+        Returns a (len(texts), dimensions) float32 array.
+        """
+        all_embeddings = np.empty((len(texts), self.dimensions), dtype=np.float32)
+
+        # Tokenizing the next batch runs on a worker thread while the current
+        # batch's HTTP request is in flight (tiktoken releases the GIL).
+        next_estimate: Optional[Future] = None
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            i = 0
+            while i < len(texts):
+                batch = texts[i:i + self.batch_size]
+                if next_estimate is not None:
+                    estimated_tokens = next_estimate.result()
+                    next_estimate = None
+                else:
+                    estimated_tokens = self._estimate_tokens(batch)
+                print(f"[DEBUG] Batch: {len(batch)} chunks, ~{estimated_tokens} tokens. "
+                      f"Budget: {self._rpm_bucket.available():.0f}/{self._rpm_limit} req, "
+                      f"{self._tpm_bucket.available():.0f}/{self._tpm_limit} tokens")
+
+                if estimated_tokens > self._tpm_limit and len(batch) > 1:
+                    shrink_ratio = max(0.01, self._tpm_limit / float(estimated_tokens))
+                    new_size = max(1, int(len(batch) * shrink_ratio))
+                    batch = texts[i:i + new_size]
+                    estimated_tokens = self._estimate_tokens(batch)
+                    print(f"[DEBUG] Batch too large for TPM. Shrunk to {len(batch)} chunks.")
+
+                # Reserves budget; sleeps only if the buckets are short
+                self._wait_for_budget(requests_cost=1, tokens_cost=estimated_tokens)
+
+                next_i = i + len(batch)
+                if next_i < len(texts):
+                    next_estimate = pool.submit(
+                        self._estimate_tokens, texts[next_i:next_i + self.batch_size]
+                    )
+
+                print(f"[DEBUG] Sending batch {i//self.batch_size + 1}: {len(batch)} chunks, ~{estimated_tokens} tokens to Jina API...")
+
+                # Rows are decoded straight into the preallocated result
+                _, prompt_tokens = self._embed_batch(
+                    batch=batch,
+                    task=self.task_doc,
+                    out=all_embeddings[i:i + len(batch)],
+                )
+
+                self._settle_tokens(estimated_tokens, prompt_tokens)
+
+                increment_embedding_count(requests_count=1, chunks_count=len(batch))
+
+                i = next_i
 
         return all_embeddings
 
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str) -> np.ndarray:
         """Embed a single query."""
         estimated_tokens = self._estimate_tokens([query])
         self._wait_for_budget(requests_cost=1, tokens_cost=estimated_tokens)
 
-        self._window_requests += 1
-        self._window_tokens += estimated_tokens
-
         embeddings, prompt_tokens = self._embed_batch(batch=[query], task=self.task_query)
-        if isinstance(prompt_tokens, int) and prompt_tokens >= 0:
-            self._window_tokens += (prompt_tokens - estimated_tokens)
+        self._settle_tokens(estimated_tokens, prompt_tokens)
 
         # Track embedding usage: 1 API request, 1 embedded chunk.
         increment_embedding_count(requests_count=1, chunks_count=1)
 
-        if not embeddings:
+        if len(embeddings) == 0:
             raise RuntimeError("No embedding returned for query")
         return embeddings[0]
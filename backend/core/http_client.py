@@ -0,0 +1,5 @@
+try:
+    import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+    HTTP2_AVAILABLE = True
+except ModuleNotFoundError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
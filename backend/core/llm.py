@@ -1,9 +1,74 @@
 import os
-import json
-from typing import Generator
+import re
+from typing import Generator, Iterator
 import httpx
+import orjson
+from backend.core.http_client import HTTP2_AVAILABLE
 from backend.config import LLM
 
+try:
+    import simdjson
+except ModuleNotFoundError:  # pragma: no cover
+    simdjson = None
+
+
+# JSON pointers to the generated text in Cloudflare AI and OpenAI-style payloads
+_STREAM_TEXT_POINTERS = ("/response", "/choices/0/delta/content")
+
+_THINK_OPEN_RE = re.compile(r"<think(?:ing)?>")
+_THINK_CLOSE_RE = re.compile(r"</think(?:ing)?>")
+# Characters kept between fragments so a closing tag split across two
+# streamed fragments is still found
+_THINK_CARRY = len("</thinking>") - 1
+
+
+def _debug_enabled() -> bool:
+    # Per-stream progress is printed only when LLM_DEBUG=1
+    return os.getenv("LLM_DEBUG") == "1"
+
+
+class _ThinkingFilter:
+    """Strips <think>...</think> / <thinking>...</thinking> blocks from a stream.
+
+    Holds per-stream state. Thinking content itself is never buffered — only
+    enough trailing characters to catch a closing tag split across fragments —
+    so each fragment is scanned once regardless of how long the block runs.
+    """
+
+    __slots__ = ("in_thinking", "_carry")
+
+    def __init__(self):
+        self.in_thinking = False
+        self._carry = ""
+
+    def feed(self, text: str) -> str:
+        """Return the part of `text` that lies outside thinking blocks."""
+        # Most fragments carry no markup at all: pass them straight through
+        if not self.in_thinking and "<" not in text:
+            return text
+        out = []
+        while text:
+            if self.in_thinking:
+                window = self._carry + text
+                match = _THINK_CLOSE_RE.search(window)
+                if match is None:
+                    # Still in thinking, don't output
+                    self._carry = window[-_THINK_CARRY:]
+                    break
+                self.in_thinking = False
+                self._carry = ""
+                text = window[match.end():].lstrip()
+            else:
+                match = _THINK_OPEN_RE.search(text)
+                if match is None:
+                    out.append(text)
+                    break
+                # Output text before thinking
+                out.append(text[:match.start()])
+                self.in_thinking = True
+                text = text[match.end():]
+        return "".join(out)
+
 
 class LLMWrapper:
     def __init__(self):
@@ -13,6 +78,12 @@ class LLMWrapper:
         self.max_tokens = LLM["max_tokens"]
         self.temperature = LLM["temperature"]
         self.stream = LLM["stream"]
+        # One pooled client for every call so the TLS connection to the worker
+        # is reused instead of re-established per request
+        self._client = httpx.Client(http2=HTTP2_AVAILABLE, timeout=120.0)
+
+    def close(self) -> None:
+        self._client.close()
 
     def generate_stream(
         self,
@@ -31,128 +102,118 @@ class LLMWrapper:
         }
 
         url = f"{self.worker_url}/chat"
-        print(f"[LLM] Starting stream to {url}", flush=True)
+        debug = _debug_enabled()
+        if debug:
+            print(f"[LLM] Starting stream to {url}", flush=True)
         
-        # Track if we're inside a thinking block
-        in_thinking = False
-        thinking_buffer = ""
+        # simdjson parsers reuse their buffers but aren't thread-safe, so each
+        # stream gets its own
+        parser = simdjson.Parser() if simdjson is not None else None
+
+        # Filters out thinking blocks
+        thinking = _ThinkingFilter()
         
         try:
-            with httpx.Client(timeout=120.0) as client:
-                print("[LLM] Client created, sending request...", flush=True)
-                with client.stream(
-                    "POST",
-                    url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
+            with self._client.stream(
+                "POST",
+                url,
+                json=payload,
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                if debug:
                     print(f"[LLM] Response status: {response.status_code}", flush=True)
-                    chunk_count = 0
-                    for line in response.iter_lines():
-                        if not line:
-                            continue
-                        # Cloudflare AI streaming format
-                        if line.startswith("data:"):
-                            data_str = line[5:].strip()
-                            if data_str == "[DONE]":
-                                break
-                            try:
-                                data = json.loads(data_str)
-                                # Cloudflare AI format: {"response": "text"} or OpenAI format
-                                raw_text = ""
-                                if "response" in data:
-                                    raw_text = data["response"]
-                                elif "choices" in data and len(data["choices"]) > 0:
-                                    delta = data["choices"][0].get("delta", {})
-                                    raw_text = delta.get("content", "")
-                                
-                                if raw_text:
-                                    # Filter out thinking blocks
-                                    filtered = self._filter_thinking(raw_text, in_thinking, thinking_buffer)
-                                    in_thinking = filtered["in_thinking"]
-                                    thinking_buffer = filtered["buffer"]
-                                    text = filtered["text"]
-                                    
-                                    if text:
-                                        chunk_count += 1
-                                        yield text
-                            except json.JSONDecodeError:
-                                # Raw text response
-                                if data_str and data_str != "[DONE]":
-                                    filtered = self._filter_thinking(data_str, in_thinking, thinking_buffer)
-                                    in_thinking = filtered["in_thinking"]
-                                    thinking_buffer = filtered["buffer"]
-                                    if filtered["text"]:
-                                        chunk_count += 1
-                                        yield filtered["text"]
-                        else:
-                            # Handle raw text lines (non-SSE format)
-                            try:
-                                data = json.loads(line)
-                                if "response" in data:
-                                    filtered = self._filter_thinking(data["response"], in_thinking, thinking_buffer)
-                                    in_thinking = filtered["in_thinking"]
-                                    thinking_buffer = filtered["buffer"]
-                                    if filtered["text"]:
-                                        chunk_count += 1
-                                        yield filtered["text"]
-                            except json.JSONDecodeError:
-                                if line.strip():
-                                    filtered = self._filter_thinking(line, in_thinking, thinking_buffer)
-                                    in_thinking = filtered["in_thinking"]
-                                    thinking_buffer = filtered["buffer"]
-                                    if filtered["text"]:
-                                        chunk_count += 1
-                                        yield filtered["text"]
+                chunk_count = 0
+                for line in self._iter_byte_lines(response):
+                    if not line:
+                        continue
+                    # Cloudflare AI streaming format
+                    if line.startswith(b"data:"):
+                        data_bytes = line[5:].strip()
+                        if data_bytes == b"[DONE]":
+                            break
+                        try:
+                            raw_text = self._extract_stream_text(parser, data_bytes)
+
+                            if raw_text:
+                                text = thinking.feed(raw_text)
+                                if text:
+                                    chunk_count += 1
+                                    yield text
+                        except ValueError:
+                            # Raw text response
+                            if data_bytes:
+                                data_str = data_bytes.decode("utf-8", errors="replace")
+                                text = thinking.feed(data_str)
+                                if text:
+                                    chunk_count += 1
+                                    yield text
+                    else:
+                        # Handle raw text lines (non-SSE format)
+                        try:
+                            data = orjson.loads(line)
+                            if isinstance(data, dict) and "response" in data:
+                                text = thinking.feed(data["response"])
+                                if text:
+                                    chunk_count += 1
+                                    yield text
+                        except orjson.JSONDecodeError:
+                            if line.strip():
+                                text = thinking.feed(line.decode("utf-8", errors="replace"))
+                                if text:
+                                    chunk_count += 1
+                                    yield text
+                if debug:
                     print(f"[LLM] Stream complete, {chunk_count} chunks", flush=True)
         except Exception as e:
             print(f"[LLM] Stream error: {e}", flush=True)
             yield f"[Error: {e}]"
     
-    def _filter_thinking(self, text: str, in_thinking: bool, buffer: str) -> dict:
-        """Filter out thinking/reasoning blocks from LLM output.
-        
-        Handles formats like:
-        - <think>...</think>
-        - <thinking>...</thinking>
-        - ### Thinking: ... ### Response:
+    @staticmethod
+    def _extract_stream_text(parser, data_bytes: bytes) -> str:
+        """Return the generated text from one JSON stream payload.
+
+        With simdjson only the text field is materialized; the rest of the
+        document is never turned into Python objects. Raises ValueError if the
+        payload is not JSON.
         """
-        result_text = ""
-        
-        # Check for thinking tags
-        if "<think>" in text or "<thinking>" in text:
-            in_thinking = True
-        
-        if in_thinking:
-            # Accumulate in buffer while in thinking mode
-            buffer += text
-            
-            # Check for end of thinking
-            if "</think>" in buffer or "</thinking>" in buffer:
-                # Extract text after thinking block
-                for end_tag in ["</think>", "</thinking>"]:
-                    if end_tag in buffer:
-                        idx = buffer.find(end_tag) + len(end_tag)
-                        result_text = buffer[idx:].strip()
-                        buffer = ""
-                        in_thinking = False
-                        break
-            # Still in thinking, don't output
-        else:
-            # Not in thinking block, output directly
-            # But check if we're starting one
-            for start_tag in ["<think>", "<thinking>"]:
-                if start_tag in text:
-                    idx = text.find(start_tag)
-                    result_text = text[:idx]  # Output text before thinking
-                    in_thinking = True
-                    buffer = text[idx:]
-                    break
-            else:
-                # No thinking tag, output as-is
-                result_text = text
-        
-        return {"text": result_text, "in_thinking": in_thinking, "buffer": buffer}
+        if parser is None:
+            data = orjson.loads(data_bytes)
+            # Cloudflare AI format: {"response": "text"} or OpenAI format
+            if "response" in data:
+                return data["response"]
+            if "choices" in data and len(data["choices"]) > 0:
+                return data["choices"][0].get("delta", {}).get("content", "")
+            return ""
+
+        doc = parser.parse(data_bytes)
+        for pointer in _STREAM_TEXT_POINTERS:
+            try:
+                return doc.at_pointer(pointer) or ""
+            except (KeyError, IndexError, TypeError, AttributeError):
+                continue
+        return ""
+
+    @staticmethod
+    def _iter_byte_lines(response: httpx.Response) -> Iterator[bytes]:
+        """Split a streamed response body into raw byte lines.
+
+        Unlike `iter_lines`, the lines are never decoded to str, so SSE payloads
+        go straight into orjson. Reads are taken as they arrive from the
+        socket: passing a chunk_size to iter_bytes would hold tokens back until
+        that many bytes had accumulated.
+        """
+        buf = bytearray()
+        for chunk in response.iter_bytes():
+            buf += chunk
+            start = 0
+            while (nl := buf.find(b"\n", start)) >= 0:
+                yield bytes(buf[start:nl]).rstrip(b"\r")
+                start = nl + 1
+            if start:
+                # One compaction per read instead of one copy per line
+                del buf[:start]
+        if buf:
+            yield bytes(buf).rstrip(b"\r")
 
     def generate(
         self,
@@ -172,11 +233,11 @@ class LLMWrapper:
 
         url = f"{self.worker_url}/chat"
         
-        with httpx.Client(timeout=60.0) as client:
-            response = client.post(
-                url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            # Worker returns plain text for non-streaming
-            return response.text
+        response = self._client.post(
+            url,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=60.0,
+        )
+        # Worker returns plain text for non-streaming
+        return response.text
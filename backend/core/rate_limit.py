@@ -1,6 +1,6 @@
 from fastapi import HTTPException
 
-from backend.core.upstash_redis import UpstashRedis
+from backend.core.upstash_redis import UpstashRedis, UpstashRedisError
 
 
 async def rate_limit_ip(
@@ -18,11 +18,30 @@ async def rate_limit_ip(
     key = f"{key_prefix}:{ip}:{window_seconds}"
 
     try:
-        count = await redis.incr(key)
-        if count == 1:
-            await redis.expire(key, window_seconds)
-    except Exception:
+        # One round-trip instead of INCR then EXPIRE. NX only sets the TTL when
+        # the key has none, so later hits don't push the window forward.
+        counted, expired = await redis.pipeline([
+            ["INCR", key],
+            ["EXPIRE", key, int(window_seconds), "NX"],
+        ], raise_errors=False)
+    except Exception as e:
+        print(f"[WARN] Rate limit check skipped for {key}: {e}")
+        return
+
+    if isinstance(counted, UpstashRedisError):
+        print(f"[WARN] Rate limit check skipped for {key}: {counted}")
         return
+    count = int(counted)
+
+    if isinstance(expired, UpstashRedisError):
+        # e.g. a server that rejects the NX flag; without a TTL the counter
+        # would never reset, so set it plainly when this hit opened the window
+        print(f"[WARN] EXPIRE NX failed for {key}: {expired}")
+        if count == 1:
+            try:
+                await redis.expire(key, window_seconds)
+            except Exception as e:
+                print(f"[WARN] Could not set rate limit window for {key}: {e}")
 
     if count > limit:
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
@@ -1,42 +1,130 @@
 import os
-import json
-from datetime import datetime
-from typing import Dict
+import time
+import atexit
+import threading
+from typing import Dict, Optional
+
+import orjson
 
 COUNTER_FILE = "./tmp/request_counter.json"
+os.makedirs(os.path.dirname(COUNTER_FILE), exist_ok=True)
+
+# Jina's free tier doesn't send rate-limit headers, so remaining tokens are
+# derived from this TPM limit and the tokens we've used today.
+EMBEDDING_TOKEN_LIMIT = 100000
 
+# Today's stats live in memory: the file is read once, updates and reads
+# never touch disk, and a background thread writes the state back at most
+# once per interval when it has changed.
+FLUSH_INTERVAL_SECONDS = 5.0
 
-def _ensure_dir():
-    os.makedirs(os.path.dirname(COUNTER_FILE), exist_ok=True)
+_state_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_state: Optional[Dict] = None
+_dirty = False
+_flusher: Optional[threading.Thread] = None
 
 
 def _load_counter() -> Dict:
-    _ensure_dir()
-    if os.path.exists(COUNTER_FILE):
-        with open(COUNTER_FILE, "r") as f:
-            data = json.load(f)
-            if "embedding_requests" not in data:
-                data["embedding_requests"] = 0
-            if "embedding_chunks" not in data:
-                data["embedding_chunks"] = 0
-            if "embedding_tokens_remaining" not in data:
-                data["embedding_tokens_remaining"] = None
-            if "embedding_tokens_used" not in data:
-                data["embedding_tokens_used"] = 0
-            if "date" not in data:
-                data["date"] = ""
-            return data
-    return {"date": "", "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_remaining": 100000, "embedding_tokens_used": 0}
+    # Single open+read; a missing file is the common first-run case, so no
+    # separate exists() check
+    try:
+        with open(COUNTER_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+    except FileNotFoundError:
+        return {"date": "", "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_remaining": 100000, "embedding_tokens_used": 0}
+
+    if "embedding_requests" not in data:
+        data["embedding_requests"] = 0
+    if "embedding_chunks" not in data:
+        data["embedding_chunks"] = 0
+    if "embedding_tokens_remaining" not in data:
+        data["embedding_tokens_remaining"] = None
+    if "embedding_tokens_used" not in data:
+        data["embedding_tokens_used"] = 0
+    if "date" not in data:
+        data["date"] = ""
+    return data
 
 
 def _save_counter(data: Dict):
-    _ensure_dir()
-    with open(COUNTER_FILE, "w") as f:
-        json.dump(data, f)
+    # Write to a temp file and swap it in so readers never see a partial file
+    tmp_path = f"{COUNTER_FILE}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(data))
+    os.replace(tmp_path, COUNTER_FILE)
+
+
+def _new_day_counter(today: str) -> Dict:
+    return {"date": today, "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_used": 0, "embedding_tokens_remaining": None}
+
+
+_cached_day_index = -1
+_cached_date = ""
 
 
 def get_today_date() -> str:
-    return datetime.utcnow().strftime("%Y-%m-%d")
+    # Called on every counter update; only reformat when the UTC day changes.
+    global _cached_day_index, _cached_date
+    day_index = int(time.time()) // 86400
+    if day_index != _cached_day_index:
+        _cached_date = time.strftime("%Y-%m-%d", time.gmtime(day_index * 86400))
+        _cached_day_index = day_index
+    return _cached_date
+
+
+def _current_state() -> Dict:
+    """Return today's in-memory counter, loading or rolling it over as needed.
+
+    Caller must hold `_state_lock`.
+    """
+    global _state, _dirty
+    if _state is None:
+        _state = _load_counter()
+    today = get_today_date()
+    if _state["date"] != today:
+        _state = _new_day_counter(today)
+        _dirty = True
+    return _state
+
+
+def _mark_dirty():
+    """Flag the state for the next flush, starting the flusher on first use.
+
+    Caller must hold `_state_lock`.
+    """
+    global _dirty, _flusher
+    _dirty = True
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_loop, name="request-counter-flush", daemon=True)
+        _flusher.start()
+        atexit.register(flush_pending)
+
+
+def flush_pending():
+    """Write the in-memory embedding stats to the counter file if they changed."""
+    global _dirty
+    with _flush_lock:
+        with _state_lock:
+            if not _dirty or _state is None:
+                return
+            snapshot = dict(_state)
+            _dirty = False
+        try:
+            _save_counter(snapshot)
+        except Exception:
+            with _state_lock:
+                _dirty = True
+            raise
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            flush_pending()
+        except Exception as e:
+            print(f"[WARN] Failed to flush request counter: {e}")
 
 
 def increment_embedding_count(requests_count: int = 1, chunks_count: int = 0):
@@ -45,37 +133,34 @@ def increment_embedding_count(requests_count: int = 1, chunks_count: int = 0):
     requests_count: number of embedding API calls made
     chunks_count: number of texts embedded across those calls
     """
-    counter = _load_counter()
-    today = get_today_date()
-    
-    # Reset if new day
-    if counter["date"] != today:
-        counter = {"date": today, "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_remaining": None}
-    
-    counter["embedding_requests"] += requests_count
-    counter["embedding_chunks"] += chunks_count
-    _save_counter(counter)
+    with _state_lock:
+        counter = _current_state()
+        counter["embedding_requests"] += requests_count
+        counter["embedding_chunks"] += chunks_count
+        _mark_dirty()
 
 
-def set_embedding_tokens_remaining(tokens_remaining: int):
-    """Set the last-seen remaining token budget for embeddings (from provider rate-limit headers)."""
-    counter = _load_counter()
-    today = get_today_date()
+def add_embedding_tokens_used(tokens: int):
+    """Record prompt tokens reported by the embedding provider."""
+    if not tokens:
+        return
+    with _state_lock:
+        counter = _current_state()
+        counter["embedding_tokens_used"] += tokens
+        counter["embedding_tokens_remaining"] = max(0, EMBEDDING_TOKEN_LIMIT - counter["embedding_tokens_used"])
+        _mark_dirty()
 
-    if counter["date"] != today:
-        counter = {"date": today, "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_remaining": None}
 
-    counter["embedding_tokens_remaining"] = tokens_remaining
-    _save_counter(counter)
+def set_embedding_tokens_remaining(tokens_remaining: int):
+    """Set the last-seen remaining token budget for embeddings (from provider rate-limit headers)."""
+    with _state_lock:
+        counter = _current_state()
+        counter["embedding_tokens_remaining"] = tokens_remaining
+        _mark_dirty()
 
 
 def get_embedding_stats() -> Dict:
     """Get today's embedding statistics."""
-    counter = _load_counter()
-    today = get_today_date()
-    
-    # Reset if new day
-    if counter["date"] != today:
-        return {"date": today, "embedding_requests": 0, "embedding_chunks": 0, "embedding_tokens_remaining": None}
-    
-    return counter
+    with _state_lock:
+        # Copy so callers can't mutate the live counter
+        return dict(_current_state())
@@ -1,19 +1,76 @@
 import os
 import re
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 import httpx
+import numpy as np
+import orjson
+from backend.core.http_client import HTTP2_AVAILABLE
 from backend.config import RETRIEVAL
 from backend.core.embedder import Embedder
 from backend.core.vector_store import VectorStore
 
+try:
+    import ahocorasick
+except ModuleNotFoundError:  # pragma: no cover
+    ahocorasick = None
+
 # Known code/doc file extensions — prevents version numbers like "2.5" being treated as filenames
-_CODE_EXTENSIONS = {
+_CODE_EXTENSIONS = frozenset({
     "py", "js", "ts", "tsx", "jsx", "java", "cpp", "c", "h", "hpp",
     "cs", "go", "rb", "rs", "php", "swift", "kt", "scala", "sh", "bash",
     "zsh", "fish", "ps1", "md", "txt", "rst", "yaml", "yml", "json",
     "toml", "ini", "cfg", "env", "html", "css", "scss", "sass", "vue",
     "sql", "graphql", "proto", "xml", "csv", "ipynb", "r", "m", "f90",
-}
+})
+
+_FILENAME_RE = re.compile(r'\b([\w.-]+?)\.(\w{1,10})\b')
+
+# Phrases that mark a query as asking about file metadata (count, list, etc)
+_METADATA_PATTERNS = (
+    "how many files",
+    "list files",
+    "what files",
+    "show files",
+    "files are there",
+    "number of files",
+    "count files",
+    "which files",
+)
+
+
+# Single-pass fallback when pyahocorasick isn't installed
+_METADATA_RE = re.compile("|".join(re.escape(p) for p in _METADATA_PATTERNS))
+
+
+def _build_metadata_automaton():
+    """Build an Aho-Corasick automaton matching all metadata phrases in one pass."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for pattern in _METADATA_PATTERNS:
+        automaton.add_word(pattern, pattern)
+    automaton.make_automaton()
+    return automaton
+
+
+_METADATA_AUTOMATON = _build_metadata_automaton()
+
+# Upper bound on concurrent per-source Milvus queries in get_file_listing
+_FILE_LISTING_WORKERS = 16
+
+# Recent query embeddings, so repeated queries (retries, regenerate, demo
+# traffic) skip the embedding round-trip
+_QUERY_CACHE_SIZE = 512
+_QUERY_CACHE_TTL_SECONDS = 300.0
+
+
+def _debug_enabled() -> bool:
+    # Per-query diagnostics are printed only when RETRIEVER_DEBUG=1
+    return os.getenv("RETRIEVER_DEBUG") == "1"
 
 
 class Retriever:
@@ -23,11 +80,26 @@ class Retriever:
         self.top_k_search = RETRIEVAL["top_k_search"]
         self.top_k_rerank = RETRIEVAL["top_k_rerank"]
         self.score_threshold = RETRIEVAL["score_threshold"]
+        self.rerank_max_chars = RETRIEVAL["rerank_max_chars"]
         self.voyage_api_key = os.getenv("VOYAGE_API_KEY")
+        # Pooled client so rerank calls reuse the TLS connection to Voyage
+        self._http = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+        self._query_cache: "OrderedDict[str, tuple[float, np.ndarray]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        self._http.close()
 
     def _extract_filename_from_query(self, query: str) -> Optional[str]:
         """Extract potential filename from query — only real code/doc extensions."""
-        for match in re.finditer(r'\b([\w.-]+?)\.(\w{1,10})\b', query):
+        # Most queries contain no dot at all — skip the regex for those
+        if "." not in query:
+            return None
+        for match in _FILENAME_RE.finditer(query):
             ext = match.group(2).lower()
             if ext in _CODE_EXTENSIONS:
                 return match.group(0)
@@ -36,17 +108,9 @@ class Retriever:
     def _is_metadata_query(self, query: str) -> bool:
         """Detect if query is asking about file metadata (count, list, etc)."""
         query_lower = query.lower()
-        metadata_patterns = [
-            "how many files",
-            "list files",
-            "what files",
-            "show files",
-            "files are there",
-            "number of files",
-            "count files",
-            "which files",
-        ]
-        return any(p in query_lower for p in metadata_patterns)
+        if _METADATA_AUTOMATON is not None:
+            return next(_METADATA_AUTOMATON.iter(query_lower), None) is not None
+        return _METADATA_RE.search(query_lower) is not None
 
     def get_file_listing(self, source_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get file listing for a source."""
@@ -55,9 +119,13 @@ class Retriever:
         # Get all files from all sources
         all_files = []
         sources = self.vector_store.get_all_sources()
-        for source_type, items in sources.items():
-            for item in items:
-                files = self.vector_store.get_source_files(item["name"])
+        names = [item["name"] for items in sources.values() for item in items]
+        if not names:
+            return all_files
+        # Each lookup is a Milvus round-trip; overlap them instead of paying
+        # for them one after another. map() keeps the original source order.
+        with ThreadPoolExecutor(max_workers=min(_FILE_LISTING_WORKERS, len(names))) as pool:
+            for files in pool.map(self.vector_store.get_source_files, names):
                 all_files.extend(files)
         return all_files
 
@@ -68,32 +136,46 @@ class Retriever:
     ) -> List[Dict[str, Any]]:
         """Search for relevant chunks and rerank them."""
         # Embed query
-        query_embedding = self.embedder.embed_query(query)
+        query_embedding = self._embed_query_cached(query)
         
         # Search vector store
+        # Metadata comes back with the hits: the filename boost and the rerank
+        # documents read file_path from every candidate, not just the kept ones
         results = self.vector_store.search(
             query_embedding=query_embedding,
             top_k=self.top_k_search,
-            source_types=source_types
+            source_types=source_types,
+            include_metadata=True
         )
         
-        print(f"[DEBUG] Vector search found {len(results)} results")
+        debug = _debug_enabled()
+        if debug:
+            print(f"[DEBUG] Vector search found {len(results)} results")
         
         # Boost results that match filename in query
         filename = self._extract_filename_from_query(query)
         if filename:
-            print(f"[DEBUG] Detected filename in query: {filename}")
+            if debug:
+                print(f"[DEBUG] Detected filename in query: {filename}")
+            # Vector store results are already score-sorted, so a stable
+            # partition puts boosted results first without re-sorting
+            boosted = []
+            rest = []
             for r in results:
-                file_path = r.get("metadata", {}).get("file_path", "")
+                file_path = (r.get("metadata") or {}).get("file_path", "")
                 if filename in file_path:
                     # Boost score by moving to front
                     r["boosted"] = True
-                    print(f"[DEBUG] Boosting result with file: {file_path}")
-            # Sort: boosted results first, then by original score
-            results.sort(key=lambda x: (not x.get("boosted", False), -x.get("score", 0)))
+                    boosted.append(r)
+                    if debug:
+                        print(f"[DEBUG] Boosting result with file: {file_path}")
+                else:
+                    rest.append(r)
+            results = boosted + rest
         
-        for r in results[:5]:
-            print(f"  - source: {r.get('source_name', '')}, file: {r.get('metadata', {}).get('file_path', 'N/A')}, text: {r.get('text', '')[:60]}...")
+        if debug:
+            for r in results[:5]:
+                print(f"  - source: {r.get('source_name', '')}, file: {r.get('metadata', {}).get('file_path', 'N/A')}, text: {r.get('text', '')[:60]}...")
         
         if not results:
             return []
@@ -101,9 +183,10 @@ class Retriever:
         # Rerank with Voyage AI
         reranked = self._rerank(query, results)
         
-        print(f"[DEBUG] After rerank: {len(reranked)} results")
-        for r in reranked[:3]:
-            print(f"  - score: {r.get('rerank_score', 0):.3f}, text: {r.get('text', '')[:50]}...")
+        if debug:
+            print(f"[DEBUG] After rerank: {len(reranked)} results")
+            for r in reranked[:3]:
+                print(f"  - score: {r.get('rerank_score', 0):.3f}, text: {r.get('text', '')[:50]}...")
         
         # Filter by score threshold
         # For Voyage rerank-2: scores are in (-inf, +inf), relevant > -2, irrelevant < -5
@@ -114,9 +197,11 @@ class Retriever:
             threshold = 0.2  # cosine sim floor for fallback
         else:
             threshold = self.score_threshold
-        filtered = [r for r in reranked if r.get("rerank_score", 0) >= threshold]
+        scores = np.fromiter((r.get("rerank_score", 0) for r in reranked), dtype=np.float64, count=len(reranked))
+        filtered = [reranked[i] for i in np.flatnonzero(scores >= threshold).tolist()]
 
-        print(f"[DEBUG] After threshold filter ({threshold}): {len(filtered)} results")
+        if debug:
+            print(f"[DEBUG] After threshold filter ({threshold}): {len(filtered)} results")
         if not filtered and reranked:
             best = reranked[0].get("rerank_score", 0)
             print(f"[WARN] All results filtered out! Best score was {best:.4f}, threshold is {threshold}. Returning top 3 anyway.")
@@ -124,6 +209,25 @@ class Retriever:
         
         return filtered
 
+    def _embed_query_cached(self, query: str) -> np.ndarray:
+        """Embed a query, reusing the embedding of an identical recent query."""
+        now = time.monotonic()
+        with self._query_cache_lock:
+            entry = self._query_cache.get(query)
+            if entry is not None and entry[0] > now:
+                self._query_cache.move_to_end(query)
+                return entry[1]
+
+        embedding = self.embedder.embed_query(query)
+        # Shared between callers, so make sure nobody mutates it in place
+        embedding.setflags(write=False)
+        with self._query_cache_lock:
+            self._query_cache[query] = (now + _QUERY_CACHE_TTL_SECONDS, embedding)
+            self._query_cache.move_to_end(query)
+            while len(self._query_cache) > _QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
+
     def _rerank(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Rerank results using Voyage AI Rerank API. Falls back gracefully on any failure."""
         if not results:
@@ -135,53 +239,58 @@ class Retriever:
             return self._fallback_rank(results)
 
         # Build document strings (include file path prefix for code chunks)
-        documents = []
-        for r in results:
-            file_path = r.get("metadata", {}).get("file_path", "")
-            text = r.get("text", "")
-            if file_path:
-                documents.append(f"[File: {file_path}]\n{text}")
-            else:
-                documents.append(text)
+        max_chars = self.rerank_max_chars
+        documents = [
+            f"[File: {file_path}]\n{r.get('text', '')[:max_chars]}"
+            if (file_path := (r.get("metadata") or {}).get("file_path"))
+            else r.get("text", "")[:max_chars]
+            for r in results
+        ]
 
         try:
-            response = httpx.post(
+            response = self._http.post(
                 "https://api.voyageai.com/v1/rerank",
                 headers={
                     "Authorization": f"Bearer {self.voyage_api_key}",
                     "Content-Type": "application/json",
                 },
-                json={
+                content=orjson.dumps({
                     "model": "rerank-2",
                     "query": query,
                     "documents": documents,
                     "top_k": self.top_k_rerank,
-                },
-                timeout=30.0,
+                }),
             )
 
             if response.status_code != 200:
                 print(f"[WARN] Voyage rerank API error {response.status_code}: {response.text[:200]} — using fallback.")
                 return self._fallback_rank(results)
 
-            data = response.json()
+            data = orjson.loads(response.content)
             items = data.get("data", [])
 
             if not items:
                 print(f"[WARN] Voyage rerank returned empty data field: {data} — using fallback.")
                 return self._fallback_rank(results)
 
-            # Map reranked results back to original results with scores
+            # Pull scores and indices into columns so out-of-range indices are
+            # dropped with one mask; dicts are only touched for kept rows
+            count = len(items)
+            scores = np.fromiter((item.get("relevance_score", 0.0) for item in items), dtype=np.float64, count=count)
+            indices = np.fromiter((item.get("index", 0) for item in items), dtype=np.intp, count=count)
+            valid = indices < len(results)
+
+            # Map reranked results back to original results with scores.
+            # `results` is search()'s own list of fresh dicts, so the score is
+            # attached in place rather than on a copy.
             reranked_results = []
-            for item in items:
-                index = item.get("index", 0)
-                score = item.get("relevance_score", 0.0)
-                if index < len(results):
-                    result = results[index].copy()
-                    result["rerank_score"] = score
-                    reranked_results.append(result)
-
-            print(f"[DEBUG] Voyage rerank returned {len(reranked_results)} results, top score: {reranked_results[0].get('rerank_score', 0):.4f}" if reranked_results else "[DEBUG] Voyage rerank: no mapped results")
+            for index, score in zip(indices[valid].tolist(), scores[valid].tolist()):
+                result = results[index]
+                result["rerank_score"] = score
+                reranked_results.append(result)
+
+            if _debug_enabled():
+                print(f"[DEBUG] Voyage rerank returned {len(reranked_results)} results, top score: {reranked_results[0].get('rerank_score', 0):.4f}" if reranked_results else "[DEBUG] Voyage rerank: no mapped results")
             return reranked_results
 
         except httpx.TimeoutException:
@@ -205,7 +314,8 @@ class Retriever:
             r["_is_fallback"] = True
         # Sort by descending similarity
         top.sort(key=lambda x: x["rerank_score"], reverse=True)
-        print(f"[DEBUG] Fallback rank: top score={top[0]['rerank_score']:.4f}" if top else "[DEBUG] Fallback rank: no results")
+        if _debug_enabled():
+            print(f"[DEBUG] Fallback rank: top score={top[0]['rerank_score']:.4f}" if top else "[DEBUG] Fallback rank: no results")
         return top
 
     def build_context(self, results: List[Dict[str, Any]]) -> str:
@@ -213,30 +323,28 @@ class Retriever:
         context_parts = []
         
         for result in results:
-            source_name = result.get("source_name", "Unknown")
             source_type = result.get("source_type", "unknown")
-            text = result.get("text", "")
-            metadata = result.get("metadata", {})
+            metadata = result.get("metadata") or {}
             
             # Build source label
-            source_label = f"[Source: {source_name}"
+            parts = ["[Source: ", str(result.get("source_name", "Unknown"))]
             
             if source_type == "pdf" and "page_number" in metadata:
-                source_label += f" | page {metadata['page_number']}"
+                parts += (" | page ", str(metadata["page_number"]))
             elif source_type == "github" and "file_path" in metadata:
-                source_label += f" | file: {metadata['file_path']}"
+                parts += (" | file: ", str(metadata["file_path"]))
             elif source_type == "code" and "function_name" in metadata:
-                source_label += f" | function {metadata['function_name']}"
+                parts += (" | function ", str(metadata["function_name"]))
             elif source_type == "csv" and "row_index" in metadata:
-                source_label += f" | row {metadata['row_index']}"
+                parts += (" | row ", str(metadata["row_index"]))
             elif source_type == "chat" and "turn_index" in metadata:
-                source_label += f" | turn {metadata['turn_index']}"
+                parts += (" | turn ", str(metadata["turn_index"]))
             elif source_type == "youtube" and "chunk_index" in metadata:
-                source_label += f" | transcript chunk {metadata['chunk_index']}"
+                parts += (" | transcript chunk ", str(metadata["chunk_index"]))
                 if "video_url" in metadata:
-                    source_label += f" | {metadata['video_url']}"
-            source_label += "]"
+                    parts += (" | ", str(metadata["video_url"]))
+            parts += ("]\n", result.get("text", ""), "\n")
             
-            context_parts.append(f"{source_label}\n{text}\n")
+            context_parts.append("".join(parts))
         
         return "\n".join(context_parts)
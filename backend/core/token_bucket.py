@@ -0,0 +1,65 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket.
+
+    The bucket holds up to `capacity` tokens and refills at
+    `capacity / period_seconds` tokens per second. The internal lock only
+    guards the refill/deduct arithmetic — callers never sleep while holding
+    it, so concurrent acquirers don't serialize behind a waiting thread.
+    """
+
+    def __init__(self, capacity: float, period_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self._rate = self.capacity / float(period_seconds)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self._rate)
+            self._last_refill = now
+
+    def try_acquire(self, amount: float) -> float:
+        """
+        Deduct `amount` tokens if available.
+
+        Returns 0.0 on success, otherwise the number of seconds to wait before
+        enough tokens will have accrued. Requests larger than the capacity are
+        clamped so they can still go through once the bucket is full.
+        """
+        needed = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= needed:
+                self._tokens -= needed
+                return 0.0
+            return (needed - self._tokens) / self._rate
+
+    def refund(self, amount: float) -> None:
+        """Return tokens to the bucket (e.g. a reservation that was not used)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + float(amount))
+
+    def adjust(self, delta: float) -> None:
+        """
+        Correct a reservation once the real cost is known.
+
+        Positive `delta` returns tokens; negative `delta` charges extra and may
+        push the bucket into debt, which delays the next acquire accordingly.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + float(delta))
+
+    def available(self) -> float:
+        """Current number of tokens in the bucket."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
@@ -1,8 +1,10 @@
 import os
-import json
+import threading
 from typing import Any, Optional, List
 
 import httpx
+import orjson
+from backend.core.http_client import HTTP2_AVAILABLE
 
 
 class UpstashRedisError(RuntimeError):
@@ -14,6 +16,8 @@ class UpstashRedis:
         self.rest_url: Optional[str] = None
         self.rest_token: Optional[str] = None
         self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._sync_client_lock = threading.Lock()
 
     def _refresh_config(self) -> None:
         if not self.rest_url:
@@ -27,13 +31,25 @@ class UpstashRedis:
 
     def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, connect=5.0))
+            self._client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=httpx.Timeout(10.0, connect=5.0))
         return self._client
 
+    def _get_sync_client(self) -> httpx.Client:
+        # Unlike the async client this one isn't tied to an event loop, so
+        # worker threads share it.
+        with self._sync_client_lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(http2=HTTP2_AVAILABLE, timeout=httpx.Timeout(10.0, connect=5.0))
+            return self._sync_client
+
     async def close(self) -> None:
         if self._client is not None:
             await self._client.aclose()
             self._client = None
+        with self._sync_client_lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
 
     async def command(self, args: List[Any]) -> Any:
         if not self.is_configured():
@@ -43,10 +59,10 @@ class UpstashRedis:
         resp = await client.post(
             self.rest_url,
             headers={"Authorization": f"Bearer {self.rest_token}"},
-            content=json.dumps(args),
+            content=orjson.dumps(args),
         )
         resp.raise_for_status()
-        payload = resp.json()
+        payload = orjson.loads(resp.content)
 
         if isinstance(payload, dict) and payload.get("error"):
             raise UpstashRedisError(str(payload.get("error")))
@@ -56,12 +72,58 @@ class UpstashRedis:
 
         return payload
 
+    async def pipeline(self, commands: List[List[Any]], raise_errors: bool = True) -> List[Any]:
+        """Run several commands in one round-trip via Upstash's /pipeline endpoint.
+
+        With `raise_errors=False` a failed command doesn't raise; its slot in
+        the result holds the UpstashRedisError instead.
+        """
+        if not self.is_configured():
+            raise UpstashRedisError("Upstash Redis is not configured")
+
+        client = self._get_client()
+        resp = await client.post(
+            f"{self.rest_url.rstrip('/')}/pipeline",
+            headers={"Authorization": f"Bearer {self.rest_token}"},
+            content=orjson.dumps(commands),
+        )
+        return self._pipeline_results(resp, raise_errors)
+
+    def pipeline_sync(self, commands: List[List[Any]]) -> List[Any]:
+        """Blocking variant of pipeline() for callers without an event loop."""
+        if not self.is_configured():
+            raise UpstashRedisError("Upstash Redis is not configured")
+
+        client = self._get_sync_client()
+        resp = client.post(
+            f"{self.rest_url.rstrip('/')}/pipeline",
+            headers={"Authorization": f"Bearer {self.rest_token}"},
+            content=orjson.dumps(commands),
+        )
+        return self._pipeline_results(resp)
+
+    @staticmethod
+    def _pipeline_results(resp: httpx.Response, raise_errors: bool = True) -> List[Any]:
+        resp.raise_for_status()
+        payload = orjson.loads(resp.content)
+
+        results = []
+        for item in payload:
+            if isinstance(item, dict) and item.get("error"):
+                error = UpstashRedisError(str(item.get("error")))
+                if raise_errors:
+                    raise error
+                results.append(error)
+                continue
+            results.append(item.get("result") if isinstance(item, dict) else item)
+        return results
+
     async def get(self, key: str) -> Optional[str]:
         res = await self.command(["GET", key])
         return res
 
     async def set_json(self, key: str, value: Any, ttl_seconds: int) -> None:
-        raw = json.dumps(value)
+        raw = orjson.dumps(value).decode()
         await self.command(["SET", key, raw, "EX", int(ttl_seconds)])
 
     async def incr(self, key: str) -> int:
@@ -1,33 +1,208 @@
 import os
-from typing import List, Dict, Any, Optional
+import json
+import math
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple, TypeVar
+import numpy as np
 from pymilvus import MilvusClient
 from backend.config import VECTOR_DB
 from backend.ingestion.base import Chunk
 
+# Rough per-row allowance for metadata and field framing when estimating the
+# size of buffered inserts
+_ROW_OVERHEAD_BYTES = 1024
+
+# Workers for running per-collection calls side by side. More than the two
+# collections so concurrent callers (e.g. the retriever's file-listing
+# fan-out) don't queue behind each other.
+_COLLECTION_POOL_WORKERS = 8
+
+# Full insert batches waiting for the writer thread. Bounded so a fast
+# producer blocks instead of holding many 32 MB batches in memory.
+_INSERT_QUEUE_BATCHES = 4
+
+# nprobe used when it can't be derived from the index (e.g. AUTOINDEX, which
+# ignores it). MILVUS_NPROBE overrides both this and the derived value.
+_DEFAULT_NPROBE = 10
+
+# get_all_sources scans up to 10k rows per collection; its result is reused
+# for this long. Shared by all stores on the same endpoint and dropped
+# whenever any of them inserts or deletes.
+_SOURCES_CACHE_TTL_SECONDS = 30.0
+_sources_cache: Dict[Tuple[Any, ...], Tuple[float, Dict[str, List[Dict[str, Any]]]]] = {}
+_sources_cache_lock = threading.Lock()
+# Bumped on every invalidation so a scan that overlapped a write isn't cached
+_sources_generation = 0
+
+# One MilvusClient per (uri, token), shared by every VectorStore in the
+# process. Its gRPC channel multiplexes concurrent calls, so sharing it keeps
+# one warm connection instead of one per store.
+_clients: Dict[Tuple[Optional[str], Optional[str]], MilvusClient] = {}
+_clients_lock = threading.Lock()
+
+# Fields returned by search(); "metadata" is added only on request
+_SEARCH_FIELDS = ["text", "source_type", "source_name"]
+
+# Upper bound on cached filter expressions per store; the caches are simply
+# reset when full
+_FILTER_CACHE_SIZE = 1024
+
+# Collections that already got a warm-up search in this process
+_warmed: set = set()
+_warmed_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+def invalidate_sources_cache():
+    """Drop every cached get_all_sources() result.
+
+    For code that changes collections without going through a VectorStore,
+    e.g. dropping and recreating them.
+    """
+    global _sources_generation
+    with _sources_cache_lock:
+        _sources_generation += 1
+        _sources_cache.clear()
+
+
+class InsertJob:
+    """Rows buffered by one ingestion job, and the insert errors it hit.
+
+    Jobs share a store's writer thread but not their buffers, so concurrent
+    requests never flush, or fail on, each other's rows.
+    """
+
+    def __init__(self, collections: List[str]):
+        self.pending: Dict[str, List[Dict[str, Any]]] = {c: [] for c in collections}
+        self.pending_bytes: Dict[str, int] = {c: 0 for c in collections}
+        self.errors: List[Exception] = []
+        # Batches handed to the writer and not yet done with
+        self.queued = 0
+        self.lock = threading.Lock()
+        self.drained = threading.Condition(self.lock)
+
+    def discard(self):
+        """Drop buffered rows. Caller holds `lock`."""
+        for collection_name in self.pending:
+            self.pending[collection_name] = []
+            self.pending_bytes[collection_name] = 0
+
+
+def _quote(value: str) -> str:
+    """Quote a value as a Milvus string literal, escaping quotes and backslashes."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _get_client(uri: Optional[str], token: Optional[str]) -> MilvusClient:
+    key = (uri, token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MilvusClient(uri=uri, token=token)
+            _clients[key] = client
+        return client
+
 
 class VectorStore:
     def __init__(self):
         self.uri = os.getenv("ZILLIZ_URI")
         self.token = os.getenv("ZILLIZ_TOKEN")
-        self.client = MilvusClient(uri=self.uri, token=self.token)
+        self.client = _get_client(self.uri, self.token)
         self.collection_docs = VECTOR_DB["collection_docs"]
         self.collection_chats = VECTOR_DB["collection_chats"]
+        # Both names may point at the same collection (chats filtered by the
+        # source_type field); that layout searches with a single request.
+        self.collections = list(dict.fromkeys([self.collection_docs, self.collection_chats]))
         self.dimensions = VECTOR_DB["dimensions"]
+        self.insert_batch_rows = VECTOR_DB["insert_batch_rows"]
+        self.insert_batch_bytes = VECTOR_DB["insert_batch_bytes"]
+        # Rows waiting to be inserted, for callers that don't start their own job
+        self._default_job = InsertJob(self.collections)
+        # Full batches are inserted by a background writer so upsert() doesn't
+        # wait on the Milvus round-trip; finalize() waits for the job's batches
+        self._insert_queue: "queue.Queue[Tuple[InsertJob, str, List[Dict[str, Any]]]]" = queue.Queue(
+            maxsize=_INSERT_QUEUE_BATCHES
+        )
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._collection_pool = ThreadPoolExecutor(
+            max_workers=_COLLECTION_POOL_WORKERS, thread_name_prefix="vector-store"
+        )
+        self._search_params: Dict[str, Dict[str, Any]] = {}
+        self._sources_cache_key = (self.uri, self.token, tuple(self.collections))
+        # Escaped filter expressions, so repeated filters reuse the same string
+        self._filter_cache: Dict[Tuple[str, ...], str] = {}
+        self._source_filter_cache: Dict[str, str] = {}
         self._create_collections()
 
     def _create_collections(self):
         """Create collections if they don't exist."""
-        for collection_name in [self.collection_docs, self.collection_chats]:
+        for collection_name in self.collections:
             if not self.client.has_collection(collection_name):
                 self.client.create_collection(
                     collection_name=collection_name,
                     dimension=self.dimensions,
                     metric_type="COSINE",
-                    id_type="str",
+                    id_type="int",  # auto-generated INT64 primary key
                     auto_id=True,
-                    max_length=65535
                 )
             self.client.load_collection(collection_name)
+            self._search_params[collection_name] = self._build_search_params(collection_name)
+            self._warm_up(collection_name)
+
+    def _warm_up(self, collection_name: str):
+        """Fire one throwaway search in the background so the first real query hits a warm cache.
+
+        Runs once per collection per process, however many stores are built.
+        """
+        key = (self.uri, collection_name)
+        with _warmed_lock:
+            if key in _warmed:
+                return
+            _warmed.add(key)
+
+        def _search():
+            try:
+                # A unit vector rather than all zeros: cosine is undefined for
+                # a zero-length query
+                probe = np.zeros(self.dimensions, dtype=np.float32)
+                probe[0] = 1.0
+                self.client.search(
+                    collection_name=collection_name,
+                    data=[probe],
+                    limit=1,
+                    anns_field="vector",
+                    search_params={"metric_type": "COSINE", "params": {"nprobe": 1}},
+                )
+                if os.getenv("VECTORSTORE_DEBUG") == "1":
+                    print(f"[DEBUG] Warmed up {collection_name}")
+            except Exception as e:
+                print(f"[DEBUG] Warm-up search on {collection_name} failed: {e}")
+
+        self._collection_pool.submit(_search)
+
+    def _build_search_params(self, collection_name: str) -> Dict[str, Any]:
+        """Pick nprobe for a collection from its IVF nlist (√nlist), once at startup."""
+        nprobe = _DEFAULT_NPROBE
+        override = os.getenv("MILVUS_NPROBE")
+        if override:
+            nprobe = int(override)
+        else:
+            try:
+                info = self.client.describe_index(collection_name, index_name="vector")
+                params = info.get("params") or info
+                nlist = int(params.get("nlist", 0))
+                if nlist > 0:
+                    nprobe = max(1, min(nlist, int(math.sqrt(nlist))))
+            except Exception as e:
+                print(f"[DEBUG] Could not read index params for {collection_name}: {e}")
+        return {"metric_type": "COSINE", "params": {"nprobe": nprobe}}
 
     def _get_collection(self, source_type: str) -> str:
         """Determine which collection to use based on source type."""
@@ -35,32 +210,55 @@ class VectorStore:
             return self.collection_chats
         return self.collection_docs
 
-    def upsert(self, chunks: List[Chunk], embeddings: List[List[float]]):
-        """Insert chunks with embeddings into the appropriate collection."""
-        if not chunks or not embeddings:
+    def begin_job(self) -> InsertJob:
+        """Start an ingestion job: pass it to upsert() and finalize()."""
+        return InsertJob(self.collections)
+
+    def upsert(
+        self,
+        chunks: List[Chunk],
+        embeddings: Sequence[Sequence[float]],
+        job: Optional[InsertJob] = None
+    ):
+        """Queue chunks with embeddings for insertion into the appropriate collection.
+
+        Rows are buffered per job and inserted in large batches by a
+        background writer; call finalize() with the same job once it is done
+        to insert the remainder and wait for every batch to land. Without a
+        job, rows go to the store's default one.
+        `embeddings` may be a list of vectors or a 2-D numpy array.
+        """
+        if not chunks or len(embeddings) == 0:
             return
 
         collection_name = self._get_collection(chunks[0].source_type)
 
+        n = min(len(chunks), len(embeddings))
+        vectors, dim_ok = self._as_vector_matrix(embeddings[:n])
+        # Validate no NaN/Inf in embedding — one vectorized pass over the batch
+        finite = np.isfinite(vectors).all(axis=1)
+
         data = []
         skipped = 0
-        for chunk, embedding in zip(chunks, embeddings):
+        for i in range(n):
+            chunk = chunks[i]
             # Validate text
             if not chunk.text or not chunk.text.strip():
                 skipped += 1
                 continue
             # Validate embedding dimension
-            if not embedding or len(embedding) != self.dimensions:
-                print(f"[WARN] Skipping chunk with wrong embedding dim: {len(embedding) if embedding else 0} (expected {self.dimensions})")
+            if not dim_ok[i]:
+                embedding = embeddings[i]
+                print(f"[WARN] Skipping chunk with wrong embedding dim: {len(embedding) if embedding is not None else 0} (expected {self.dimensions})")
                 skipped += 1
                 continue
-            # Validate no NaN/Inf in embedding
-            if any(v != v or v == float('inf') or v == float('-inf') for v in embedding):
+            if not finite[i]:
                 print(f"[WARN] Skipping chunk with NaN/Inf in embedding")
                 skipped += 1
                 continue
             data.append({
-                "vector": embedding,
+                # float32 row view; pymilvus packs ndarray vectors itself
+                "vector": vectors[i],
                 "text": chunk.text[:32000],        # Milvus varchar cap
                 "source_type": chunk.source_type,
                 "source_name": chunk.source_name[:512],
@@ -74,56 +272,171 @@ class VectorStore:
             print("[WARN] upsert: no valid data to insert after validation")
             return
 
+        job = job or self._default_job
+        ready = []
+        vector_bytes = self.dimensions * 4
+        with job.lock:
+            if job.errors:
+                # An earlier batch of this job failed; finalize() reports it
+                print(f"[WARN] upsert: dropping {len(data)} chunks after a failed insert")
+                return
+            pending = job.pending[collection_name]
+            for row in data:
+                size = vector_bytes + len(row["text"]) + len(row["source_name"]) + _ROW_OVERHEAD_BYTES
+                if pending and (
+                    len(pending) >= self.insert_batch_rows
+                    or job.pending_bytes[collection_name] + size > self.insert_batch_bytes
+                ):
+                    ready.append(pending)
+                    pending = job.pending[collection_name] = []
+                    job.pending_bytes[collection_name] = 0
+                pending.append(row)
+                job.pending_bytes[collection_name] += size
+            job.queued += len(ready)
+
+        for batch in ready:
+            self._enqueue_insert(job, collection_name, batch)
+
+    def _as_vector_matrix(self, embeddings: Sequence[Sequence[float]]):
+        """Return embeddings as an (n, dims) float32 matrix plus a per-row "right dimension" mask.
+
+        Embedder output is already such a matrix and is used as-is; ragged
+        input is copied row by row, leaving wrong-sized rows zeroed.
+        """
+        n = len(embeddings)
+        try:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+        except (TypeError, ValueError):
+            vectors = None
+        if vectors is not None and vectors.shape == (n, self.dimensions):
+            return vectors, np.ones(n, dtype=bool)
+
+        dim_ok = np.fromiter(
+            (e is not None and len(e) == self.dimensions for e in embeddings), dtype=bool, count=n
+        )
+        vectors = np.zeros((n, self.dimensions), dtype=np.float32)
+        for i in np.flatnonzero(dim_ok).tolist():
+            vectors[i] = embeddings[i]
+        return vectors, dim_ok
+
+    def _enqueue_insert(self, job: InsertJob, collection_name: str, data: List[Dict[str, Any]]):
+        """Hand a batch to the writer thread, starting it on first use.
+
+        The caller has already counted the batch in `job.queued`.
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._drain_loop, name="vector-store-writer", daemon=True
+                )
+                self._writer.start()
+        self._insert_queue.put((job, collection_name, data))
+
+    def _drain_loop(self):
+        while True:
+            job, collection_name, data = self._insert_queue.get()
+            try:
+                with job.lock:
+                    failed = bool(job.errors)
+                if failed:
+                    print(f"[WARN] upsert: dropping {len(data)} queued chunks after a failed insert")
+                else:
+                    self._insert(collection_name, data)
+            except Exception as e:
+                print(f"[WARN] upsert: insert into {collection_name} failed: {e}")
+                with job.lock:
+                    job.errors.append(e)
+                    job.discard()
+            finally:
+                with job.lock:
+                    job.queued -= 1
+                    if not job.queued:
+                        job.drained.notify_all()
+                self._insert_queue.task_done()
+
+    def _insert(self, collection_name: str, data: List[Dict[str, Any]]):
+        # No flush here: flushing every batch seals lots of tiny segments and
+        # costs a synchronous round-trip. Inserted rows are already searchable;
+        # finalize() seals them once per ingestion job.
         self.client.insert(collection_name=collection_name, data=data)
-        self.client.flush(collection_name=collection_name)
-        self.client.load_collection(collection_name)
+        self._invalidate_sources_cache()
         print(f"[DEBUG] upsert: inserted {len(data)} chunks into {collection_name}")
 
+    def finalize(self, job: Optional[InsertJob] = None):
+        """Insert any buffered rows and flush, after an ingestion job has finished upserting.
+
+        Waits for the writer thread to finish the job's queued batches, then
+        raises the first insert error it hit, if any. Once a batch has
+        failed, the job's remaining rows are discarded rather than inserted.
+        """
+        job = job or self._default_job
+        with job.lock:
+            drained = {}
+            if not job.errors:
+                drained = {c: pending for c, pending in job.pending.items() if pending}
+            job.discard()
+            job.queued += len(drained)
+
+        for collection_name, data in drained.items():
+            self._enqueue_insert(job, collection_name, data)
+
+        with job.lock:
+            while job.queued:
+                job.drained.wait()
+            errors, job.errors = job.errors, []
+
+        for collection_name in self.collections:
+            try:
+                self.client.flush(collection_name=collection_name)
+            except Exception as e:
+                print(f"[WARN] Error flushing {collection_name}: {e}")
+
+        if errors:
+            raise errors[0]
+
+    def _for_each_collection(self, fn: Callable[[str], T]) -> List[T]:
+        """Run `fn` on every collection concurrently; results come back in collection order."""
+        if len(self.collections) == 1:
+            return [fn(self.collections[0])]
+        futures = [
+            self._collection_pool.submit(fn, collection_name)
+            for collection_name in self.collections
+        ]
+        return [f.result() for f in futures]
+
     def search(
         self,
-        query_embedding: List[float],
+        query_embedding: Sequence[float],
         top_k: int = 20,
-        source_types: Optional[List[str]] = None
+        source_types: Optional[List[str]] = None,
+        include_metadata: bool = False
     ) -> List[Dict[str, Any]]:
-        """Search for similar vectors with optional source type filter."""
-        results = []
+        """Search for similar vectors with optional source type filter.
 
+        The metadata dict is often the largest field of a hit, so it is only
+        returned with `include_metadata=True`.
+        """
         if len(query_embedding) != self.dimensions:
             print(
                 f"[DEBUG] Query embedding dim mismatch: got={len(query_embedding)}, expected={self.dimensions}"
             )
         
-        collections_to_search = [self.collection_docs, self.collection_chats]
+        # Collections are loaded once in _create_collections; the stats and
+        # sample-row diagnostics cost extra round-trips, so they only run
+        # when VECTORSTORE_DEBUG=1
+        debug = os.getenv("VECTORSTORE_DEBUG") == "1"
+
+        filter_expr = None
+        if source_types and "All" not in source_types:
+            filter_expr = self._source_names_filter(source_types)
+        output_fields = _SEARCH_FIELDS + ["metadata"] if include_metadata else _SEARCH_FIELDS
         
-        for collection_name in collections_to_search:
-            try:
-                self.client.load_collection(collection_name)
-                stats = self.client.get_collection_stats(collection_name)
-                row_count = stats.get("row_count", 0)
-                print(f"[DEBUG] Collection {collection_name} row_count={row_count}")
-                
-                # Diagnostic: query one row to see stored vector dimension
-                if row_count > 0:
-                    sample = self.client.query(
-                        collection_name=collection_name,
-                        filter="",
-                        output_fields=["vector", "text", "source_type"],
-                        limit=1
-                    )
-                    if sample and len(sample) > 0:
-                        vec = sample[0].get("vector", [])
-                        print(f"[DEBUG] Sample vector dim: {len(vec) if isinstance(vec, list) else 'not a list'}")
-                        print(f"[DEBUG] Sample source_type: {sample[0].get('source_type')}")
-            except Exception as e:
-                print(f"[DEBUG] Error getting stats for {collection_name}: {e}")
-            
-            filter_expr = None
-            if source_types and "All" not in source_types:
-                allowed = ", ".join([f'"{t}"' for t in source_types])
-                filter_expr = f"source_name in [{allowed}]"
-            
-            print(f"[DEBUG] Query embedding dim: {len(query_embedding)}")
-            print(f"[DEBUG] Searching {collection_name} with filter={filter_expr}")
+        def _search(collection_name: str) -> List[Dict[str, Any]]:
+            hits = []
+            if debug:
+                self._log_collection_diagnostics(collection_name)
+                print(f"[DEBUG] Query embedding dim: {len(query_embedding)}")
+                print(f"[DEBUG] Searching {collection_name} with filter={filter_expr}")
             
             try:
                 search_results = self.client.search(
@@ -132,42 +445,97 @@ class VectorStore:
                     limit=top_k,
                     filter=filter_expr,
                     anns_field="vector",
-                    search_params={"metric_type": "COSINE", "params": {"nprobe": 10}},
-                    output_fields=["text", "source_type", "source_name", "metadata"]
+                    search_params=self._search_params[collection_name],
+                    output_fields=output_fields
                 )
                 
-                print(f"[DEBUG] Search on {collection_name} returned: {len(search_results[0]) if search_results else 0} hits")
+                if debug:
+                    print(f"[DEBUG] Search on {collection_name} returned: {len(search_results[0]) if search_results else 0} hits")
                 
                 if search_results and len(search_results) > 0:
                     for hit in search_results[0]:
                         # Milvus search hits expose fields via hit["entity"] or directly on the hit dict
                         entity = hit.get("entity") if isinstance(hit.get("entity"), dict) else {}
-                        results.append({
+                        result = {
                             "id": hit.get("id"),
                             "score": hit.get("distance", 0),
                             "text": entity.get("text") or hit.get("text", ""),
                             "source_type": entity.get("source_type") or hit.get("source_type", ""),
                             "source_name": entity.get("source_name") or hit.get("source_name", ""),
-                            "metadata": entity.get("metadata") or hit.get("metadata", {})
-                        })
+                        }
+                        if include_metadata:
+                            result["metadata"] = entity.get("metadata") or hit.get("metadata", {})
+                        hits.append(result)
             except Exception as e:
                 print(f"[DEBUG] Search error on {collection_name}: {e}")
-        
-        # Sort by score and return top_k
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+            return hits
+
+        # The two collection searches are independent RPCs: run them side by
+        # side so the latency is the slower of the two, not the sum
+        per_collection = self._for_each_collection(_search)
+        if len(per_collection) == 1:
+            # Milvus already returns the global top_k in score order
+            return per_collection[0]
+
+        # Pick the best top_k across collections without fully sorting
+        return heapq.nlargest(
+            top_k, itertools.chain.from_iterable(per_collection), key=lambda x: x["score"]
+        )
+
+    def _log_collection_diagnostics(self, collection_name: str):
+        """Print row count and a sample row's vector dimension for a collection."""
+        try:
+            stats = self.client.get_collection_stats(collection_name)
+            row_count = stats.get("row_count", 0)
+            print(f"[DEBUG] Collection {collection_name} row_count={row_count}")
+            
+            # Diagnostic: query one row to see stored vector dimension
+            if row_count > 0:
+                sample = self.client.query(
+                    collection_name=collection_name,
+                    filter="",
+                    output_fields=["vector", "text", "source_type"],
+                    limit=1
+                )
+                if sample and len(sample) > 0:
+                    vec = sample[0].get("vector", [])
+                    print(f"[DEBUG] Sample vector dim: {len(vec) if isinstance(vec, list) else 'not a list'}")
+                    print(f"[DEBUG] Sample source_type: {sample[0].get('source_type')}")
+        except Exception as e:
+            print(f"[DEBUG] Error getting stats for {collection_name}: {e}")
+
+    def _source_names_filter(self, source_names: Sequence[str]) -> str:
+        """Return an escaped `source_name in [...]` expression, cached per name set."""
+        key = tuple(sorted(set(source_names)))
+        expr = self._filter_cache.get(key)
+        if expr is None:
+            if len(self._filter_cache) >= _FILTER_CACHE_SIZE:
+                self._filter_cache.clear()
+            expr = f"source_name in [{', '.join(map(_quote, key))}]"
+            self._filter_cache[key] = expr
+        return expr
+
+    def _source_name_filter(self, source_name: str) -> str:
+        """Return an escaped `source_name == ...` expression, cached per name."""
+        expr = self._source_filter_cache.get(source_name)
+        if expr is None:
+            if len(self._source_filter_cache) >= _FILTER_CACHE_SIZE:
+                self._source_filter_cache.clear()
+            expr = f"source_name == {_quote(source_name)}"
+            self._source_filter_cache[source_name] = expr
+        return expr
 
     def get_source_files(self, source_name: str) -> List[Dict[str, Any]]:
         """Get list of unique files from a source."""
-        files = set()
-        
-        for collection_name in [self.collection_docs, self.collection_chats]:
+        expr = self._source_name_filter(source_name)
+
+        def _files(collection_name: str) -> set:
+            files = set()
             try:
-                self.client.load_collection(collection_name)
                 # Query all vectors with filter for source_name
                 results = self.client.query(
                     collection_name=collection_name,
-                    filter=f'source_name == "{source_name}"',
+                    filter=expr,
                     output_fields=["metadata"],
                     limit=1000
                 )
@@ -184,14 +552,29 @@ class VectorStore:
                         files.add(file_path)
             except Exception as e:
                 print(f"[DEBUG] Error getting files from {collection_name}: {e}")
-        
+            return files
+
+        files = set().union(*self._for_each_collection(_files))
         return [{"file_path": f} for f in sorted(files)]
 
+    def _invalidate_sources_cache(self):
+        global _sources_generation
+        with _sources_cache_lock:
+            _sources_generation += 1
+            _sources_cache.pop(self._sources_cache_key, None)
+
     def get_all_sources(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get all unique sources grouped by source type."""
-        sources = {}
-        
-        for collection_name in [self.collection_docs, self.collection_chats]:
+        with _sources_cache_lock:
+            cached = _sources_cache.get(self._sources_cache_key)
+            generation = _sources_generation
+        if cached is not None and time.monotonic() - cached[0] < _SOURCES_CACHE_TTL_SECONDS:
+            # Copy the lists so callers can't modify the cached result
+            return {source_type: list(items) for source_type, items in cached[1].items()}
+
+        started = time.monotonic()
+        def _sources(collection_name: str) -> List[Dict[str, Any]]:
+            found = []
             try:
                 # Query all documents to get unique sources
                 results = self.client.query(
@@ -212,42 +595,41 @@ class VectorStore:
                     
                     if source_name and source_name not in seen:
                         seen.add(source_name)
-                        if source_type not in sources:
-                            sources[source_type] = []
-                        
-                        sources[source_type].append({
+                        found.append({
                             "name": source_name,
                             "type": source_type,
                             "ingested_at": metadata.get("ingested_at", "unknown")
                         })
             except Exception:
                 pass
-        
-        return sources
+            return found
+
+        sources = {}
+        for found in self._for_each_collection(_sources):
+            for item in found:
+                sources.setdefault(item["type"], []).append(item)
+
+        with _sources_cache_lock:
+            if generation == _sources_generation:
+                _sources_cache[self._sources_cache_key] = (started, sources)
+        return {source_type: list(items) for source_type, items in sources.items()}
 
     def get_chunk_count(self, source_name: str) -> int:
-        """Get the number of chunks for a given source using pagination."""
-        count = 0
-        escaped = source_name.replace('\\', '\\\\').replace('"', '\\"')
-        for collection_name in [self.collection_docs, self.collection_chats]:
+        """Get the number of chunks for a given source with a server-side count."""
+        expr = self._source_name_filter(source_name)
+
+        def _count(collection_name: str) -> int:
             try:
-                offset = 0
-                batch = 16383  # Milvus max query limit
-                while True:
-                    results = self.client.query(
-                        collection_name=collection_name,
-                        filter=f'source_name == "{escaped}"',
-                        output_fields=["source_name"],
-                        limit=batch,
-                        offset=offset
-                    )
-                    count += len(results)
-                    if len(results) < batch:
-                        break
-                    offset += batch
+                results = self.client.query(
+                    collection_name=collection_name,
+                    filter=expr,
+                    output_fields=["count(*)"],
+                )
+                return int(results[0]["count(*)"]) if results else 0
             except Exception:
-                pass
-        return count
+                return 0
+
+        return sum(self._for_each_collection(_count))
 
     def has_documents(self) -> bool:
         """Check if any documents exist in the vector store."""
@@ -259,9 +641,9 @@ class VectorStore:
 
     def delete_source(self, source_name: str):
         """Delete all vectors for a given source from both collections."""
-        escaped = source_name.replace('\\', '\\\\').replace('"', '\\"')
-        expr = f'source_name == "{escaped}"'
-        for collection_name in [self.collection_docs, self.collection_chats]:
+        expr = self._source_name_filter(source_name)
+
+        def _delete(collection_name: str):
             try:
                 self.client.load_collection(collection_name)
                 res = self.client.delete(
@@ -272,3 +654,6 @@ class VectorStore:
                 print(f"[DEBUG] Deleted source_name={source_name} from {collection_name}: {res}")
             except Exception as e:
                 print(f"[DEBUG] Error deleting source_name={source_name} from {collection_name}: {e}")
+
+        self._for_each_collection(_delete)
+        self._invalidate_sources_cache()
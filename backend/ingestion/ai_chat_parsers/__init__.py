@@ -14,10 +14,12 @@ Each parser takes raw HTML and outputs a list of messages:
     [{role: "user" | "assistant", text: str}, ...]
 """
 
+import io
 import os
 import json
+import atexit
+import threading
 import subprocess
-import tempfile
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
@@ -31,6 +33,13 @@ PLATFORM_DOMAINS = {
     "perplexity": ["perplexity.ai"],
 }
 
+# Flat domain -> platform index built once from PLATFORM_DOMAINS
+DOMAIN_TO_PLATFORM: Dict[str, str] = {
+    domain: platform
+    for platform, domains in PLATFORM_DOMAINS.items()
+    for domain in domains
+}
+
 # Parser script paths (relative to this module)
 PARSER_SCRIPTS = {
     "chatgpt": "parse_chatgpt.js",
@@ -56,14 +65,7 @@ def detect_platform(url: str) -> Optional[str]:
         domain = parsed.netloc.lower()
         
         # Remove www. prefix if present
-        if domain.startswith("www."):
-            domain = domain[4:]
-        
-        for platform, domains in PLATFORM_DOMAINS.items():
-            if domain in domains:
-                return platform
-        
-        return None
+        return DOMAIN_TO_PLATFORM.get(domain.removeprefix("www."))
     except Exception:
         return None
 
@@ -158,10 +160,118 @@ async def fetch_html(url: str) -> Optional[str]:
             return None
 
 
+# Seconds one parse may run before its worker is killed
+PARSER_TIMEOUT_SECONDS = 30
+
+
+class _ParserWorker:
+    """
+    A long-lived `node <script> --serve` process for one parser script.
+
+    Node's startup cost dominates parsing a typical share page, so the process
+    is started on first use and reused for every later page of that platform.
+    Requests are framed as `<byte length>\\n<html>` and replies as
+    `<byte length>\\n<json>` (see parser_runner.js); one request is in flight
+    at a time.
+    """
+
+    def __init__(self, script_path: str):
+        self.script_path = script_path
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["node", self.script_path, "--serve"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._proc
+
+    def parse(self, html: str) -> Dict:
+        """
+        Send one page to the worker and return its decoded reply.
+
+        Raises subprocess.TimeoutExpired if the parse runs too long. On any
+        failure the process is discarded and the next call starts a new one.
+        """
+        body = html.encode("utf-8")
+        with self._lock:
+            proc = self._ensure_process()
+            timed_out = threading.Event()
+
+            def _kill():
+                timed_out.set()
+                proc.kill()
+
+            # Killing a stuck worker unblocks the read below with EOF
+            timer = threading.Timer(PARSER_TIMEOUT_SECONDS, _kill)
+            timer.start()
+            try:
+                proc.stdin.write(b"%d\n" % len(body))
+                proc.stdin.write(body)
+                proc.stdin.flush()
+
+                header = proc.stdout.readline()
+                if not header.endswith(b"\n"):
+                    raise RuntimeError("parser worker exited")
+                length = int(header)
+                payload = proc.stdout.read(length)
+                if len(payload) != length:
+                    raise RuntimeError("parser worker exited mid-reply")
+                return json.loads(payload)
+            except Exception:
+                self.close()
+                if timed_out.is_set():
+                    raise subprocess.TimeoutExpired(proc.args, PARSER_TIMEOUT_SECONDS)
+                raise
+            finally:
+                timer.cancel()
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            # The worker exits once its stdin is closed
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+
+_workers: Dict[str, _ParserWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def _get_worker(script_path: str) -> _ParserWorker:
+    with _workers_lock:
+        worker = _workers.get(script_path)
+        if worker is None:
+            worker = _workers[script_path] = _ParserWorker(script_path)
+            if len(_workers) == 1:
+                atexit.register(close_parser_workers)
+        return worker
+
+
+def close_parser_workers() -> None:
+    """Stop every persistent parser process."""
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        with worker._lock:
+            worker.close()
+
+
 def run_js_parser(script_path: str, html: str) -> List[Dict[str, str]]:
     """
     Run a Node.js parser script on HTML content.
     
+    The script runs in a persistent worker process (one per script), so only
+    the first page per platform pays for starting Node.
+    
     Args:
         script_path: Path to the .js parser script
         html: Raw HTML content
@@ -169,53 +279,20 @@ def run_js_parser(script_path: str, html: str) -> List[Dict[str, str]]:
     Returns:
         List of messages: [{"role": "user"|"assistant", "text": str}, ...]
     """
-    # Write HTML to a temp file
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False, encoding="utf-8") as f:
-        f.write(html)
-        temp_html_path = f.name
-    
     try:
-        # Run the parser script
-        result = subprocess.run(
-            ["node", script_path, temp_html_path],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            timeout=30,
-        )
-        
-        if result.returncode != 0:
-            print(f"[AI Chat Parser] Parser failed: {result.stderr}")
-            return []
-        
-        # Parse JSON directly from stdout
-        stdout = result.stdout.strip()
-        if not stdout:
-            print("[AI Chat Parser] Empty stdout from parser")
-            return []
-        
-        # Try to parse as JSON
-        try:
-            messages = json.loads(stdout)
-            return messages
-        except json.JSONDecodeError as e:
-            print(f"[AI Chat Parser] Failed to parse JSON: {e}")
-            print(f"[AI Chat Parser] stdout preview: {stdout[:200]}")
-            return []
-        
+        reply = _get_worker(script_path).parse(html)
     except subprocess.TimeoutExpired:
         print("[AI Chat Parser] Parser timed out")
         return []
     except Exception as e:
         print(f"[AI Chat Parser] Error running parser: {e}")
         return []
-    finally:
-        # Clean up temp file
-        try:
-            os.unlink(temp_html_path)
-        except Exception:
-            pass
+    
+    if "error" in reply:
+        print(f"[AI Chat Parser] Parser failed: {reply['error']}")
+        return []
+    
+    return reply.get("messages", [])
 
 
 async def parse_ai_chat(url: str) -> Tuple[Optional[str], List[Dict[str, str]]]:
@@ -279,30 +356,38 @@ def messages_to_text(messages: List[Dict[str, str]], context_window: int = 2) ->
     if not messages:
         return ""
     
-    lines = []
+    # Each message can appear as context for the next `context_window` turns;
+    # build its quoted, truncated form once instead of once per reuse
+    quoted = []
+    for msg in messages:
+        prev_text = msg.get("text", "")
+        prev_label = "User" if msg.get("role", "unknown") == "user" else "Assistant"
+        # Truncate long context
+        if len(prev_text) > 300:
+            prev_text = prev_text[:300] + "..."
+        quoted.append(f"> **{prev_label}:** {prev_text}\n")
+    
+    buf = io.StringIO()
     
     for i, msg in enumerate(messages):
         role = msg.get("role", "unknown")
         text = msg.get("text", "")
         
+        if i:
+            buf.write("\n\n---\n\n")
+        
+        if role == "user":
+            buf.write(f"## 👤 User (Turn {i + 1})\n\n")
+        else:
+            buf.write(f"## 🤖 Assistant (Turn {i + 1})\n\n")
+        
         # Include context from previous messages
-        context_parts = []
         start_idx = max(0, i - context_window)
         if start_idx < i:
-            context_parts.append("**Previous context:**")
+            buf.write("**Previous context:**\n")
             for j in range(start_idx, i):
-                prev_role = messages[j].get("role", "unknown")
-                prev_text = messages[j].get("text", "")
-                prev_label = "User" if prev_role == "user" else "Assistant"
-                # Truncate long context
-                if len(prev_text) > 300:
-                    prev_text = prev_text[:300] + "..."
-                context_parts.append(f"> **{prev_label}:** {prev_text}")
-            context_parts.append("")
+                buf.write(quoted[j])
         
-        if role == "user":
-            lines.append(f"## 👤 User (Turn {i + 1})\n\n" + "\n".join(context_parts) + text)
-        else:
-            lines.append(f"## 🤖 Assistant (Turn {i + 1})\n\n" + "\n".join(context_parts) + text)
+        buf.write(text)
     
-    return "\n\n---\n\n".join(lines)
+    return buf.getvalue()
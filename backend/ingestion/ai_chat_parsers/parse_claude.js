@@ -5,6 +5,7 @@
  * Usage:
  *   node parse_claude.js                         (uses default path)
  *   node parse_claude.js path/to/file.html       (custom path)
+ *   node parse_claude.js -                       (read HTML from stdin)
  *
  * Output:
  *   test_output/parsed_claude.txt   - clean readable conversation
@@ -26,6 +27,7 @@
 
 const fs   = require("fs");
 const path = require("path");
+const { run } = require("./parser_runner");
 
 // ── Config ────────────────────────────────────────────────────────────────────
 const inputFile  = process.argv[2] || "test_output/claude_raw_html.html";
@@ -34,14 +36,8 @@ const outputTxt  = path.join(outputDir, "parsed_claude.txt");
 const outputJson = path.join(outputDir, "parsed_claude.json");
 // ─────────────────────────────────────────────────────────────────────────────
 
-if (!fs.existsSync(inputFile)) {
-  process.stderr.write(`ERROR: File not found: ${inputFile}\n`);
-  process.exit(1);
-}
 if (!fs.existsSync(outputDir)) fs.mkdirSync(outputDir, { recursive: true });
 
-const html = fs.readFileSync(inputFile, "utf8");
-
 // ── Helpers ───────────────────────────────────────────────────────────────────
 
 /** Decode HTML entities */
@@ -240,39 +236,39 @@ function extractAssistantTurns(html) {
 }
 
 // ── Run extraction ────────────────────────────────────────────────────────────
-const userTurns      = extractUserTurns(html);
-const assistantTurns = extractAssistantTurns(html);
-
-// Merge and sort by position in HTML
-const allTurns = [...userTurns, ...assistantTurns];
-allTurns.sort((a, b) => a.pos - b.pos);
-
-if (allTurns.length === 0) {
-  process.stderr.write(
-    "ERROR: No conversation turns found.\n" +
-    "The page may not have rendered fully. Try re-fetching:\n" +
-    "  python parse_claude.py <url>\n"
-  );
-  process.exit(1);
-}
+function parse(html) {
+  const userTurns      = extractUserTurns(html);
+  const assistantTurns = extractAssistantTurns(html);
+
+  // Merge and sort by position in HTML
+  const allTurns = [...userTurns, ...assistantTurns];
+  allTurns.sort((a, b) => a.pos - b.pos);
+
+  if (allTurns.length === 0) {
+    throw new Error(
+      "No conversation turns found.\n" +
+      "The page may not have rendered fully. Try re-fetching:\n" +
+      "  python parse_claude.py <url>"
+    );
+  }
 
-// Convert to clean messages, deduplicate
-const messages  = [];
-const seenTexts = new Set();
+  // Convert to clean messages, deduplicate
+  const messages  = [];
+  const seenTexts = new Set();
 
-for (const turn of allTurns) {
-  const text = htmlToText(turn.rawHtml);
-  if (!text || text.length < 2) continue;
-  if (seenTexts.has(text)) continue;
-  seenTexts.add(text);
-  messages.push({ role: turn.role, text });
-}
+  for (const turn of allTurns) {
+    const text = htmlToText(turn.rawHtml);
+    if (!text || text.length < 2) continue;
+    if (seenTexts.has(text)) continue;
+    seenTexts.add(text);
+    messages.push({ role: turn.role, text });
+  }
+
+  if (messages.length === 0) {
+    throw new Error("All extracted turns were empty after cleaning.");
+  }
 
-if (messages.length === 0) {
-  process.stderr.write("ERROR: All extracted turns were empty after cleaning.\n");
-  process.exit(1);
+  return messages;
 }
 
-// ── Write outputs ─────────────────────────────────────────────────────────────
-// Output JSON to stdout (for programmatic use)
-process.stdout.write(JSON.stringify(messages));
+run(parse, inputFile);
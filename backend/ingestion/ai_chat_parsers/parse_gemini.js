@@ -5,6 +5,7 @@
  * Usage:
  *   node parse_gemini.js                         (uses default path)
  *   node parse_gemini.js path/to/file.html       (custom path)
+ *   node parse_gemini.js -                       (read HTML from stdin)
  *
  * Output:
  *   test_output/parsed_gemini.txt   - clean readable conversation
@@ -19,6 +20,7 @@
 
 const fs   = require("fs");
 const path = require("path");
+const { run } = require("./parser_runner");
 
 // ── Config ────────────────────────────────────────────────────────────────────
 const inputFile  = process.argv[2] || "test_output/gemini_raw_html.html";
@@ -27,14 +29,8 @@ const outputTxt  = path.join(outputDir, "parsed_gemini.txt");
 const outputJson = path.join(outputDir, "parsed_gemini.json");
 // ─────────────────────────────────────────────────────────────────────────────
 
-if (!fs.existsSync(inputFile)) {
-  process.stderr.write(`ERROR: File not found: ${inputFile}\n`);
-  process.exit(1);
-}
 if (!fs.existsSync(outputDir)) fs.mkdirSync(outputDir, { recursive: true });
 
-const html = fs.readFileSync(inputFile, "utf8");
-
 // ── Helpers ───────────────────────────────────────────────────────────────────
 
 /** Strip all HTML tags and decode common entities */
@@ -205,21 +201,22 @@ function parseFromWIZ(html) {
 }
 
 // ── Run both strategies ───────────────────────────────────────────────────────
-let messages = parseFromDOM(html);
+function parse(html) {
+  let messages = parseFromDOM(html);
 
-if (messages.length === 0) {
-  messages = parseFromWIZ(html);
-}
+  if (messages.length === 0) {
+    messages = parseFromWIZ(html);
+  }
 
-if (messages.length === 0) {
-  process.stderr.write(
-    "ERROR: No conversation content found.\n" +
-    "The page may not have fully rendered. Re-fetch with a longer wait:\n" +
-    "  python parse_gemini.py <url>\n"
-  );
-  process.exit(1);
+  if (messages.length === 0) {
+    throw new Error(
+      "No conversation content found.\n" +
+      "The page may not have fully rendered. Re-fetch with a longer wait:\n" +
+      "  python parse_gemini.py <url>"
+    );
+  }
+
+  return messages;
 }
 
-// ── Write outputs ─────────────────────────────────────────────────────────────
-// Output JSON to stdout (for programmatic use)
-process.stdout.write(JSON.stringify(messages));
+run(parse, inputFile);
@@ -5,6 +5,7 @@
  * Usage:
  *   node parse_grok.js                         (uses default path)
  *   node parse_grok.js path/to/file.html       (custom path)
+ *   node parse_grok.js -                       (read HTML from stdin)
  *
  * Output:
  *   test_output/parsed_grok.txt   - clean readable conversation
@@ -25,6 +26,7 @@
 
 const fs   = require("fs");
 const path = require("path");
+const { run } = require("./parser_runner");
 
 // ── Config ────────────────────────────────────────────────────────────────────
 const inputFile  = process.argv[2] || "test_output/grok_raw_html.html";
@@ -33,14 +35,8 @@ const outputTxt  = path.join(outputDir, "parsed_grok.txt");
 const outputJson = path.join(outputDir, "parsed_grok.json");
 // ─────────────────────────────────────────────────────────────────────────────
 
-if (!fs.existsSync(inputFile)) {
-  process.stderr.write(`ERROR: File not found: ${inputFile}\n`);
-  process.exit(1);
-}
 if (!fs.existsSync(outputDir)) fs.mkdirSync(outputDir, { recursive: true });
 
-const html = fs.readFileSync(inputFile, "utf8");
-
 // ── Helpers ───────────────────────────────────────────────────────────────────
 
 /** Decode HTML entities */
@@ -171,34 +167,34 @@ function extractTurns(html) {
 }
 
 // ── Run extraction ────────────────────────────────────────────────────────────
-const rawTurns = extractTurns(html);
-
-if (rawTurns.length === 0) {
-  process.stderr.write(
-    "ERROR: No conversation turns found.\n" +
-    "The page may not have fully rendered. Try re-fetching:\n" +
-    "  python parse_grok.py <url>\n"
-  );
-  process.exit(1);
-}
+function parse(html) {
+  const rawTurns = extractTurns(html);
+
+  if (rawTurns.length === 0) {
+    throw new Error(
+      "No conversation turns found.\n" +
+      "The page may not have fully rendered. Try re-fetching:\n" +
+      "  python parse_grok.py <url>"
+    );
+  }
 
-// Convert to clean messages and deduplicate
-const messages = [];
-const seenTexts = new Set();
+  // Convert to clean messages and deduplicate
+  const messages = [];
+  const seenTexts = new Set();
 
-for (const turn of rawTurns) {
-  const text = htmlToText(turn.rawHtml);
-  if (!text || text.length < 2) continue;
-  if (seenTexts.has(text)) continue;
-  seenTexts.add(text);
-  messages.push({ role: turn.role, text });
-}
+  for (const turn of rawTurns) {
+    const text = htmlToText(turn.rawHtml);
+    if (!text || text.length < 2) continue;
+    if (seenTexts.has(text)) continue;
+    seenTexts.add(text);
+    messages.push({ role: turn.role, text });
+  }
+
+  if (messages.length === 0) {
+    throw new Error("All extracted turns were empty after cleaning.");
+  }
 
-if (messages.length === 0) {
-  process.stderr.write("ERROR: All extracted turns were empty after cleaning.\n");
-  process.exit(1);
+  return messages;
 }
 
-// ── Write outputs ─────────────────────────────────────────────────────────────
-// Output JSON to stdout (for programmatic use)
-process.stdout.write(JSON.stringify(messages));
+run(parse, inputFile);
@@ -5,6 +5,7 @@
  * Usage:
  *   node parse_perplexity.js                         (uses default path)
  *   node parse_perplexity.js path/to/file.html       (custom path)
+ *   node parse_perplexity.js -                       (read HTML from stdin)
  *
  * Output:
  *   test_output/parsed_perplexity.txt   - clean readable conversation
@@ -26,6 +27,7 @@
 
 const fs   = require("fs");
 const path = require("path");
+const { run } = require("./parser_runner");
 
 // ── Config ────────────────────────────────────────────────────────────────────
 const inputFile  = process.argv[2] || "test_output/perplexity_raw_html.html";
@@ -34,14 +36,8 @@ const outputTxt  = path.join(outputDir, "parsed_perplexity.txt");
 const outputJson = path.join(outputDir, "parsed_perplexity.json");
 // ─────────────────────────────────────────────────────────────────────────────
 
-if (!fs.existsSync(inputFile)) {
-  process.stderr.write(`ERROR: File not found: ${inputFile}\n`);
-  process.exit(1);
-}
 if (!fs.existsSync(outputDir)) fs.mkdirSync(outputDir, { recursive: true });
 
-const html = fs.readFileSync(inputFile, "utf8");
-
 // ── Helpers ───────────────────────────────────────────────────────────────────
 
 /** Decode HTML entities */
@@ -179,38 +175,38 @@ function extractAssistantTurns(html) {
 }
 
 // ── Run extraction ────────────────────────────────────────────────────────────
-const userTurns      = extractUserTurns(html);
-const assistantTurns = extractAssistantTurns(html);
-
-const allTurns = [...userTurns, ...assistantTurns];
-allTurns.sort((a, b) => a.pos - b.pos);
-
-if (allTurns.length === 0) {
-  process.stderr.write(
-    "ERROR: No conversation turns found.\n" +
-    "The page may be behind a login wall or not fully rendered.\n" +
-    "Try re-fetching: python parse_perplexity.py <url>\n"
-  );
-  process.exit(1);
-}
+function parse(html) {
+  const userTurns      = extractUserTurns(html);
+  const assistantTurns = extractAssistantTurns(html);
+
+  const allTurns = [...userTurns, ...assistantTurns];
+  allTurns.sort((a, b) => a.pos - b.pos);
+
+  if (allTurns.length === 0) {
+    throw new Error(
+      "No conversation turns found.\n" +
+      "The page may be behind a login wall or not fully rendered.\n" +
+      "Try re-fetching: python parse_perplexity.py <url>"
+    );
+  }
 
-// Clean and deduplicate
-const messages  = [];
-const seenTexts = new Set();
+  // Clean and deduplicate
+  const messages  = [];
+  const seenTexts = new Set();
 
-for (const turn of allTurns) {
-  const text = htmlToText(turn.rawHtml);
-  if (!text || text.length < 2) continue;
-  if (seenTexts.has(text)) continue;
-  seenTexts.add(text);
-  messages.push({ role: turn.role, text });
-}
+  for (const turn of allTurns) {
+    const text = htmlToText(turn.rawHtml);
+    if (!text || text.length < 2) continue;
+    if (seenTexts.has(text)) continue;
+    seenTexts.add(text);
+    messages.push({ role: turn.role, text });
+  }
+
+  if (messages.length === 0) {
+    throw new Error("All extracted turns were empty after cleaning.");
+  }
 
-if (messages.length === 0) {
-  process.stderr.write("ERROR: All extracted turns were empty after cleaning.\n");
-  process.exit(1);
+  return messages;
 }
 
-// ── Write outputs ─────────────────────────────────────────────────────────────
-// Output JSON to stdout (for programmatic use)
-process.stdout.write(JSON.stringify(messages));
+run(parse, inputFile);
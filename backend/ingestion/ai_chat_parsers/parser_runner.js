@@ -0,0 +1,112 @@
+/**
+ * parser_runner.js
+ * Shared entry point for the parse_*.js scripts.
+ *
+ * Each script defines parse(html) -> [{role, text}, ...] (throwing an Error
+ * when nothing can be extracted) and hands it to run():
+ *
+ *   require("./parser_runner").run(parse, inputFile);
+ *
+ * Modes:
+ *   node parse_x.js [path/to/file.html | -]
+ *     Parse one page (a file, or stdin for "-") and print the JSON messages
+ *     to stdout. Errors go to stderr with exit code 1.
+ *
+ *   node parse_x.js --serve
+ *     Stay alive and parse pages sent over stdin, so the backend pays node's
+ *     startup cost once per platform instead of once per page. Requests are
+ *     framed as "<byte length>\n<html>"; each reply is "<byte length>\n<json>"
+ *     where json is {"messages": [...]} or {"error": "..."}.
+ */
+
+"use strict";
+
+const fs = require("fs");
+
+const NEWLINE = 0x0a;
+
+function runOnce(parse, inputFile) {
+  if (inputFile !== "-" && !fs.existsSync(inputFile)) {
+    process.stderr.write(`ERROR: File not found: ${inputFile}\n`);
+    process.exit(1);
+  }
+
+  const html = fs.readFileSync(inputFile === "-" ? 0 : inputFile, "utf8");
+
+  let messages;
+  try {
+    messages = parse(html);
+  } catch (e) {
+    process.stderr.write(`ERROR: ${e.message}\n`);
+    process.exit(1);
+  }
+
+  // Output JSON to stdout (for programmatic use)
+  process.stdout.write(JSON.stringify(messages));
+}
+
+function reply(payload) {
+  const body = Buffer.from(JSON.stringify(payload), "utf8");
+  process.stdout.write(`${body.length}\n`);
+  process.stdout.write(body);
+}
+
+function serve(parse) {
+  // Chunks are only concatenated once a whole frame has arrived, so a
+  // multi-megabyte page isn't re-copied on every read.
+  let chunks = [];
+  let size = 0;
+  let expected = -1; // body length of the current request, -1 while reading its header
+
+  process.stdin.on("data", (chunk) => {
+    chunks.push(chunk);
+    size += chunk.length;
+
+    while (true) {
+      if (expected < 0) {
+        const buf = chunks.length === 1 ? chunks[0] : Buffer.concat(chunks, size);
+        const nl = buf.indexOf(NEWLINE);
+        if (nl === -1) {
+          chunks = [buf];
+          return;
+        }
+        expected = Number(buf.toString("ascii", 0, nl));
+        if (!Number.isInteger(expected) || expected < 0) {
+          process.stderr.write("ERROR: Malformed request header\n");
+          process.exit(1);
+        }
+        const rest = buf.subarray(nl + 1);
+        chunks = [rest];
+        size = rest.length;
+      }
+
+      if (size < expected) return;
+
+      const buf = chunks.length === 1 ? chunks[0] : Buffer.concat(chunks, size);
+      const html = buf.toString("utf8", 0, expected);
+      const rest = buf.subarray(expected);
+      chunks = [rest];
+      size = rest.length;
+      expected = -1;
+
+      try {
+        reply({ messages: parse(html) });
+      } catch (e) {
+        reply({ error: e.message });
+      }
+    }
+  });
+
+  // The backend closing our stdin means it is shutting down
+  process.stdin.on("end", () => process.exit(0));
+}
+
+function run(parse, inputFile) {
+  if (inputFile === "--serve") {
+    serve(parse);
+  } else {
+    runOnce(parse, inputFile);
+  }
+}
+
+module.exports = { run };
@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import List
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Chunk:
     text: str
     source_type: str       # "text" | "pdf" | "csv" | "code" | "chat" | "github"
@@ -18,5 +19,21 @@ class BaseIngester(ABC):
         """Ingest a source and return a list of chunks."""
         pass
 
+    def _read_text(self, source_path: str, errors: str = "strict") -> str:
+        """Read a whole UTF-8 file in one bulk read.
+
+        Skips the text IO layer's incremental decoder, but keeps its newline
+        handling: CRLF and lone CR line endings come back as LF.
+        """
+        return self._decode_text(Path(source_path).read_bytes(), errors)
+
+    @staticmethod
+    def _decode_text(data: bytes, errors: str = "strict") -> str:
+        """Decode UTF-8 file bytes the way `_read_text` does."""
+        content = data.decode("utf-8", errors=errors)
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content
+
     def _get_timestamp(self) -> str:
         return datetime.utcnow().isoformat()
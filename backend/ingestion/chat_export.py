@@ -1,23 +1,113 @@
 import os
-import json
 import re
-from typing import List
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+import orjson
 from backend.ingestion.base import BaseIngester, Chunk
 from backend.config import CHUNKING
 
+try:
+    import ijson
+except ModuleNotFoundError:  # pragma: no cover
+    ijson = None
+
 _MAX_CHUNK_CHARS = 1200  # max chars per chat chunk (Q+A pairs can be long)
+_SPLIT_OVERLAP = 100     # chars carried over between pieces of a split turn
+# Oversized turns are cut at the coarsest of these that occurs in the text
+_SPLIT_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+# Speaker labels in generic JSON dumps, normalized to "user" / "assistant"
+_ROLE_MAP = {
+    "user": "user", "human": "user", "me": "user",
+    "assistant": "assistant", "ai": "assistant", "bot": "assistant",
+    "claude": "assistant", "gpt": "assistant",
+}
+# OpenAI author roles that are kept (system/tool messages are dropped)
+_OPENAI_ROLES = frozenset(("user", "assistant"))
+# Gemini names the assistant side "model"
+_GEMINI_ROLES = {"user": "user", "model": "assistant"}
+
+# JSON exports at least this large are stream-parsed with ijson (when
+# installed) instead of being loaded into one object tree.
+_STREAM_MIN_BYTES = 16 * 1024 * 1024
+# Bytes read from the head of a file to guess its export format
+_SNIFF_BYTES = 4096
+
+# Claude markdown export turns: "**Human**:" or "**Assistant**:"
+_CLAUDE_MD_PATTERN = re.compile(
+    r'\*\*(Human|Assistant)\*\*:\s*(.*?)(?=\*\*(?:Human|Assistant)\*\*:|$)', re.DOTALL
+)
+
+
+def _split_pieces(text: str, separators: Tuple[str, ...]) -> List[str]:
+    """Cut text into pieces of at most _MAX_CHUNK_CHARS.
+
+    Splits on the first separator present in the text and only recurses into
+    pieces that are still too long, using the finer separators. Each
+    separator stays attached to the start of the piece that follows it.
+    """
+    if len(text) <= _MAX_CHUNK_CHARS:
+        return [text]
+    
+    for depth, sep in enumerate(separators):
+        if sep in text:
+            break
+    else:
+        # No separator left: hard cut by characters
+        return [text[i:i + _MAX_CHUNK_CHARS] for i in range(0, len(text), _MAX_CHUNK_CHARS)]
+    
+    finer = separators[depth + 1:]
+    parts = text.split(sep)
+    pieces = _split_pieces(parts[0], finer)
+    for part in parts[1:]:
+        pieces.extend(_split_pieces(sep + part, finer))
+    return pieces
+
+
+def _split_turn(text: str) -> Iterator[str]:
+    """Split an oversized turn into overlapping chunks of at most _MAX_CHUNK_CHARS.
+
+    Pieces from _split_pieces are merged greedily; when a chunk is emitted,
+    its trailing pieces (up to _SPLIT_OVERLAP chars) start the next one.
+    Chunks are yielded stripped, and blank ones are skipped.
+    """
+    window = deque()
+    size = 0
+    
+    for piece in _split_pieces(text, _SPLIT_SEPARATORS):
+        if not piece:
+            continue
+        if window and size + len(piece) > _MAX_CHUNK_CHARS:
+            chunk = "".join(window).strip()
+            if chunk:
+                yield chunk
+            while window and (size > _SPLIT_OVERLAP or size + len(piece) > _MAX_CHUNK_CHARS):
+                size -= len(window.popleft())
+        window.append(piece)
+        size += len(piece)
+    
+    if window:
+        chunk = "".join(window).strip()
+        if chunk:
+            yield chunk
+
+
+def _split_nonempty(text: str) -> Iterator[str]:
+    """Yield the non-blank chunk texts of one turn, splitting it only if oversized."""
+    if len(text) <= _MAX_CHUNK_CHARS:
+        if text.strip():
+            yield text
+        return
+    yield from _split_turn(text)
 
 
 class ChatExportIngester(BaseIngester):
     def __init__(self):
         self.chunk_size = CHUNKING["chat"]["size"]
         self.overlap = CHUNKING["chat"]["overlap"]
-        self._splitter = RecursiveCharacterTextSplitter(
-            chunk_size=_MAX_CHUNK_CHARS,
-            chunk_overlap=100,
-            separators=["\n\n", "\n", ". ", " "]
-        )
 
     def ingest(self, source_path: str) -> List[Chunk]:
         """Ingest chat exports from various platforms."""
@@ -31,12 +121,33 @@ class ChatExportIngester(BaseIngester):
         
         return []
 
+    def ingest_many(self, source_paths: List[str]) -> List[Chunk]:
+        """Ingest several chat exports in parallel; chunks keep `source_paths` order.
+
+        JSON decoding and turn building hold the GIL, so files are spread
+        over worker processes rather than threads.
+        """
+        if len(source_paths) <= 1:
+            return [chunk for path in source_paths for chunk in self.ingest(path)]
+        
+        chunks = []
+        workers = min(os.cpu_count() or 1, len(source_paths))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file_chunks in pool.map(self.ingest, source_paths):
+                chunks.extend(file_chunks)
+        return chunks
+
     def _parse_json_export(self, source_path: str, filename: str) -> List[Chunk]:
         """Parse JSON chat exports (OpenAI, Claude, Gemini formats)."""
         chunks = []
         
-        with open(source_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if ijson is not None and os.path.getsize(source_path) >= _STREAM_MIN_BYTES:
+            chunks = self._parse_json_export_streaming(source_path, filename)
+            if chunks:
+                return chunks
+        
+        # orjson parses the raw bytes directly, with no str decode step
+        data = orjson.loads(Path(source_path).read_bytes())
         
         # Detect platform format
         platform = self._detect_platform(data)
@@ -53,6 +164,39 @@ class ChatExportIngester(BaseIngester):
         
         return chunks
 
+    def _parse_json_export_streaming(self, source_path: str, filename: str) -> List[Chunk]:
+        """Stream-parse a large OpenAI or Claude export with ijson.
+
+        Conversation nodes are materialized one at a time, so peak memory is
+        the extracted messages rather than the whole parsed document. The
+        format is guessed from the first few KB; returns [] when the guess
+        doesn't pan out so the caller can fall back to a full parse.
+        """
+        with open(source_path, "rb") as f:
+            head = f.read(_SNIFF_BYTES)
+            f.seek(0)
+            
+            if b'"mapping"' in head:
+                chunks = self._create_openai_chunks(
+                    ijson.kvitems(f, "mapping", use_float=True), filename, "Untitled"
+                )
+                if chunks:
+                    # The title is a sibling of 'mapping'; it usually sits near
+                    # the top, so this second pass stops early
+                    f.seek(0)
+                    title = next(ijson.items(f, "title", use_float=True), "Untitled")
+                    for chunk in chunks:
+                        chunk.metadata["conversation_id"] = title
+                return chunks
+            
+            if b'"conversations"' in head:
+                chunks = []
+                for conv in ijson.items(f, "conversations.item", use_float=True):
+                    chunks.extend(self._parse_claude_conversation(conv, filename))
+                return chunks
+        
+        return []
+
     def _detect_platform(self, data: dict) -> str:
         """Detect which platform the export is from."""
         if "mapping" in data:
@@ -65,24 +209,37 @@ class ChatExportIngester(BaseIngester):
 
     def _parse_openai_format(self, data: dict, filename: str) -> List[Chunk]:
         """Parse OpenAI conversation export format."""
-        chunks = []
-        
         # OpenAI exports have a 'mapping' structure
         mapping = data.get("mapping", {})
         title = data.get("title", "Untitled")
         
+        return self._create_openai_chunks(mapping.items(), filename, title)
+
+    def _create_openai_chunks(
+        self,
+        nodes: Iterable[Tuple[str, dict]],
+        filename: str,
+        title: str
+    ) -> List[Chunk]:
+        """Turn (node_id, node) pairs from an OpenAI 'mapping' into turn chunks."""
+        chunks = []
+        
         # Extract messages in order
         messages = []
-        for node_id, node in mapping.items():
+        for node_id, node in nodes:
             message = node.get("message")
             if message:
                 role = message.get("author", {}).get("role", "")
                 content_parts = message.get("content", {}).get("parts", [])
-                content = " ".join([p for p in content_parts if isinstance(p, str)])
+                # Parts are almost always all text; join them as-is then
+                if all(isinstance(p, str) for p in content_parts):
+                    content = " ".join(content_parts)
+                else:
+                    content = " ".join(p for p in content_parts if isinstance(p, str))
                 
-                if role in ["user", "assistant"]:
+                if role in _OPENAI_ROLES:
                     messages.append({
-                        "role": "user" if role == "user" else "assistant",
+                        "role": role,
                         "content": content
                     })
         
@@ -101,26 +258,29 @@ class ChatExportIngester(BaseIngester):
         conversations = data.get("conversations", [])
         
         for conv in conversations:
-            conv_name = conv.get("name", "Untitled")
-            messages = conv.get("chat_messages", [])
-            
-            formatted_messages = []
-            for msg in messages:
-                role = "user" if msg.get("sender") == "human" else "assistant"
-                content = msg.get("text", "")
-                formatted_messages.append({
-                    "role": role,
-                    "content": content
-                })
-            
-            formatted_messages = self._merge_consecutive_roles(formatted_messages)
-            conv_chunks = self._create_turn_pairs(
-                formatted_messages, filename, "claude", conv_name
-            )
-            chunks.extend(conv_chunks)
+            chunks.extend(self._parse_claude_conversation(conv, filename))
         
         return chunks
 
+    def _parse_claude_conversation(self, conv: dict, filename: str) -> List[Chunk]:
+        """Parse one entry of a Claude export's 'conversations' array."""
+        conv_name = conv.get("name", "Untitled")
+        messages = conv.get("chat_messages", [])
+        
+        formatted_messages = []
+        for msg in messages:
+            role = "user" if msg.get("sender") == "human" else "assistant"
+            content = msg.get("text", "")
+            formatted_messages.append({
+                "role": role,
+                "content": content
+            })
+        
+        formatted_messages = self._merge_consecutive_roles(formatted_messages)
+        return self._create_turn_pairs(
+            formatted_messages, filename, "claude", conv_name
+        )
+
     def _parse_gemini_format(self, data: dict, filename: str) -> List[Chunk]:
         """Parse Gemini conversation export format."""
         chunks = []
@@ -130,18 +290,23 @@ class ChatExportIngester(BaseIngester):
         
         messages = []
         for entry in history:
-            role = entry.get("role", "")
+            role = _GEMINI_ROLES.get(entry.get("role", ""))
+            if role is None:
+                continue
+            
             parts = entry.get("parts", [])
-            content = " ".join([
-                p.get("text", "") if isinstance(p, dict) else str(p)
-                for p in parts
-            ])
+            if all(isinstance(p, str) for p in parts):
+                content = " ".join(parts)
+            else:
+                content = " ".join(
+                    p.get("text", "") if isinstance(p, dict) else str(p)
+                    for p in parts
+                )
             
-            if role in ["user", "model"]:
-                messages.append({
-                    "role": "user" if role == "user" else "assistant",
-                    "content": content
-                })
+            messages.append({
+                "role": role,
+                "content": content
+            })
         
         messages = self._merge_consecutive_roles(messages)
         chunks = self._create_turn_pairs(messages, filename, "gemini", "Gemini Chat")
@@ -160,10 +325,8 @@ class ChatExportIngester(BaseIngester):
                     role = item.get("role", item.get("sender", "user"))
                     content = item.get("content", item.get("text", item.get("message", "")))
                     
-                    if role in ["user", "human", "me"]:
-                        role = "user"
-                    elif role in ["assistant", "ai", "bot", "claude", "gpt"]:
-                        role = "assistant"
+                    if isinstance(role, str):
+                        role = _ROLE_MAP.get(role, role)
                     
                     if content:
                         messages.append({"role": role, "content": str(content)})
@@ -178,13 +341,9 @@ class ChatExportIngester(BaseIngester):
         """Parse markdown chat exports (Claude format)."""
         chunks = []
         
-        with open(source_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = self._read_text(source_path)
         
-        # Pattern for Claude markdown: "**Human**:" or "**Assistant**:"
-        pattern = r'\*\*(Human|Assistant)\*\*:\s*(.*?)(?=\*\*(?:Human|Assistant)\*\*:|$)'
-        
-        matches = re.findall(pattern, content, re.DOTALL)
+        matches = _CLAUDE_MD_PATTERN.findall(content)
         
         messages = []
         for role, text in matches:
@@ -201,15 +360,17 @@ class ChatExportIngester(BaseIngester):
         if not messages:
             return messages
         
-        merged = [messages[0]]
+        # Collect each run's parts and join once, rather than re-copying the
+        # growing content string on every merge
+        merged = [{"role": messages[0]["role"], "parts": [messages[0]["content"]]}]
         
         for msg in messages[1:]:
             if msg["role"] == merged[-1]["role"]:
-                merged[-1]["content"] += "\n\n" + msg["content"]
+                merged[-1]["parts"].append(msg["content"])
             else:
-                merged.append(msg)
+                merged.append({"role": msg["role"], "parts": [msg["content"]]})
         
-        return merged
+        return [{"role": m["role"], "content": "\n\n".join(m["parts"])} for m in merged]
 
     def _create_turn_pairs(
         self,
@@ -220,6 +381,8 @@ class ChatExportIngester(BaseIngester):
     ) -> List[Chunk]:
         """Create Q+A turn pairs as chunks."""
         chunks = []
+        # One timestamp for the whole conversation rather than two per chunk
+        timestamp = self._get_timestamp()
         
         i = 0
         turn_index = 0
@@ -238,25 +401,23 @@ class ChatExportIngester(BaseIngester):
                 else:
                     i += 1
                 
-                # Format as Q+A turn
-                turn_text = f"Human: {user_content}\nAssistant: {assistant_content}"
-
-                # Split if oversized
-                texts = self._splitter.split_text(turn_text) if len(turn_text) > _MAX_CHUNK_CHARS else [turn_text]
-                for t in texts:
-                    if t.strip():
-                        chunks.append(Chunk(
-                            text=t,
-                            source_type="chat",
-                            source_name=filename,
-                            metadata={
-                                "platform": platform,
-                                "conversation_id": conversation_id,
-                                "turn_index": turn_index,
-                                "date": self._get_timestamp(),
-                                "ingested_at": self._get_timestamp()
-                            }
-                        ))
+                # Format as Q+A turn; join sizes the result once, then copies
+                # each part once, which matters for very long responses
+                turn_text = "".join(("Human: ", user_content, "\nAssistant: ", assistant_content))
+
+                # Split if oversized. Pieces of one turn carry identical
+                # metadata, so they share a single dict
+                metadata = {
+                    "platform": platform,
+                    "conversation_id": conversation_id,
+                    "turn_index": turn_index,
+                    "date": timestamp,
+                    "ingested_at": timestamp
+                }
+                chunks += [
+                    Chunk(t, "chat", filename, metadata)
+                    for t in _split_nonempty(turn_text)
+                ]
                 turn_index += 1
             else:
                 i += 1
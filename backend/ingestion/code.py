@@ -1,9 +1,20 @@
 import os
 import re
-from typing import List
+import hashlib
+import importlib
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
 from backend.ingestion.base import BaseIngester, Chunk
 from backend.config import CHUNKING
 
+# Imported by _load_ts_language on the first tree-sitter parse, so processes
+# that never ingest code don't pay for it
+tree_sitter = None
+
 # Language extensions mapping
 LANGUAGE_EXTENSIONS = {
     ".py": "python",
@@ -31,6 +42,138 @@ LANGUAGE_EXTENSIONS = {
 
 SUPPORTED_EXTENSIONS = set(LANGUAGE_EXTENSIONS.keys())
 
+# Regex fallback patterns, compiled once at import
+_PY_DEF_CLASS = re.compile(r'^(def |class )(\w+)', re.MULTILINE)
+# A non-blank line with no indentation
+_TOP_LEVEL_LINE = re.compile(r'^\S', re.MULTILINE)
+_JS_DECL = re.compile(r'((?:export\s+)?(?:async\s+)?function\s+(\w+)|(?:export\s+)?class\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>))')
+_JAVA_CLASS = re.compile(r'(?:public|private|protected)?\s*(?:abstract)?\s*class\s+(\w+)')
+_JAVA_METHOD = re.compile(r'(?:public|private|protected)?\s*(?:static)?\s*\w+\s+(\w+)\s*\([^)]*\)\s*\{')
+_GO_FUNC = re.compile(r'func\s+(?:\([^)]+\)\s+)?(\w+)\s*\([^)]*\)')
+_NEWLINE = re.compile(r'\n')
+_WORD = re.compile(r'\w')
+
+# Parsed blocks of recently ingested files, keyed by (language, content
+# digest): re-ingesting an unchanged file (the same repo again, a re-upload)
+# skips parsing. Uploads and clones land in fresh temp paths, so the key is
+# the content rather than path + mtime. Shared by all CodeIngester instances.
+_PARSE_CACHE_SIZE = 512
+_PARSE_CACHE_MAX_BYTES = 1024 * 1024  # larger files aren't cached
+_parse_cache: "OrderedDict[Tuple[str, bytes], List[dict]]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def _newline_offsets(content: str) -> List[int]:
+    """Ascending offsets of every newline in `content`.
+
+    The 1-based line of offset `pos` is `bisect_left(offsets, pos) + 1`, so
+    each regex match is placed with a binary search instead of re-counting
+    newlines in the whole prefix before it.
+    """
+    return [m.start() for m in _NEWLINE.finditer(content)]
+
+
+# Grammar package per language for tree-sitter parsing
+_TS_GRAMMARS = {
+    "python": "tree_sitter_python",
+    "javascript": "tree_sitter_javascript",
+    "typescript": "tree_sitter_typescript",
+    "java": "tree_sitter_java",
+    "go": "tree_sitter_go",
+    "ruby": "tree_sitter_ruby",
+    "rust": "tree_sitter_rust",
+}
+
+# Query for functions and classes
+_TS_QUERIES = {
+    "python": """
+        (function_definition name: (identifier) @name) @function
+        (class_definition name: (identifier) @name) @class
+    """,
+    "javascript": """
+        (function_declaration name: (identifier) @name) @function
+        (class_declaration name: (identifier) @name) @class
+        (method_definition name: (property_identifier) @name) @function
+    """,
+    "typescript": """
+        (function_declaration name: (identifier) @name) @function
+        (class_declaration name: (type_identifier) @name) @class
+        (method_definition name: (property_identifier) @name) @function
+    """,
+    "java": """
+        (method_declaration name: (identifier) @name) @function
+        (class_declaration name: (identifier) @name) @class
+    """,
+    "go": """
+        (function_declaration name: (identifier) @name) @function
+        (type_declaration (type_spec name: (type_identifier) @name)) @class
+    """,
+    "ruby": """
+        (method name: (identifier) @name) @function
+        (class name: (constant) @name) @class
+    """,
+    "rust": """
+        (function_item name: (identifier) @name) @function
+        (struct_item name: (type_identifier) @name) @class
+    """
+}
+
+# Language and compiled Query per language, built on first use (None when the
+# grammar isn't installed). Parsers hold per-parse state, so each thread
+# gets its own.
+_ts_languages: Dict[str, Optional[Tuple[Any, Any]]] = {}
+_ts_languages_lock = threading.Lock()
+_ts_local = threading.local()
+
+
+def _load_ts_language(language: str) -> Optional[Tuple[Any, Any]]:
+    global tree_sitter
+    with _ts_languages_lock:
+        if language in _ts_languages:
+            return _ts_languages[language]
+        compiled = None
+        if language in _TS_GRAMMARS:
+            try:
+                if tree_sitter is None:
+                    tree_sitter = importlib.import_module("tree_sitter")
+                # Only the requested language's grammar package is imported
+                grammar = importlib.import_module(_TS_GRAMMARS[language])
+                # tree_sitter_typescript ships TS and TSX grammars under separate names
+                language_fn = getattr(grammar, "language_typescript", None) or grammar.language
+                lang = tree_sitter.Language(language_fn())
+                if hasattr(lang, "query"):
+                    query = lang.query(_TS_QUERIES[language])
+                else:
+                    query = tree_sitter.Query(lang, _TS_QUERIES[language])
+                compiled = (lang, query)
+            except Exception:
+                compiled = None
+        _ts_languages[language] = compiled
+        return compiled
+
+
+def _get_ts_parser(language: str) -> Optional[Tuple[Any, Any]]:
+    """Return a (Parser, Query) pair for `language`, or None if unsupported."""
+    parsers = getattr(_ts_local, "parsers", None)
+    if parsers is None:
+        parsers = _ts_local.parsers = {}
+    if language not in parsers:
+        compiled = _load_ts_language(language)
+        if compiled is None:
+            parsers[language] = None
+        else:
+            lang, query = compiled
+            parsers[language] = (tree_sitter.Parser(lang), query)
+    return parsers[language]
+
+
+def _ts_captures(query, node):
+    # py-tree-sitter 0.25 moved captures() from Query to QueryCursor
+    query_cursor = getattr(tree_sitter, "QueryCursor", None)
+    if query_cursor is None:
+        return query.captures(node)
+    return query_cursor(query).captures(node)
+
 
 class CodeIngester(BaseIngester):
     def __init__(self):
@@ -48,15 +191,9 @@ class CodeIngester(BaseIngester):
         language = LANGUAGE_EXTENSIONS[ext]
         filename = os.path.basename(source_path)
         
-        with open(source_path, "r", encoding="utf-8", errors="replace") as f:
-            content = f.read()
+        code_blocks = self._parse_file(source_path, language)
         
-        # Try tree-sitter parsing first
-        code_blocks = self._parse_with_tree_sitter(content, language)
-        
-        # Fallback to regex if tree-sitter fails or returns nothing
-        if not code_blocks:
-            code_blocks = self._parse_with_regex(content, language)
+        timestamp = self._get_timestamp()
         
         for block in code_blocks:
             block_type = block.get("type", "unknown")
@@ -81,7 +218,7 @@ class CodeIngester(BaseIngester):
                             "class_name": sub.get("name") if sub.get("type") == "class" else None,
                             "start_line": sub.get("start_line", start_line),
                             "end_line": sub.get("end_line", end_line),
-                            "ingested_at": self._get_timestamp()
+                            "ingested_at": timestamp
                         }
                     )
                     chunks.append(chunk)
@@ -97,117 +234,133 @@ class CodeIngester(BaseIngester):
                         "class_name": name if block_type == "class" else None,
                         "start_line": start_line,
                         "end_line": end_line,
-                        "ingested_at": self._get_timestamp()
+                        "ingested_at": timestamp
                     }
                 )
                 chunks.append(chunk)
         
         return chunks
 
+    def _parse_file(self, source_path: str, language: str) -> List[dict]:
+        """Read and parse a file into blocks, reusing cached blocks for known content.
+
+        Cached block lists are shared, so callers must treat them as read-only.
+        """
+        data = Path(source_path).read_bytes()
+        key = None
+        if len(data) <= _PARSE_CACHE_MAX_BYTES:
+            key = (language, hashlib.blake2b(data, digest_size=16).digest())
+            with _parse_cache_lock:
+                blocks = _parse_cache.get(key)
+                if blocks is not None:
+                    _parse_cache.move_to_end(key)
+                    return blocks
+        
+        content = self._decode_text(data, errors="replace")
+        
+        # Try tree-sitter parsing first
+        blocks = self._parse_with_tree_sitter(content, language)
+        
+        # Fallback to regex if tree-sitter fails or returns nothing
+        if not blocks:
+            blocks = self._parse_with_regex(content, language)
+        
+        if key is not None:
+            with _parse_cache_lock:
+                _parse_cache[key] = blocks
+                _parse_cache.move_to_end(key)
+                while len(_parse_cache) > _PARSE_CACHE_SIZE:
+                    _parse_cache.popitem(last=False)
+        return blocks
+
+    def ingest_many(self, source_paths: List[str]) -> List[Chunk]:
+        """Ingest several code files concurrently; chunks keep `source_paths` order.
+
+        Threads rather than processes: tree-sitter parses with the GIL
+        released, and each worker thread keeps its parsers across files.
+        """
+        if len(source_paths) <= 1:
+            return [chunk for path in source_paths for chunk in self.ingest(path)]
+        
+        chunks = []
+        workers = min(os.cpu_count() or 1, len(source_paths))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for file_chunks in pool.map(self.ingest, source_paths):
+                chunks.extend(file_chunks)
+        return chunks
+
     def _parse_with_tree_sitter(self, content: str, language: str) -> List[dict]:
         """Parse code using tree-sitter for accurate function/class detection."""
         blocks = []
         
         try:
-            import tree_sitter_python as tspython
-            import tree_sitter_javascript as tsjavascript
-            import tree_sitter_typescript as tstypescript
-            import tree_sitter_java as tsjava
-            import tree_sitter_go as tsgo
-            import tree_sitter_ruby as tsruby
-            import tree_sitter_rust as tsrust
-            from tree_sitter import Language, Parser
-            
-            # Map language to tree-sitter language module
-            lang_map = {
-                "python": tspython,
-                "javascript": tsjavascript,
-                "typescript": tstypescript,
-                "java": tsjava,
-                "go": tsgo,
-                "ruby": tsruby,
-                "rust": tsrust
-            }
-            
-            if language not in lang_map:
+            compiled = _get_ts_parser(language)
+            if compiled is None:
                 return blocks
+            parser, query = compiled
             
-            lang_module = lang_map[language]
-            parser = Parser(Language(lang_module.language()))
-            
-            tree = parser.parse(bytes(content, "utf8"))
+            source = content.encode("utf8")
+            tree = parser.parse(source)
             root = tree.root_node
             
-            # Query for functions and classes
-            query_map = {
-                "python": """
-                    (function_definition name: (identifier) @name) @function
-                    (class_definition name: (identifier) @name) @class
-                """,
-                "javascript": """
-                    (function_declaration name: (identifier) @name) @function
-                    (class_declaration name: (identifier) @name) @class
-                    (method_definition name: (property_identifier) @name) @function
-                """,
-                "typescript": """
-                    (function_declaration name: (identifier) @name) @function
-                    (class_declaration name: (type_identifier) @name) @class
-                    (method_definition name: (property_identifier) @name) @function
-                """,
-                "java": """
-                    (method_declaration name: (identifier) @name) @function
-                    (class_declaration name: (identifier) @name) @class
-                """,
-                "go": """
-                    (function_declaration name: (identifier) @name) @function
-                    (type_declaration (type_spec name: (type_identifier) @name)) @class
-                """,
-                "ruby": """
-                    (method name: (identifier) @name) @function
-                    (class name: (constant) @name) @class
-                """,
-                "rust": """
-                    (function_item name: (identifier) @name) @function
-                    (struct_item name: (type_identifier) @name) @class
-                """
-            }
-            
-            if language not in query_map:
-                return blocks
+            captures = _ts_captures(query, root)
+            # py-tree-sitter < 0.23 returns [(node, capture_name), ...] in
+            # source order; newer releases return {capture_name: [node, ...]}
+            if isinstance(captures, dict):
+                captures = [(node, cn) for cn, nodes in captures.items() for node in nodes]
+                captures.sort(key=lambda c: (c[0].start_byte, -c[0].end_byte))
             
-            query = parser.language.query(query_map[language])
-            captures = query.captures(root)
+            # @name nodes sorted by position: a block's name is the first one
+            # starting inside it, found with one binary search
+            name_nodes = sorted((n for n, cn in captures if cn == "name"), key=lambda n: n.start_byte)
+            name_starts = [n.start_byte for n in name_nodes]
             
             # Process captures
             seen_ranges = set()
+            # Blocks enclosing the current capture, innermost last, as
+            # (end_byte, block). Each block records the blocks nested directly
+            # inside it so _split_large_block can split along them without
+            # re-parsing its text.
+            enclosing = []
             
             for node, capture_name in captures:
-                if node.start_byte in seen_ranges:
+                # @name captures only label their enclosing block
+                if capture_name == "name" or node.start_byte in seen_ranges:
                     continue
                 
                 seen_ranges.add(node.start_byte)
                 
                 block_type = "function" if "function" in capture_name else "class"
                 
-                # Get the name from captures
+                # Get the name from captures. Node offsets are byte offsets
+                # into the UTF-8 source, so slice the bytes, not the str.
                 name = "unknown"
-                for n, cn in captures:
-                    if cn == "name" and n.start_byte >= node.start_byte and n.end_byte <= node.end_byte:
-                        name = content[n.start_byte:n.end_byte]
-                        break
+                k = bisect_left(name_starts, node.start_byte)
+                if k < len(name_nodes) and name_nodes[k].end_byte <= node.end_byte:
+                    n = name_nodes[k]
+                    name = source[n.start_byte:n.end_byte].decode("utf8", errors="replace")
                 
-                text = content[node.start_byte:node.end_byte]
+                text = source[node.start_byte:node.end_byte].decode("utf8", errors="replace")
                 
-                blocks.append({
+                block = {
                     "type": block_type,
                     "name": name,
                     "text": text,
                     "start_line": node.start_point[0] + 1,
-                    "end_line": node.end_point[0] + 1
-                })
+                    "end_line": node.end_point[0] + 1,
+                    "children": []
+                }
+                
+                while enclosing and enclosing[-1][0] <= node.start_byte:
+                    enclosing.pop()
+                # Nested blocks are reached through their parent's children,
+                # so each piece of code is emitted once
+                if enclosing:
+                    enclosing[-1][1]["children"].append(block)
+                else:
+                    blocks.append(block)
+                enclosing.append((node.end_byte, block))
             
-        except ImportError:
-            return blocks
         except Exception:
             return blocks
         
@@ -216,76 +369,46 @@ class CodeIngester(BaseIngester):
     def _parse_with_regex(self, content: str, language: str) -> List[dict]:
         """Fallback regex parsing for function/class detection."""
         blocks = []
-        lines = content.split("\n")
+        nl_offsets = _newline_offsets(content)
         
         if language == "python":
-            # Python: match def/class at start of line
-            pattern = r'^(def |class )(\w+)'
-            current_block = None
-            current_indent = 0
-            current_lines = []
-            current_name = ""
-            block_type = ""
-            start_line = 0
-            
-            for i, line in enumerate(lines):
-                match = re.match(pattern, line)
-                if match:
-                    # Save previous block
-                    if current_block and current_lines:
-                        blocks.append({
-                            "type": block_type,
-                            "name": current_name,
-                            "text": "\n".join(current_lines),
-                            "start_line": start_line,
-                            "end_line": i
-                        })
-                    
-                    block_type = "function" if match.group(1) == "def " else "class"
-                    current_name = match.group(2)
-                    current_indent = len(line) - len(line.lstrip())
-                    current_lines = [line]
-                    start_line = i + 1
-                elif current_lines:
-                    # Check if still in current block
-                    if line.strip() == "" or (len(line) - len(line.lstrip()) > current_indent):
-                        current_lines.append(line)
-                    else:
-                        # Block ended
-                        blocks.append({
-                            "type": block_type,
-                            "name": current_name,
-                            "text": "\n".join(current_lines),
-                            "start_line": start_line,
-                            "end_line": i
-                        })
-                        current_lines = []
-                        current_name = ""
-            
-            # Save last block
-            if current_lines:
+            # Python: match def/class at start of line. A block runs until the
+            # next non-blank line that starts unindented.
+            for match in _PY_DEF_CLASS.finditer(content):
+                block_start = match.start()
+                line_end = content.find("\n", block_start)
+                next_top = _TOP_LEVEL_LINE.search(content, line_end + 1) if line_end != -1 else None
+                if next_top is not None and _PY_DEF_CLASS.match(content, next_top.start()):
+                    # A def/class straight after the block starts its own
+                    # block without saving this one
+                    continue
+                
+                if next_top is None:
+                    text = content[block_start:]
+                    end_line = len(nl_offsets) + 1
+                else:
+                    text = content[block_start:next_top.start() - 1]
+                    end_line = bisect_left(nl_offsets, next_top.start())
+                
                 blocks.append({
-                    "type": block_type,
-                    "name": current_name,
-                    "text": "\n".join(current_lines),
-                    "start_line": start_line,
-                    "end_line": len(lines)
+                    "type": "function" if match.group(1) == "def " else "class",
+                    "name": match.group(2),
+                    "text": text,
+                    "start_line": bisect_left(nl_offsets, block_start) + 1,
+                    "end_line": end_line
                 })
         
         elif language in ["javascript", "typescript"]:
             # JS/TS: match function/class declarations
-            pattern = r'((?:export\s+)?(?:async\s+)?function\s+(\w+)|(?:export\s+)?class\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>))'
-            
-            for match in re.finditer(pattern, content):
+            for match in _JS_DECL.finditer(content):
                 func_name = match.group(2) or match.group(3) or match.group(4)
                 block_type = "class" if match.group(3) else "function"
                 
-                start_pos = match.start()
-                start_line = content[:start_pos].count("\n") + 1
+                start_line = bisect_left(nl_offsets, match.start()) + 1
                 
                 # Find end of block (simplified)
                 text = self._extract_js_block(content, match.start())
-                end_line = start_line + text.count("\n")
+                end_line = bisect_left(nl_offsets, match.start() + len(text)) + 1
                 
                 blocks.append({
                     "type": block_type,
@@ -297,14 +420,11 @@ class CodeIngester(BaseIngester):
         
         elif language == "java":
             # Java: match method/class declarations
-            class_pattern = r'(?:public|private|protected)?\s*(?:abstract)?\s*class\s+(\w+)'
-            method_pattern = r'(?:public|private|protected)?\s*(?:static)?\s*\w+\s+(\w+)\s*\([^)]*\)\s*\{'
-            
-            for match in re.finditer(class_pattern, content):
+            for match in _JAVA_CLASS.finditer(content):
                 name = match.group(1)
-                start_line = content[:match.start()].count("\n") + 1
+                start_line = bisect_left(nl_offsets, match.start()) + 1
                 text = self._extract_brace_block(content, match.start())
-                end_line = start_line + text.count("\n")
+                end_line = bisect_left(nl_offsets, match.start() + len(text)) + 1
                 
                 blocks.append({
                     "type": "class",
@@ -314,11 +434,11 @@ class CodeIngester(BaseIngester):
                     "end_line": end_line
                 })
             
-            for match in re.finditer(method_pattern, content):
+            for match in _JAVA_METHOD.finditer(content):
                 name = match.group(1)
-                start_line = content[:match.start()].count("\n") + 1
+                start_line = bisect_left(nl_offsets, match.start()) + 1
                 text = self._extract_brace_block(content, match.start())
-                end_line = start_line + text.count("\n")
+                end_line = bisect_left(nl_offsets, match.start() + len(text)) + 1
                 
                 blocks.append({
                     "type": "function",
@@ -330,13 +450,11 @@ class CodeIngester(BaseIngester):
         
         elif language == "go":
             # Go: match func declarations
-            pattern = r'func\s+(?:\([^)]+\)\s+)?(\w+)\s*\([^)]*\)'
-            
-            for match in re.finditer(pattern, content):
+            for match in _GO_FUNC.finditer(content):
                 name = match.group(1)
-                start_line = content[:match.start()].count("\n") + 1
+                start_line = bisect_left(nl_offsets, match.start()) + 1
                 text = self._extract_brace_block(content, match.start())
-                end_line = start_line + text.count("\n")
+                end_line = bisect_left(nl_offsets, match.start() + len(text)) + 1
                 
                 blocks.append({
                     "type": "function",
@@ -353,30 +471,33 @@ class CodeIngester(BaseIngester):
                 "name": os.path.basename(content[:50]),
                 "text": content,
                 "start_line": 1,
-                "end_line": len(lines)
+                "end_line": len(nl_offsets) + 1
             })
         
         return blocks
 
     def _extract_brace_block(self, content: str, start_pos: int) -> str:
         """Extract a brace-delimited block starting from position."""
+        # Jump between braces with str.find (a C-level scan) instead of
+        # stepping through every character in Python
         brace_count = 0
         in_block = False
-        end_pos = start_pos
+        next_open = content.find("{", start_pos)
+        next_close = content.find("}", start_pos)
         
-        for i in range(start_pos, len(content)):
-            char = content[i]
-            
-            if char == "{":
+        while next_close >= 0:
+            if 0 <= next_open < next_close:
                 brace_count += 1
                 in_block = True
-            elif char == "}":
+                next_open = content.find("{", next_open + 1)
+            else:
                 brace_count -= 1
                 if in_block and brace_count == 0:
-                    end_pos = i + 1
-                    break
+                    return content[start_pos:next_close + 1]
+                next_close = content.find("}", next_close + 1)
         
-        return content[start_pos:end_pos]
+        # Unbalanced: no block closes
+        return ""
 
     def _extract_js_block(self, content: str, start_pos: int) -> str:
         """Extract a JS function/class block."""
@@ -387,6 +508,11 @@ class CodeIngester(BaseIngester):
         text = block["text"]
         sub_blocks = []
         
+        # Blocks from tree-sitter already carry their nested blocks
+        children = block.get("children")
+        if children is not None:
+            return self._split_by_children(block, children, language)
+        
         # Try to find inner functions/blocks
         inner_blocks = self._parse_with_regex(text, language)
         
@@ -409,37 +535,82 @@ class CodeIngester(BaseIngester):
         
         return sub_blocks
 
+    def _split_by_children(self, block: dict, children: List[dict], language: str) -> List[dict]:
+        """Split a tree-sitter block along its nested blocks.
+
+        The parent's own lines around and between the children (signature,
+        docstring, decorators, statements) become line-split pieces of their
+        own, so no code is dropped. Pieces come out in source order.
+        """
+        first, last = block["start_line"], block["end_line"]
+        if not children or any(
+            c["start_line"] < first or c["end_line"] > last for c in children
+        ):
+            return self._split_by_lines(block, 0)
+        
+        lines = block["text"].split("\n")
+        sub_blocks = []
+        
+        def add_gap(start_line: int, end_line: int):
+            # Lines [start_line, end_line] of the parent not inside any child
+            if start_line > end_line:
+                return
+            text = "\n".join(lines[start_line - first:end_line - first + 1])
+            # Skip blank runs and lone closing braces
+            if not _WORD.search(text):
+                return
+            gap = {
+                "type": block["type"],
+                "name": block["name"],
+                "text": text,
+                "start_line": start_line,
+                "end_line": end_line
+            }
+            sub_blocks.extend(self._split_by_lines(gap, 0))
+        
+        next_line = first  # first parent line not yet emitted
+        for child in children:
+            # A child starting mid-line (after the parent's header on the
+            # same line) owns that line
+            add_gap(next_line, child["start_line"] - 1)
+            if len(child["text"]) <= self.chunk_size:
+                sub_blocks.append(child)
+            else:
+                sub_blocks.extend(self._split_large_block(child, language))
+            next_line = max(next_line, child["end_line"] + 1)
+        add_gap(next_line, last)
+        
+        return sub_blocks
+
     def _split_by_lines(self, block: dict, base_line: int) -> List[dict]:
         """Split a block by lines when no structure is found."""
-        lines = block["text"].split("\n")
+        text = block["text"]
+        # Offset just past the last character of each line; a sub-block is
+        # then one slice of the text instead of a join of per-line strings
+        line_ends = _newline_offsets(text)
+        line_ends.append(len(text))
         sub_blocks = []
-        current_lines = []
-        current_start = block["start_line"]
-        char_count = 0
+        chunk_start = 0  # offset where the current sub-block begins
+        first_line = 0   # index of its first line
         
-        for i, line in enumerate(lines):
-            if char_count + len(line) > self.chunk_size and current_lines:
+        for i, line_end in enumerate(line_ends):
+            if line_end - chunk_start > self.chunk_size and i > first_line:
                 sub_blocks.append({
                     "type": block["type"],
                     "name": f"{block['name']}_part_{len(sub_blocks) + 1}",
-                    "text": "\n".join(current_lines),
-                    "start_line": current_start,
-                    "end_line": current_start + len(current_lines) - 1
+                    "text": text[chunk_start:line_ends[i - 1]],
+                    "start_line": block["start_line"] + first_line,
+                    "end_line": block["start_line"] + i - 1
                 })
-                current_lines = []
-                current_start = block["start_line"] + i
-                char_count = 0
-            
-            current_lines.append(line)
-            char_count += len(line) + 1
+                chunk_start = line_ends[i - 1] + 1
+                first_line = i
         
-        if current_lines:
-            sub_blocks.append({
-                "type": block["type"],
-                "name": f"{block['name']}_part_{len(sub_blocks) + 1}" if sub_blocks else block["name"],
-                "text": "\n".join(current_lines),
-                "start_line": current_start,
-                "end_line": current_start + len(current_lines) - 1
-            })
+        sub_blocks.append({
+            "type": block["type"],
+            "name": f"{block['name']}_part_{len(sub_blocks) + 1}" if sub_blocks else block["name"],
+            "text": text[chunk_start:],
+            "start_line": block["start_line"] + first_line,
+            "end_line": block["start_line"] + len(line_ends) - 1
+        })
         
         return sub_blocks
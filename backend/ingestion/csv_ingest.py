@@ -1,12 +1,42 @@
 import os
-from typing import List
+from typing import Iterator, List
 import pandas as pd
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from backend.ingestion.base import BaseIngester, Chunk
-from backend.config import CHUNKING
+from backend.config import CHUNKING, CSV
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ModuleNotFoundError:  # pragma: no cover
+    pa = None
+    pc = None
+    pacsv = None
 
 _MAX_CHUNK_CHARS = 800  # hard cap for any single CSV chunk
 
+# CSVs at least this large are read in frames of _STREAM_CHUNK_ROWS rows
+# instead of all at once, bounding peak memory
+_STREAM_MIN_BYTES = 64 * 1024 * 1024
+_STREAM_CHUNK_ROWS = 50_000
+_STREAM_SAMPLE_ROWS = 1000  # rows used to pick ID/hash columns to drop
+
+# pandas' default missing-value markers, so the pyarrow reader treats the
+# same cells as empty
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+# pandas' boolean spellings; Arrow's defaults also take "1"/"0", turning a
+# column like 1,True,0,false into booleans where pandas keeps the text
+_TRUE_VALUES = ["True", "TRUE", "true"]
+_FALSE_VALUES = ["False", "FALSE", "false"]
+# Integer cells Arrow can't hold in int64 (it falls back to float64)
+_INT64_LIMIT = 2 ** 63
+_INTEGER_TEXT = r"^\s*[+-]?\d+\s*$"
+
 
 class CSVIngester(BaseIngester):
     def __init__(self):
@@ -24,59 +54,164 @@ class CSVIngester(BaseIngester):
         filename = os.path.basename(source_path)
         table_name = os.path.splitext(filename)[0]
         
-        df = pd.read_csv(source_path)
+        if os.path.getsize(source_path) >= _STREAM_MIN_BYTES:
+            frames = self._iter_csv_frames(source_path)
+        else:
+            df = self._read_csv(source_path)
+            frames = [df.drop(columns=self._id_columns_to_drop(df))]
         
-        # If too many columns, drop ID/hash columns
-        if len(df.columns) > 20:
-            columns_to_drop = []
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(x in col_lower for x in ["id", "hash", "uuid", "_id"]):
-                    if df[col].dtype == "object" or "int" in str(df[col].dtype):
-                        columns_to_drop.append(col)
-            
-            if columns_to_drop:
-                df = df.drop(columns=columns_to_drop)
+        column_names = None
+        # One timestamp for the whole file, shared by every chunk
+        timestamp = self._get_timestamp()
         
-        column_names = list(df.columns)
-        
-        # Process rows
+        # Process rows; a pending batch of short rows carries over from one
+        # frame to the next
         batch_rows = []
         batch_texts = []
         
-        for idx, row in df.iterrows():
-            row_text = self._format_row(row, column_names)
-            
-            # If row text is short, batch with other rows
-            if len(row_text) < 50:
-                batch_rows.append((idx, row_text))
-                batch_texts.append(row_text)
-                
-                # When we have 5-10 short rows, combine them
-                if len(batch_rows) >= 7:
-                    combined_text = "\n".join(batch_texts)
-                    chunks.extend(self._make_chunks(combined_text, filename, table_name, column_names, [r[0] for r in batch_rows]))
-                    batch_rows = []
-                    batch_texts = []
-            else:
-                # Flush any pending batch
-                if batch_rows:
-                    combined_text = "\n".join(batch_texts)
-                    chunks.extend(self._make_chunks(combined_text, filename, table_name, column_names, [r[0] for r in batch_rows]))
-                    batch_rows = []
-                    batch_texts = []
-                
-                # Create individual chunk for this row
-                chunks.extend(self._make_chunks(row_text, filename, table_name, column_names, idx))
+        for df in frames:
+            if column_names is None:
+                column_names = list(df.columns)
+            for idx, row_text in zip(df.index.tolist(), self._format_rows(df, column_names)):
+                # If row text is short, batch with other rows
+                if len(row_text) < 50:
+                    batch_rows.append((idx, row_text))
+                    batch_texts.append(row_text)
+                    
+                    # When we have 5-10 short rows, combine them
+                    if len(batch_rows) >= 7:
+                        combined_text = "\n".join(batch_texts)
+                        chunks.extend(self._make_chunks(combined_text, filename, table_name, column_names, [r[0] for r in batch_rows], timestamp))
+                        batch_rows = []
+                        batch_texts = []
+                else:
+                    # Flush any pending batch
+                    if batch_rows:
+                        combined_text = "\n".join(batch_texts)
+                        chunks.extend(self._make_chunks(combined_text, filename, table_name, column_names, [r[0] for r in batch_rows], timestamp))
+                        batch_rows = []
+                        batch_texts = []
+                    
+                    # Create individual chunk for this row
+                    chunks.extend(self._make_chunks(row_text, filename, table_name, column_names, idx, timestamp))
         
         # Handle remaining batch
         if batch_rows:
             combined_text = "\n".join(batch_texts)
-            chunks.extend(self._make_chunks(combined_text, filename, table_name, column_names, [r[0] for r in batch_rows]))
+            chunks.extend(self._make_chunks(combined_text, filename, table_name, column_names, [r[0] for r in batch_rows], timestamp))
         
         return chunks
 
-    def _make_chunks(self, text: str, filename: str, table_name: str, column_names: list, row_index) -> List[Chunk]:
+    def _iter_csv_frames(self, source_path: str) -> Iterator[pd.DataFrame]:
+        """Yield a large CSV as DataFrames of _STREAM_CHUNK_ROWS rows.
+
+        Only one frame is held at a time. Cells are read as text, so values
+        keep their spelling from the file and every frame types its columns
+        the same way; which ID/hash columns to drop is decided once, from
+        the types pandas infers for a sample of leading rows.
+        """
+        sample = pd.read_csv(source_path, nrows=_STREAM_SAMPLE_ROWS)
+        columns_to_drop = set(self._id_columns_to_drop(sample))
+        keep = [col for col in sample.columns if col not in columns_to_drop]
+        del sample
+        
+        reader = pd.read_csv(
+            source_path,
+            chunksize=_STREAM_CHUNK_ROWS,
+            dtype=str,
+            usecols=keep,
+        )
+        with reader:
+            for frame in reader:
+                # usecols doesn't preserve the requested order
+                yield frame[keep]
+
+    def _id_columns_to_drop(self, df: pd.DataFrame) -> List[str]:
+        """ID/hash columns to drop from tables with too many columns."""
+        if len(df.columns) <= 20:
+            return []
+        # Name and dtype tests run over the whole column index at once
+        names = df.columns.astype(str).str.lower()
+        mask_name = names.str.contains("id|hash|uuid", regex=True)
+        dtypes = df.dtypes
+        mask_type = (dtypes == object) | dtypes.astype(str).str.contains("int", regex=False)
+        return df.columns[mask_name & mask_type.to_numpy()].tolist()
+
+    def _read_csv(self, source_path: str) -> pd.DataFrame:
+        """Load a CSV into a DataFrame, with pyarrow's reader when enabled."""
+        if pacsv is not None and CSV["reader"] == "pyarrow":
+            try:
+                table = self._read_arrow(source_path)
+                matches = self._arrow_matches_pandas(table, source_path)
+            except pa.ArrowInvalid:
+                # e.g. a column whose type changes after the first block
+                table = None
+                matches = False
+            if matches:
+                # All-empty columns come back as Arrow's null type; pandas
+                # reads those as float64 NaN
+                schema = table.schema
+                if any(pa.types.is_null(f.type) for f in schema):
+                    table = table.cast(pa.schema([
+                        f.with_type(pa.float64()) if pa.types.is_null(f.type) else f
+                        for f in schema
+                    ]))
+                return table.to_pandas()
+        return pd.read_csv(source_path)
+
+    @staticmethod
+    def _read_arrow(source_path: str, **convert_options):
+        return pacsv.read_csv(
+            source_path,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+            convert_options=pacsv.ConvertOptions(
+                null_values=_NA_VALUES,
+                true_values=_TRUE_VALUES,
+                false_values=_FALSE_VALUES,
+                strings_can_be_null=True,
+                **convert_options,
+            ),
+        )
+
+    def _arrow_matches_pandas(self, table, source_path: str) -> bool:
+        """Whether `table` converts to the same DataFrame pd.read_csv would give.
+
+        Files where the two differ are left to pandas so column names,
+        values and dtypes (which also decide the ID/hash columns dropped)
+        stay the same:
+        - pandas renames blank and repeated headers ("Unnamed: 0", "a.1")
+        - pandas keeps date-times and times as text; Arrow re-formats them
+        - integers beyond int64 become float64 in Arrow, losing digits,
+          while pandas keeps them exact (uint64 or object)
+        """
+        names = table.column_names
+        if not all(names) or len(set(names)) != len(names):
+            return False
+        if any(pa.types.is_timestamp(f.type) or pa.types.is_time(f.type) for f in table.schema):
+            return False
+        
+        # Arrow types integer-only text as int64 unless a value overflows it,
+        # so only double columns holding values that large need a look at
+        # their original text
+        suspects = []
+        for f in table.schema:
+            if pa.types.is_floating(f.type):
+                largest = pc.max(pc.abs(table[f.name])).as_py()
+                if largest is not None and largest >= _INT64_LIMIT:
+                    suspects.append(f.name)
+        if suspects:
+            text = self._read_arrow(
+                source_path,
+                include_columns=suspects,
+                column_types={name: pa.string() for name in suspects},
+            )
+            for name in suspects:
+                values = text[name].drop_null()
+                if len(values) and pc.all(pc.match_substring_regex(values, _INTEGER_TEXT)).as_py():
+                    return False
+        return True
+
+    def _make_chunks(self, text: str, filename: str, table_name: str, column_names: list, row_index, timestamp: str) -> List[Chunk]:
         """Create chunks from text, splitting if over size cap."""
         texts = self._splitter.split_text(text) if len(text) > _MAX_CHUNK_CHARS else [text]
         return [
@@ -89,19 +224,29 @@ class CSVIngester(BaseIngester):
                     "table_name": table_name,
                     "row_index": row_index,
                     "column_names": column_names,
-                    "ingested_at": self._get_timestamp()
+                    "ingested_at": timestamp
                 }
             )
             for t in texts if t.strip()
         ]
 
-    def _format_row(self, row, column_names: List[str]) -> str:
-        """Format a row as 'ColumnName: Value, ColumnName: Value, ...'"""
-        parts = []
-        for col in column_names:
-            value = row[col]
-            if pd.isna(value):
-                value = ""
-            parts.append(f"{col}: {value}")
+    def _format_rows(self, df: pd.DataFrame, column_names: list) -> List[str]:
+        """Format every row as 'ColumnName: Value, ColumnName: Value, ...'
+
+        Built a column at a time with pandas string ops instead of cell by
+        cell in Python; missing values become empty strings.
+
+        Unlike the old per-row iterrows formatting, an int column is no
+        longer upcast to float by a neighbouring float/NaN column, so it
+        renders as "-3" rather than "-3.0". This changes the stored chunk
+        text (and so dedup hashes) for such files compared to earlier ingests.
+        """
+        if not column_names:
+            return [""] * len(df)
         
-        return ", ".join(parts)
+        values = df.astype("string").fillna("")
+        rows = None
+        for col in column_names:
+            part = f"{col}: " + values[col]
+            rows = part if rows is None else rows + ", " + part
+        return rows.tolist()
@@ -1,9 +1,11 @@
 import os
+import re
 import shutil
 import stat
 import tempfile
-from typing import List
-from git import Repo
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+from git import GitCommandError, Repo
 from backend.ingestion.base import BaseIngester, Chunk
 from backend.ingestion.text import TextIngester
 from backend.ingestion.code import CodeIngester, SUPPORTED_EXTENSIONS
@@ -24,6 +26,17 @@ class GitHubRepoIngester(BaseIngester):
             "vendor", "third_party", ".idea", ".vscode"
         }
         self.exclude_patterns = {".lock", ".min.js", ".min.css", "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "composer.lock", "Cargo.lock", "poetry.lock"}
+        # Any pattern occurring anywhere in the lowercased filename excludes it;
+        # one alternation scans the name once instead of once per pattern
+        self._exclude_re = re.compile(
+            "|".join(re.escape(p.lower()) for p in sorted(self.exclude_patterns))
+        )
+        # Sparse-checkout patterns for the files _process_repo ingests, matching
+        # extensions case-insensitively as it does ("*.[pP][yY]")
+        self._sparse_patterns = [
+            "*" + "".join(f"[{c.lower()}{c.upper()}]" if c.isalpha() else c for c in ext)
+            for ext in sorted(SUPPORTED_EXTENSIONS | {".md", ".txt"})
+        ]
 
     def _safe_rmtree(self, path: str):
         """Robustly delete a directory tree on Windows where files may be read-only."""
@@ -53,8 +66,7 @@ class GitHubRepoIngester(BaseIngester):
         clone_path = tempfile.mkdtemp(prefix=f"{repo_name}_", dir=self.clone_dir)
         
         try:
-            # Shallow clone
-            Repo.clone_from(repo_url, clone_path, depth=1)
+            self._clone(repo_url, clone_path)
             
             # Process files
             chunks = self._process_repo(clone_path, repo_url, repo_name)
@@ -72,6 +84,27 @@ class GitHubRepoIngester(BaseIngester):
         
         return chunks
 
+    def _clone(self, repo_url: str, clone_path: str):
+        """Shallow, partial, sparse clone of just the files we ingest.
+
+        Blobs over the size cap are left out of the initial fetch, and only
+        paths matching a supported extension are checked out, so files that
+        would be skipped anyway (images, binaries, archives) are never
+        downloaded.
+        """
+        repo = Repo.clone_from(
+            repo_url,
+            clone_path,
+            depth=1,
+            multi_options=[f"--filter=blob:limit={self.max_file_size_kb * 1024}", "--no-checkout"],
+        )
+        try:
+            repo.git.sparse_checkout("set", "--no-cone", *self._sparse_patterns)
+        except GitCommandError as e:
+            # git < 2.35 has no --no-cone: fall back to checking out every file
+            print(f"[WARN] sparse-checkout unavailable, checking out the full tree: {e}")
+        repo.git.checkout()
+
     def _extract_repo_name(self, url: str) -> str:
         """Extract repository name from URL."""
         # Handle various GitHub URL formats
@@ -88,53 +121,85 @@ class GitHubRepoIngester(BaseIngester):
         
         return None
 
+    def _walk_scandir(self, root: str, rel_dir: str = "") -> Iterator[Tuple[os.DirEntry, str]]:
+        """Yield (DirEntry, path relative to the repo root) for every file under root.
+
+        Same order as os.walk: a directory's files, then its subdirectories.
+        Excluded directories are never opened, and symlinked directories are
+        not followed. DirEntry caches its stat result, so the size check
+        doesn't need a second stat call per file.
+        """
+        subdirs = []
+        try:
+            it = os.scandir(root)
+        except OSError:
+            # Unreadable directory: skipped, as os.walk does
+            return
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    if entry.name not in self.exclude_dirs and not entry.is_symlink():
+                        subdirs.append(entry)
+                else:
+                    yield entry, rel_dir + entry.name
+        
+        for entry in subdirs:
+            yield from self._walk_scandir(entry.path, f"{rel_dir}{entry.name}{os.sep}")
+
     def _process_repo(self, repo_path: str, repo_url: str, repo_name: str) -> List[Chunk]:
         """Process all files in the repository."""
         chunks = []
+        work = []  # (process function, file_path, rel_path, log kind, log detail)
         
-        for root, dirs, files in os.walk(repo_path):
-            # Filter out excluded directories
-            dirs[:] = [d for d in dirs if d not in self.exclude_dirs]
+        for entry, rel_path in self._walk_scandir(repo_path):
+            filename = entry.name
+            file_path = entry.path
             
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                
-                # Check file size
-                if os.path.getsize(file_path) > self.max_file_size_kb * 1024:
-                    continue
-                
-                # Check exclude patterns
-                if any(p in filename.lower() for p in self.exclude_patterns):
-                    continue
-                
-                # Get relative path from repo root
-                rel_path = os.path.relpath(file_path, repo_path)
-                
-                # Process based on file type
-                ext = os.path.splitext(filename)[1].lower()
-                
-                file_chunks = []
-                if filename.lower().endswith(('.md', '.txt')):
-                    # Process markdown and text files
-                    file_chunks = self._process_readme(file_path, repo_url, rel_path)
-                    chunks.extend(file_chunks)
-                    print(f"[DEBUG] Embedded text file: {rel_path} ({len(file_chunks)} chunks)")
-                
-                elif ext in SUPPORTED_EXTENSIONS:
-                    # Process as code
-                    file_chunks = self._process_code_file(file_path, repo_url, rel_path)
+            # Check exclude patterns (before the size check, which needs a stat)
+            if self._exclude_re.search(filename.lower()):
+                continue
+            
+            # Check file size
+            if entry.stat().st_size > self.max_file_size_kb * 1024:
+                continue
+            
+            # Process based on file type
+            ext = os.path.splitext(filename)[1].lower()
+            
+            if filename.lower().endswith(('.md', '.txt')):
+                # Process markdown and text files
+                work.append((self._process_readme, file_path, rel_path, "text file", ""))
+            
+            elif ext in SUPPORTED_EXTENSIONS:
+                # Process as code
+                work.append((self._process_code_file, file_path, rel_path, "code file", f", type={ext}"))
+            
+            else:
+                # Fallback for other files that might be text-like or common code files not in SUPPORTED_EXTENSIONS
+                # but we want to be conservative to avoid binary files
+                pass
+        
+        if work:
+            # Files are independent: file reads and tree-sitter parses release
+            # the GIL, so they overlap on a thread pool. Results are collected
+            # in walk order, keeping chunk order and the log deterministic.
+            workers = min(os.cpu_count() or 1, len(work))
+            # One timestamp for the whole repository
+            timestamp = self._get_timestamp()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(process, file_path, repo_url, rel_path, timestamp)
+                    for process, file_path, rel_path, _, _ in work
+                ]
+                for (_, _, rel_path, kind, detail), future in zip(work, futures):
+                    file_chunks = future.result()
                     chunks.extend(file_chunks)
-                    print(f"[DEBUG] Embedded code file: {rel_path} ({len(file_chunks)} chunks, type={ext})")
-                
-                else:
-                    # Fallback for other files that might be text-like or common code files not in SUPPORTED_EXTENSIONS
-                    # but we want to be conservative to avoid binary files
-                    pass
+                    print(f"[DEBUG] Embedded {kind}: {rel_path} ({len(file_chunks)} chunks{detail})")
         
         print(f"[DEBUG] Total repository ingestion: {len(chunks)} chunks from {repo_name}")
         return chunks
 
-    def _process_readme(self, file_path: str, repo_url: str, rel_path: str) -> List[Chunk]:
+    def _process_readme(self, file_path: str, repo_url: str, rel_path: str, timestamp: str) -> List[Chunk]:
         """Process README.md as markdown text."""
         text_ingester = TextIngester()
         raw_chunks = text_ingester.ingest(file_path)
@@ -145,14 +210,14 @@ class GitHubRepoIngester(BaseIngester):
                 "repo_url": repo_url,
                 "file_path": rel_path,
                 "language": "markdown",
-                "ingested_at": self._get_timestamp()
+                "ingested_at": timestamp
             })
             chunk.source_type = "github"
             chunk.source_name = repo_url
         
         return raw_chunks
 
-    def _process_code_file(self, file_path: str, repo_url: str, rel_path: str) -> List[Chunk]:
+    def _process_code_file(self, file_path: str, repo_url: str, rel_path: str, timestamp: str) -> List[Chunk]:
         """Process a code file."""
         code_ingester = CodeIngester()
         raw_chunks = code_ingester.ingest(file_path)
@@ -164,7 +229,7 @@ class GitHubRepoIngester(BaseIngester):
                 "repo_url": repo_url,
                 "file_path": rel_path,
                 "language": language,
-                "ingested_at": self._get_timestamp()
+                "ingested_at": timestamp
             })
             chunk.source_type = "github"
             chunk.source_name = repo_url
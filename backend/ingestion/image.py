@@ -17,7 +17,9 @@ Pipeline per image:
 
 import os
 import re
+import threading
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -96,6 +98,11 @@ class ImageIngester(BaseIngester):
         cfg = CHUNKING.get("image", {"size": 800, "overlap": 100})
         self.chunk_size = cfg["size"]
         self.overlap = cfg["overlap"]
+        # One Gemini client (and its connection pool) per API key, shared by
+        # concurrent calls
+        self._client = None
+        self._client_key = ""
+        self._client_lock = threading.Lock()
 
     @property
     def _gemini_api_key(self) -> str:
@@ -120,14 +127,18 @@ class ImageIngester(BaseIngester):
 
         print(f"[Image] Ingesting: {path.name}")
 
-        # Run Gemini + OCR
+        # Run Gemini + OCR: OCR is local CPU work and Gemini is a network
+        # call, so OCR runs on a worker thread while Gemini is awaited
         gemini_text = ""
         ocr_text = ""
 
-        gemini_text = self._analyze_with_gemini(path)
-
         if TESSERACT_AVAILABLE and PIL_AVAILABLE:
-            ocr_text = self._extract_ocr(path)
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                ocr_future = pool.submit(self._extract_ocr, path)
+                gemini_text = self._analyze_with_gemini(path)
+                ocr_text = ocr_future.result()
+        else:
+            gemini_text = self._analyze_with_gemini(path)
 
         # Merge results
         combined = self._merge_analyses(gemini_text, ocr_text, path.name)
@@ -190,7 +201,7 @@ class ImageIngester(BaseIngester):
             return ""
 
         try:
-            client = genai.Client(api_key=key)
+            client = self._get_client(key)
             img = Image.open(path)
             response = client.models.generate_content(
                 model=GEMINI_MODEL,
@@ -204,6 +215,14 @@ class ImageIngester(BaseIngester):
             print(f"[Image] Gemini error: {e}")
             return ""
 
+    def _get_client(self, key: str):
+        """Return the shared Gemini client, rebuilding it if the key changed."""
+        with self._client_lock:
+            if self._client is None or self._client_key != key:
+                self._client = genai.Client(api_key=key)
+                self._client_key = key
+            return self._client
+
     # ------------------------------------------------------------------
     # pytesseract OCR
     # ------------------------------------------------------------------
@@ -300,6 +319,7 @@ class ImageIngester(BaseIngester):
         text = re.sub(r"\n{4,}", "\n\n\n", text)
         text = re.sub(r" {3,}", "  ", text)
         text = text.strip()
+        timestamp = self._get_timestamp()
 
         if len(text) < 50:
             # Very short — return as single chunk
@@ -307,7 +327,7 @@ class ImageIngester(BaseIngester):
                 text=text,
                 source_type="image",
                 source_name=source_name,
-                metadata={"chunk_index": 0, "ingested_at": self._get_timestamp()},
+                metadata={"chunk_index": 0, "ingested_at": timestamp},
             )]
 
         chunks: List[Chunk] = []
@@ -334,7 +354,7 @@ class ImageIngester(BaseIngester):
                     source_name=source_name,
                     metadata={
                         "chunk_index": chunk_idx,
-                        "ingested_at": self._get_timestamp(),
+                        "ingested_at": timestamp,
                         "has_gemini": True,
                         "has_ocr": TESSERACT_AVAILABLE,
                     },
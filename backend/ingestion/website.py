@@ -154,7 +154,12 @@ class WebsiteIngester(BaseIngester):
             print(f"[Website]   ... and {len(urls) - 10} more")
 
         # Use Browserless for JS-rendered scraping (cloud-based)
-        all_chunks = await self._crawl_with_browserless(urls, root_url)
+        try:
+            all_chunks = await self._crawl_with_browserless(urls, root_url)
+        finally:
+            if self._ai_parser is not None:
+                # The parser's Redis client is bound to this crawl's loop
+                await self._ai_parser.aclose()
 
         # Global deduplication across all pages
         before = len(all_chunks)
@@ -457,61 +462,30 @@ class WebsiteIngester(BaseIngester):
             from backend.core.ai_parser import get_ai_parser
             self._ai_parser = get_ai_parser()
 
-        rpm_limit = int(AI_PARSER.get("rpm_limit", 30))
-        tpm_limit = int(AI_PARSER.get("tpm_limit", 30000))
         pages = [p for p in pages if p and p.get("raw")]
         if not pages:
             return []
 
-        estimated = [self._ai_parser.estimate_request_tokens(self._clean_text(p["raw"])) for p in pages]
-        all_chunks: List[Chunk] = []
-        idx = 0
-        total_pages = len(pages)
-        while idx < total_pages:
-            batch_pages: List[Dict[str, Any]] = []
-            batch_sum = 0
-            while idx < total_pages and len(batch_pages) < rpm_limit:
-                t = estimated[idx]
-                if batch_pages and (batch_sum + t) > tpm_limit:
-                    break
-                if not batch_pages and t > tpm_limit:
-                    batch_pages.append(pages[idx])
-                    batch_sum += t
-                    idx += 1
-                    break
-                batch_pages.append(pages[idx])
-                batch_sum += t
-                idx += 1
-
-            tasks = []
-            for p in batch_pages:
-                basic_clean = self._clean_text(p["raw"])
-                tasks.append(
-                    asyncio.to_thread(
-                        self._ai_parser.parse_content,
-                        basic_clean,
-                        p.get("url", ""),
-                        p.get("page_index"),
-                        p.get("page_total"),
-                    )
-                )
+        # The parser packs pages into shared completions and owns the RPM/TPM
+        # throttling and request concurrency
+        cleaned = [self._clean_text(p["raw"]) for p in pages]
+        parsed_results = await self._ai_parser.parse_batch_async(
+            [(basic_clean, p.get("url", "")) for basic_clean, p in zip(cleaned, pages)]
+        )
 
-            parsed_results = await asyncio.gather(*tasks, return_exceptions=True)
-            for p, parsed in zip(batch_pages, parsed_results):
-                url = p["url"]
-                title = p["title"]
-                if isinstance(parsed, Exception) or not parsed:
-                    clean = self._clean_text(p["raw"])
-                else:
-                    clean = str(parsed)
-                if not clean:
-                    continue
-                chunks = self._text_to_chunks(clean, url, root_url, title)
-                word_count = len(clean.split())
-                print(f"[Website] ✓ EMBEDDED: {url}")
-                print(f"[Website]   Title   : {title[:80]}")
-                print(f"[Website]   Words   : {word_count} | Chunks: {len(chunks)}")
-                all_chunks.extend(chunks)
+        all_chunks: List[Chunk] = []
+        for p, basic_clean, (_, parsed) in zip(pages, cleaned, parsed_results):
+            url = p["url"]
+            title = p["title"]
+            clean = parsed or basic_clean
+            if not clean:
+                continue
+            chunks = self._text_to_chunks(clean, url, root_url, title)
+            word_count = len(clean.split())
+            print(f"[Website] ✓ EMBEDDED: {url}")
+            print(f"[Website]   Title   : {title[:80]}")
+            print(f"[Website]   Words   : {word_count} | Chunks: {len(chunks)}")
+            all_chunks.extend(chunks)
 
         return all_chunks
 
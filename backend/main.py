@@ -8,7 +8,8 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from backend.routers import ingest_router, chat_router
-from backend.core.vector_store import VectorStore
+from backend.routers.chat import close_clients as close_chat_clients
+from backend.core.vector_store import VectorStore, invalidate_sources_cache
 from backend.core.request_counter import get_embedding_stats
 from backend.core.upstash_redis import UpstashRedis
 from backend.core.cache import cache_get_or_set
@@ -20,12 +21,14 @@ load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize resources on startup."""
+    """Initialize resources on startup and release pooled clients on shutdown."""
     print("[DEBUG] Starting up RAG Everything API...", flush=True)
     # Create Zilliz collections on startup
     VectorStore()
     print("[DEBUG] VectorStore initialized", flush=True)
     yield
+    close_chat_clients()
+    await redis.close()
 
 
 app = FastAPI(
@@ -163,10 +166,11 @@ async def reset_collections():
             collection_name=collection,
             dimension=dimensions,
             metric_type="COSINE",
-            id_type="str",
+            id_type="int",  # auto-generated INT64 primary key
             auto_id=True,
-            max_length=65535
         )
+    # The cached source listing still describes the dropped collections
+    invalidate_sources_cache()
      
     return {"message": f"Collections reset with {dimensions} dimensions"}
 
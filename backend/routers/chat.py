@@ -18,6 +18,12 @@ llm = LLMWrapper()
 redis = UpstashRedis()
 
 
+def close_clients() -> None:
+    """Close the pooled HTTP clients held by the chat components."""
+    retriever.close()
+    llm.close()
+
+
 class Message(BaseModel):
     role: str  # 'user' or 'assistant'
     content: str
@@ -1,14 +1,16 @@
 import os
 import re
 import sys
+import asyncio
 import tempfile
 import shutil
-from typing import Optional, List as TList
+from typing import Dict, Optional, List as TList
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
 
 from backend.core.embedder import Embedder
-from backend.core.vector_store import VectorStore
+from backend.core.vector_store import InsertJob, VectorStore
+from backend.ingestion.base import Chunk
 from backend.ingestion import (
     TextIngester,
     PDFIngester,
@@ -40,6 +42,13 @@ async def _bust_library_cache():
         pass
 
 
+async def _finish_ingestion(job: InsertJob):
+    """Seal the job's inserted vectors and refresh the library listing."""
+    # finalize() blocks until the writer has inserted the job's rows
+    await asyncio.get_running_loop().run_in_executor(None, vector_store.finalize, job)
+    await _bust_library_cache()
+
+
 class GitHubRequest(BaseModel):
     url: str
 
@@ -80,6 +89,32 @@ def detect_source_type(filename: str) -> str:
         return "text"  # Default fallback
 
 
+def _ingest_uploads(ingester, source_type: str, saved: TList[tuple[str, str]]) -> TList[Chunk]:
+    """Parse saved uploads of one source type; `saved` holds (filename, temp path) pairs."""
+    if len(saved) > 1 and hasattr(ingester, "ingest_many"):
+        try:
+            chunks = ingester.ingest_many([path for _, path in saved])
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Failed to parse {source_type} files: {str(e)}")
+        # Chunks are named after their file, which shows any file that gave nothing
+        produced = {chunk.source_name for chunk in chunks}
+        for filename, path in saved:
+            if os.path.basename(path) not in produced:
+                raise HTTPException(status_code=400, detail=f"No content extracted from '{filename}'.")
+        return chunks
+
+    chunks = []
+    for filename, path in saved:
+        try:
+            file_chunks = ingester.ingest(path)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Failed to parse '{filename}': {str(e)}")
+        if not file_chunks:
+            raise HTTPException(status_code=400, detail=f"No content extracted from '{filename}'.")
+        chunks.extend(file_chunks)
+    return chunks
+
+
 @router.post("/upload", response_model=IngestResponse)
 async def upload_file(
     files: TList[UploadFile] = File(...),
@@ -90,42 +125,49 @@ async def upload_file(
     os.makedirs(upload_dir, exist_ok=True)
 
     total_chunks = 0
-    last_name = ""
-
-    for file in files:
-        st = source_type or detect_source_type(file.filename)
-        if st == "code" and file.filename.lower().endswith(".json"):
-            st = "chat"
-
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, file.filename)
+    job = vector_store.begin_job()
+    temp_dir = tempfile.mkdtemp()
 
-        try:
+    try:
+        # Save every upload first so files of the same source type can be
+        # parsed together
+        uploads: Dict[str, TList[tuple[str, str]]] = {}
+        for i, file in enumerate(files):
+            st = source_type or detect_source_type(file.filename)
+            if st == "code" and file.filename.lower().endswith(".json"):
+                st = "chat"
+
+            # One directory per file, so uploads sharing a name don't collide
+            file_dir = os.path.join(temp_dir, str(i))
+            os.mkdir(file_dir)
+            temp_path = os.path.join(file_dir, file.filename)
             with open(temp_path, "wb") as f:
                 shutil.copyfileobj(file.file, f)
+            uploads.setdefault(st, []).append((file.filename, temp_path))
 
+        for st, saved in uploads.items():
             ingester = get_ingester(st)
             if not ingester:
                 raise HTTPException(status_code=400, detail=f"Unsupported source type: {st}")
 
-            try:
-                chunks = ingester.ingest(temp_path)
-            except Exception as e:
-                raise HTTPException(status_code=422, detail=f"Failed to parse '{file.filename}': {str(e)}")
-
-            if not chunks:
-                raise HTTPException(status_code=400, detail=f"No content extracted from '{file.filename}'.")
-
+            chunks = _ingest_uploads(ingester, st, saved)
             texts = [chunk.text for chunk in chunks]
             embeddings = embedder.embed_documents(texts)
-            vector_store.upsert(chunks, embeddings)
+            vector_store.upsert(chunks, embeddings, job=job)
             total_chunks += len(chunks)
-            last_name = file.filename
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+    except Exception:
+        # Files stored before a failing one are kept, as when each was
+        # inserted right away; a finalize error must not mask the original one
+        try:
+            await _finish_ingestion(job)
+        except Exception as e:
+            print(f"[WARN] Failed to finalize partial upload: {e}", flush=True)
+        raise
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
-    await _bust_library_cache()
-    return IngestResponse(chunks_created=total_chunks, source_name=last_name)
+    await _finish_ingestion(job)
+    return IngestResponse(chunks_created=total_chunks, source_name=files[-1].filename)
 
 
 @router.post("/github", response_model=IngestResponse)
@@ -158,8 +200,9 @@ async def ingest_github(request: GitHubRequest):
     embeddings = embedder.embed_documents(texts)
     
     # Upsert to vector store
-    vector_store.upsert(chunks, embeddings)
-    await _bust_library_cache()
+    job = vector_store.begin_job()
+    vector_store.upsert(chunks, embeddings, job=job)
+    await _finish_ingestion(job)
     
     # Extract repo name for response
     repo_name = repo_url.rstrip("/").split("/")[-1]
@@ -213,8 +256,9 @@ async def ingest_website(request: WebsiteRequest):
     # Embed and store
     texts = [chunk.text for chunk in chunks]
     embeddings = embedder.embed_documents(texts)
-    vector_store.upsert(chunks, embeddings)
-    await _bust_library_cache()
+    job = vector_store.begin_job()
+    vector_store.upsert(chunks, embeddings, job=job)
+    await _finish_ingestion(job)
 
     return IngestResponse(chunks_created=len(chunks), source_name=parsed.netloc)
 
@@ -274,8 +318,9 @@ async def ingest_image(
 
         texts = [c.text for c in chunks]
         embeddings = embedder.embed_documents(texts)
-        vector_store.upsert(chunks, embeddings)
-        await _bust_library_cache()
+        job = vector_store.begin_job()
+        vector_store.upsert(chunks, embeddings, job=job)
+        await _finish_ingestion(job)
 
         print(f"[Image] Ingested '{file.filename}': {len(chunks)} chunks embedded.")
         return IngestResponse(chunks_created=len(chunks), source_name=file.filename or "image")
@@ -346,9 +391,10 @@ async def ingest_voice(
 
         texts = [c.text for c in chunks]
         embeddings = embedder.embed_documents(texts)
-        vector_store.upsert(chunks, embeddings)
+        job = vector_store.begin_job()
+        vector_store.upsert(chunks, embeddings, job=job)
 
-        await _bust_library_cache()
+        await _finish_ingestion(job)
         source_name = safe_name
         transcript_preview = chunks[0].text[:200] if chunks else ""
         print(f"[Voice] Ingested '{safe_name}': {len(chunks)} chunks. Preview: '{transcript_preview}'")
@@ -392,9 +438,10 @@ async def ingest_voice_text(request: VoiceTextRequest):
 
     texts = [c.text for c in chunks]
     embeddings = embedder.embed_documents(texts)
-    vector_store.upsert(chunks, embeddings)
+    job = vector_store.begin_job()
+    vector_store.upsert(chunks, embeddings, job=job)
 
-    await _bust_library_cache()
+    await _finish_ingestion(job)
     print(f"[Voice] Ingested transcript '{source_name}': {len(chunks)} chunks embedded.")
     return IngestResponse(chunks_created=len(chunks), source_name=source_name)
 
@@ -421,8 +468,9 @@ async def ingest_youtube(request: YouTubeRequest):
         raise HTTPException(status_code=400, detail="No transcript could be extracted from the video")
     texts = [chunk.text for chunk in chunks]
     embeddings = embedder.embed_documents(texts)
-    vector_store.upsert(chunks, embeddings)
-    await _bust_library_cache()
+    job = vector_store.begin_job()
+    vector_store.upsert(chunks, embeddings, job=job)
+    await _finish_ingestion(job)
     source_name = chunks[0].source_name
     return IngestResponse(chunks_created=len(chunks), source_name=source_name)
 
@@ -530,9 +578,10 @@ async def ingest_ai_chat(request: AIChatRequest):
     # Embed and store
     texts = [chunk.text for chunk in chunks]
     embeddings = embedder.embed_documents(texts)
-    vector_store.upsert(chunks, embeddings)
+    job = vector_store.begin_job()
+    vector_store.upsert(chunks, embeddings, job=job)
 
-    await _bust_library_cache()
+    await _finish_ingestion(job)
     print(f"[AI Chat] Ingested '{source_name}': {len(chunks)} chunks embedded.", flush=True)
     return IngestResponse(chunks_created=len(chunks), source_name=source_name)
 
@@ -585,8 +634,9 @@ async def ingest_text(request: TextRequest):
     # Embed and store
     texts = [chunk.text for chunk in chunks]
     embeddings = embedder.embed_documents(texts)
-    vector_store.upsert(chunks, embeddings)
-    await _bust_library_cache()
+    job = vector_store.begin_job()
+    vector_store.upsert(chunks, embeddings, job=job)
+    await _finish_ingestion(job)
 
     return IngestResponse(chunks_created=len(chunks), source_name=source_name)
 